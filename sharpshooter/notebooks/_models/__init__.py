@@ -1 +1,26 @@
-from .draftkings_models import *
\ No newline at end of file
+import importlib
+
+# Models re-exported from submodules. They are imported on first access, so
+# importing one submodule (e.g. ``_models.madden``) does not build every
+# pydantic model in the package.
+_EXPORTS = {
+    "NameDisplay": "draftkings_models",
+    "Competition": "draftkings_models",
+    "DraftStatAttribute": "draftkings_models",
+    "DKDraftable": "draftkings_models",
+    "DKDraftablesResponse": "draftkings_models",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -1,5 +1,7 @@
-from typing import List, Optional
-from pydantic import BaseModel, Field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Union
+from pydantic import BaseModel, Field, TypeAdapter
+from pydantic_core import from_json
 
 class PlayerRating(BaseModel):
     acceleration_diff: Optional[int] = None
@@ -151,3 +153,65 @@ class PlayerRating(BaseModel):
 class RatingsResponse(BaseModel):
     count: int
     docs: List[PlayerRating]
+
+
+RatingsPayload = Union[bytes, str, List[Dict[str, Any]]]
+
+
+@lru_cache(maxsize=None)
+def get_type_adapter(tp: Any) -> TypeAdapter:
+    """Return a cached TypeAdapter; building one compiles a validator for every field."""
+    return TypeAdapter(tp)
+
+
+def validate_ratings_page(body: Union[bytes, str]) -> RatingsResponse:
+    """
+    Validate one raw ratings page (``{"count": ..., "docs": [...]}``) in a single call.
+
+    :param body: The raw response body.
+    :return: The parsed page.
+    """
+    return RatingsResponse.model_validate_json(body)
+
+
+def validate_player_ratings(payload: RatingsPayload) -> List[PlayerRating]:
+    """
+    Validate a batch of players in one call instead of one model at a time.
+
+    Raw bytes are parsed and validated together by pydantic-core, without an
+    intermediate dict per player.
+
+    :param payload: A raw JSON array of players, or the already decoded list.
+    :return: The player ratings.
+    """
+    adapter = get_type_adapter(List[PlayerRating])
+    if isinstance(payload, (bytes, str)):
+        return adapter.validate_json(payload)
+    return adapter.validate_python(payload)
+
+
+# Field name -> key in the raw payload (``team`` arrives as ``ost``).
+PLAYER_RATING_KEYS: Dict[str, str] = {
+    name: field.alias or name for name, field in PlayerRating.model_fields.items()
+}
+
+
+def player_rating_columns(payload: RatingsPayload, trusted: bool = False) -> Dict[str, List[Any]]:
+    """
+    Return the players as column arrays keyed by field name, ready for ``pl.DataFrame``.
+
+    :param payload: A raw JSON array of players, or the already decoded list.
+    :param trusted: Skip validation and read the columns straight from the
+        payload, without building any model instances. Only use this for
+        payloads that were validated before, such as cached pages.
+    :return: One list per ``PlayerRating`` field, in field order.
+    """
+    if trusted:
+        items = from_json(payload) if isinstance(payload, (bytes, str)) else payload
+        return {name: [item.get(key) for item in items] for name, key in PLAYER_RATING_KEYS.items()}
+    return ratings_to_columns(validate_player_ratings(payload))
+
+
+def ratings_to_columns(ratings: List[PlayerRating]) -> Dict[str, List[Any]]:
+    """Transpose validated players into one list per field, in field order."""
+    return {name: [getattr(rating, name) for rating in ratings] for name in PLAYER_RATING_KEYS}
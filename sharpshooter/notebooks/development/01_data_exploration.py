@@ -7,12 +7,19 @@
 
 
 # imports
+import asyncio
 import polars as pl
-import httpx
 from pathlib import Path
 
 # Import from the _models directory and madden.py file
-from notebooks._models.madden import PlayerRating, RatingsResponse
+from notebooks._models.madden import PlayerRating, RatingsResponse, ratings_to_columns, validate_player_ratings
+from sharpshooter.utils.utils import fetch_paginated
+from sharpshooter.utils.nflverse import scan_nflverse_pbp
+from sharpshooter.utils.crosswalk import PlayerCrosswalk
+from sharpshooter.utils.derived import DerivedTables
+from sharpshooter.utils.rankings import derive_combined_rankings
+from sharpshooter.utils.madden import RatingsMatrix, decode_madden_ratings
+from sharpshooter.utils.scoring import DRAFTKINGS, ESPN_PPR, PBP_COLUMNS, FantasyPointsStore
 
 
 # In[ ]:
@@ -51,31 +58,17 @@ BASE_URL = "https://ratings-api.ea.com/v2/entities"
 
 
 # Create a Function to Read Data from the EA Sports Madden API
-def get_madden_ratings(game_version: str, iteration: str) -> list[PlayerRating]:
+async def get_madden_ratings(game_version: str, iteration: str, max_concurrency: int = 8) -> list[PlayerRating]:
     url = f"{BASE_URL}/{game_version}-ratings?filter=iteration:{iteration}"
-    all_ratings = []
-
-    with httpx.Client() as client:
-        response = client.get(url)
-        data = response.json()
-        ratings_response = RatingsResponse(**data)
-        all_ratings.extend(ratings_response.docs)
-
-        total_count = ratings_response.count
-        while len(all_ratings) < total_count:
-            next_url = f"{url}&limit=100&offset={len(all_ratings)}"
-            response = client.get(next_url)
-            data = response.json()
-            ratings_response = RatingsResponse(**data)
-            all_ratings.extend(ratings_response.docs)
-
-    return all_ratings
+    items = await fetch_paginated(url, max_concurrency=max_concurrency)
+    # One batch validation through a cached TypeAdapter instead of one model at a time
+    return validate_player_ratings(items)
 
 
 # In[ ]:
 
 
-madden_data = get_madden_ratings("m24", "super-bowl")
+madden_data = asyncio.run(get_madden_ratings("m24", "super-bowl"))
 
 
 # In[ ]:
@@ -88,7 +81,7 @@ len(madden_data)
 len(set([player.primaryKey for player in madden_data]))
 
 # Let's convert it to a DataFrame
-madden_df = pl.DataFrame(madden_data)
+madden_df = pl.DataFrame(ratings_to_columns(madden_data))
 
 
 # In[ ]:
@@ -111,6 +104,15 @@ madden_df = madden_df.with_columns(
 madden_df.head()
 
 
+# In[ ]:
+
+
+# Pack every rating/diff attribute into one compact int8 matrix for fast comparisons
+ratings_matrix = RatingsMatrix.from_frame(madden_df, id_column="primaryKey", position_column="position")
+print(f"{len(ratings_matrix)} players x {len(ratings_matrix.attributes)} attributes in {ratings_matrix.nbytes / 1024:.0f} KB")
+ratings_matrix.position_aggregate(["overall_rating", "speed_rating", "awareness_rating"], how="mean")
+
+
 # # NFL Verse Data
 
 # In[ ]:
@@ -156,10 +158,10 @@ def get_nflverse_weekly_rosters_data(year: int):
 # In[ ]:
 
 
-# Create a function to read parquet data from the NFL Verse repo that accepts and argument as 'year'
-def get_nflverse_pbp_data(year: int):
-    url = f'https://github.com/nflverse/nflverse-data/releases/download/pbp/play_by_play_{year}.parquet'
-    df = pl.read_parquet(url)
+# Read play-by-play for a season, optionally only a subset of its ~370 columns.
+# For multi-season or filtered queries use scan_nflverse_pbp directly and collect at the end.
+def get_nflverse_pbp_data(year: int, columns: list[str] | None = None):
+    df = scan_nflverse_pbp(year, columns=columns).collect()
     return df   
 
 
@@ -177,6 +179,16 @@ pbp_df = get_nflverse_pbp_data(2023)
 # In[ ]:
 
 
+# Per-game stat lines and fantasy points for 2021-2024. Weeks are materialized once
+# and only re-scored when nflverse republishes them (new plays or stat corrections).
+fantasy_store = FantasyPointsStore(Path("data/fantasy_points"))
+fantasy_store.update(scan_nflverse_pbp(range(2021, 2025), columns=list(PBP_COLUMNS), season_type="REG"))
+fantasy_points_df = fantasy_store.points([DRAFTKINGS, ESPN_PPR], seasons=[2024])
+
+
+# In[ ]:
+
+
 sorted_headers, sorted_headers_list = get_headers(roster_df)
 
 
@@ -251,171 +263,49 @@ draftkings_df.head()
 # In[ ]:
 
 
-# Create a dictionary for name mapping
-name_mapping = {
-    "Hollywood Brown": "Marquise Brown",
-    "DJ Chark": "DJ Chark Jr.",
-    # Add more mappings as needed
-}
-
-
-# In[ ]:
-
-
-# Function to apply the mapping
-def map_name(name):
-    return name_mapping.get(name, name)
-
-
-# In[ ]:
-
-
-# Apply the mapping to the DraftKings dataframe
-draftkings_df = draftkings_df.with_columns(
-    pl.col('Name').map_elements(map_name).alias('Mapped Name')
-)
-
-
-# In[ ]:
-
-
 draftkings_df.head()
 
 
 # In[ ]:
 
 
-def combine_rankings(draftkings_df: pl.DataFrame, espn_df: pl.DataFrame) -> pl.DataFrame:
-    """
-    Perform a left join on ESPN and DraftKings dataframes based on player name.
-    
-    Args:
-    draftkings_df (pl.DataFrame): DraftKings rankings dataframe
-    espn_df (pl.DataFrame): ESPN rankings dataframe
-
-    
-    Returns:
-    pl.DataFrame: Combined dataframe with ESPN rankings as the base
-    """
-    # Rename columns to avoid conflicts and clarify source
-    draftkings_df = draftkings_df.rename({
-        "ADP": "DraftKings_ADP",
-        "Position": "DraftKings_Position",
-        "Team": "DraftKings_Team"
-    })
-    
-    espn_df = espn_df.rename({
-        "Overall Rank": "ESPN_Rank",
-        "Positional Rank": "ESPN_Positional_Rank",
-        "Salary Cap Value": "ESPN_Salary_Cap_Value"
-    })
-    
-
-    
-    # Perform the left join
-    combined_df = draftkings_df.join(
-        espn_df,
-        left_on="Mapped Name",
-        right_on="Player Name",
-        how="left"
-    )
-    
-    # Drop the duplicate "Name" column from DraftKings
-    # combined_df = combined_df.drop("Name")
-    
-    return combined_df
+# Load the persistent player id crosswalk shared by the combine functions
+crosswalk_path = Path().absolute().parent.parent / 'data' / 'player_crosswalk.parquet'
+crosswalk = PlayerCrosswalk.load(crosswalk_path)
 
-# Example usage:
-# espn_df = pl.read_csv("espn_rankings_sample.csv")
-# draftkings_df = pl.read_csv("draftkings_rankings_sample.csv")
-result = combine_rankings(draftkings_df, espn_df)
-# print(result)
+# Keyed sources and joins are cached by input fingerprint, so only the tables
+# downstream of a changed input are rebuilt and re-written
+derived_tables = DerivedTables(Path().absolute().parent.parent / 'data' / 'derived')
 
 
 # In[ ]:
 
 
-result.write_csv("combined_rankings.csv")
+# Key each source in its own cached step and join them on the crosswalk player key.
+# Only the steps downstream of a changed input are rebuilt, e.g. an ESPN update
+# reuses the keyed DraftKings and Madden tables.
+data_path = Path().absolute().parent.parent / 'data'
+combined_rankings, combined_madden_rankings = derive_combined_rankings(
+    derived_tables,
+    crosswalk,
+    draftkings=data_path / 'DkPreDraftRankings.csv',
+    espn=data_path / 'NFL_Rankings_Complete.csv',
+    madden=df,
+)
+result = combined_rankings.collect()
 
 
 # In[ ]:
 
 
-dk_to_madden_name_mapping = {
-    "Deebo Samuel Sr.": "Deebo Samuel Sr",
-    "Marvin Harrison Jr.": "Marvin Harrison Jr",
-    "Travis Etienne Jr." : "Travis Etienne Jr",
-    "DJ Moore": "D.J. Moore",
-    "DK Metcalf": "D.K. Metcalf",
-    "Michael Pittman Jr.": "Michael Pittman Jr",
-    "Hollywood Brown": "Marquise Brown",
-    "Brian Thomas Jr.": "Brian Thomas Jr",
-    "Brian Robinson Jr.": "Brian Robinson Jr",
-    "Marvin Mims Jr.": "Marvin Mims Jr",
-    "Tyrone Tracy Jr.": "Tyrone Tracy Jr",
-    "DJ Chark": "DJ Chark Jr",
-    "AJ Dillon": "A.J. Dillon",
-    "Chris Rodriguez Jr.": "Chris Rodriguez Jr",
-    "Odell Beckham Jr.": "Odell Beckham Jr",
-    "Michael Penix Jr.": "Michael Penix Jr",
-    "DeMario Douglas": "Demario Douglas",
-    # Add more mappings as needed
-}
-
-def combine_madden_with_rankings(combined_df: pl.DataFrame, madden_df: pl.DataFrame) -> pl.DataFrame:
-    """
-    Perform a left join on the Combined Ranks and Madden dataframes based on player name, team, and position.
-    
-    Args:
-    combined_df (pl.DataFrame): Combined rankings dataframe
-    madden_df (pl.DataFrame): Madden ratings dataframe
-
-    Returns:
-    pl.DataFrame: Combined dataframe with Combined Rankings as the base
-    """
-    # Apply the name mapping to the combined_df
-    combined_df = combined_df.with_columns(
-        pl.when(pl.col("Name").is_in(dk_to_madden_name_mapping.keys()))
-          .then(pl.col("Name").replace(dk_to_madden_name_mapping))
-          .otherwise(pl.col("Name"))
-          .alias("Mapped_Name")
-    )
-
-    # Rename columns to avoid conflicts and clarify source
-    combined_df = combined_df.rename({
-        "Mapped_Name": "Join_Name"
-    })
-    
-    madden_df = madden_df.rename({
-        "fullName": "Join_Name",
-    })   
-
-    # Perform the left join
-    combined_madden_df = combined_df.join(
-        madden_df,
-        on=["Join_Name"],
-        how="left"
-    )
-    
-    # Select only the required columns from madden_df
-    madden_df_selected = combined_madden_df.select([
-        "ID",
-        "Name",
-        "DraftKings_Position",
-        "DraftKings_ADP",
-        "DraftKings_Team",
-        "ESPN_Rank",
-        "ESPN_Positional_Rank",
-        "overallRating"
-    ])    
-    
-    return madden_df_selected
+derived_tables.export(combined_rankings, "combined_rankings.csv")
+crosswalk.save(crosswalk_path)
 
 
 # In[ ]:
 
 
-combined_madden_df_t = combine_madden_with_rankings(result, df)
+combined_madden_df_t = combined_madden_rankings.collect()
 
 
 # In[ ]:
@@ -434,22 +324,8 @@ combined_madden_df_t.filter(pl.col("Name").str.contains("DeMario"))
 # In[ ]:
 
 
-combined_madden_df_t.write_csv("combined_madden_rankings.csv")
-
-
-# In[ ]:
-
-
-# Create a Dictionary between the 'fullName' and 'Name' columns
-dk_to_madden_name_mapping = {
-    "Deebo Samuel Sr.": "Deebo Samuel Sr",
-    "Marvin Harrison Jr.": "Marvin Harrison Jr",
-    # Add more mappings as needed
-}
-
-# Create a Function to apply the mapping
-def map_name(name):
-    return name_mapping.get(name, name)
+derived_tables.export(combined_madden_rankings, "combined_madden_rankings.csv")
+crosswalk.save(crosswalk_path)
 
 
 # In[ ]:
@@ -488,7 +364,6 @@ madden_df.filter(pl.col("fullNameForSearch").str.contains("Marvin Harrison"))
 # In[ ]:
 
 
-import httpx
 from pydantic import BaseModel, Field
 from typing import List, Optional, Union, Dict
 
@@ -564,94 +439,28 @@ class RatingsResponse(BaseModel):
     items: List[PlayerRating]
     totalItems: int
 
-def get_madden_ratings(locale: str = "en") -> List[PlayerRating]:
+async def get_madden_ratings(locale: str = "en", max_concurrency: int = 8) -> List[PlayerRating]:
     url = f"{BASE_URL}?locale={locale}"
-    all_ratings = []
-
-    with httpx.Client() as client:
-        response = client.get(url)
-        response.raise_for_status()
-        data = response.json()
-        ratings_response = RatingsResponse(**data)
-        all_ratings.extend(ratings_response.items)
-
-        total_count = ratings_response.totalItems
-        while len(all_ratings) < total_count:
-            next_url = f"{url}&limit=100&offset={len(all_ratings)}"
-            response = client.get(next_url)
-            response.raise_for_status()
-            data = response.json()
-            ratings_response = RatingsResponse(**data)
-            all_ratings.extend(ratings_response.items)
+    items = await fetch_paginated(url, max_concurrency=max_concurrency)
+    all_ratings = [PlayerRating.model_validate(item) for item in items]
 
     print(f"Total items fetched: {len(all_ratings)}")
-    print(f"Expected total items: {total_count}")
 
     return all_ratings
 
-def create_madden_nfl_dataframe():
-    ratings = get_madden_ratings()
-    
-    # Convert Pydantic models to dictionaries
-    data = [rating.dict() for rating in ratings]
-    
-    # Create DataFrame
-    df = pl.DataFrame(data)
-    
-    # Add fullName column
-    df = df.with_columns([
-        (pl.col("firstName") + " " + pl.col("lastName")).alias("fullName")
-    ])
-    
-    # Flatten nested structures
-    df = df.with_columns([
-        pl.col("team").struct.field("id").alias("team_id"),
-        pl.col("team").struct.field("label").alias("team_label"),
-        pl.col("team").struct.field("imageUrl").alias("team_imageUrl"),
-        pl.col("team").struct.field("isPopular").alias("team_isPopular"),
-        pl.col("position").struct.field("id").alias("position_id"),
-        pl.col("position").struct.field("shortLabel").alias("position_shortLabel"),
-        pl.col("position").struct.field("label").alias("position_label"),
-        pl.col("position").struct.field("positionType").struct.field("id").alias("position_type_id"),
-        pl.col("position").struct.field("positionType").struct.field("name").alias("position_type_name"),
-        pl.col("iteration").struct.field("id").alias("iteration_id"),
-        pl.col("iteration").struct.field("label").alias("iteration_label"),
-    ])
-
-    # Flatten stats
-    stat_columns = df.select(pl.col("stats")).to_series().struct.fields
-    for stat in stat_columns:
-        df = df.with_columns([
-            pl.col("stats").struct.field(stat).struct.field("value").alias(f"stat_{stat}")
-        ])
-
-    # Drop original nested columns
-    df = df.drop(["team", "position", "iteration", "stats", "playerAbilities"])
-
-    # Convert data types
-    date_columns = ["birthdate"]
-    int_columns = ["id", "overallRating", "height", "weight", "handedness", "age", "jerseyNum", "yearsPro", "team_id"]
-    float_columns = [col for col in df.columns if col.startswith("stat_") and col != "stat_runningStyle"]
-    bool_columns = ["team_isPopular"]
-
-    for col in date_columns:
-        df = df.with_columns(pl.col(col).str.to_date("%Y-%m-%d").alias(col))
-
-    for col in int_columns:
-        df = df.with_columns(pl.col(col).cast(pl.Int64))
-
-    for col in float_columns:
-        df = df.with_columns(pl.col(col).cast(pl.Float64))
-
-    for col in bool_columns:
-        df = df.with_columns(pl.col(col).cast(pl.Boolean))
+async def create_madden_nfl_dataframe():
+    url = f"{BASE_URL}?locale=en"
+    items = await fetch_paginated(url)
+
+    # Decode straight into a typed frame and unnest everything in one projection
+    df = decode_madden_ratings(items, stat_format="stat_{}")
 
     print(f"DataFrame shape: {df.shape}")
     return df
 
 # Example usage
 if __name__ == "__main__":
-    df = create_madden_nfl_dataframe()
+    df = asyncio.run(create_madden_nfl_dataframe())
 
 
 # In[ ]:
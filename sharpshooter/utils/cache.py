@@ -0,0 +1,342 @@
+import asyncio
+import gzip
+import hashlib
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Coroutine, Dict, Optional, TypeVar
+
+import httpx
+from pydantic import BaseModel, Field
+
+from .tracing import current_span
+
+
+def _default_cache_dir() -> Path:
+    return Path(os.getenv("SHARPSHOOTER_CACHE_DIR", Path.home() / ".cache" / "sharpshooter" / "http"))
+
+
+# Bodies that are already compressed are stored as-is, so they can also be
+# read (or scanned lazily) straight from disk.
+_PRECOMPRESSED_SUFFIXES = (".parquet", ".gz", ".zip", ".zst")
+
+T = TypeVar("T")
+
+_sync_loop: Optional[asyncio.AbstractEventLoop] = None
+_sync_loop_lock = threading.Lock()
+
+
+def _run_sync(coroutine: Coroutine[Any, Any, T]) -> T:
+    """
+    Run ``coroutine`` from synchronous code on a long-lived background loop.
+
+    Synchronous callers thereby share that loop's pooled connections, and it
+    works whether or not the calling thread is already running a loop. The
+    caller's context (e.g. the current span) carries over to the coroutine.
+    """
+    global _sync_loop
+    with _sync_loop_lock:
+        if _sync_loop is None:
+            _sync_loop = asyncio.new_event_loop()
+            threading.Thread(target=_sync_loop.run_forever, name="sharpshooter-http", daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(coroutine, _sync_loop).result()
+
+
+class HTTPCacheConfig(BaseModel):
+    cache_dir: Path = Field(default_factory=_default_cache_dir)
+    max_bytes: int = Field(default=4 * 1024**3)
+    compress_level: int = Field(default=6)
+    timeout: float = Field(default=120.0)
+
+
+class CacheStats(BaseModel):
+    hits: int = Field(default=0)
+    misses: int = Field(default=0)
+    stale_hits: int = Field(default=0)
+    evictions: int = Field(default=0)
+    bytes_downloaded: int = Field(default=0)
+    bytes_saved: int = Field(default=0)
+
+
+class HTTPCache:
+    """
+    On-disk, URL-keyed cache for external downloads, revalidated with ETag /
+    Last-Modified.
+
+    Each lookup sends a conditional request. A ``304 Not Modified`` is served
+    from disk, so only changed payloads are transferred. Bodies are stored
+    gzip-compressed unless they already are (parquet, gz, zip). Once the cache
+    grows past ``max_bytes``, least recently used entries are evicted.
+    Responses with neither an ETag nor a Last-Modified header cannot be
+    revalidated, so ``get`` does not store them.
+
+    Requests go through an ``HTTPClientManager`` (the shared one by default),
+    so they get its retries, rate limiting and circuit breaker. Disk and index
+    work of the async methods runs in a worker thread, off the event loop.
+    """
+
+    def __init__(self, config: Optional[HTTPCacheConfig] = None):
+        self.config = config or HTTPCacheConfig()
+        self.config.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.config.cache_dir / "index.sqlite", check_same_thread=False)
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                file_name TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                is_compressed INTEGER NOT NULL,
+                stored_bytes INTEGER NOT NULL,
+                body_bytes INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._db.commit()
+
+    def _entry(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT file_name, etag, last_modified, is_compressed, body_bytes FROM entries WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None or not (self.config.cache_dir / row[0]).exists():
+            return None
+        keys = ("file_name", "etag", "last_modified", "is_compressed", "body_bytes")
+        return dict(zip(keys, row))
+
+    @staticmethod
+    def _conditional_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        if entry is None:
+            return {}
+        headers = {}
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def _read(self, entry: Dict[str, Any]) -> bytes:
+        body = (self.config.cache_dir / entry["file_name"]).read_bytes()
+        return gzip.decompress(body) if entry["is_compressed"] else body
+
+    def _touch(self, url: str) -> None:
+        with self._lock:
+            self._db.execute("UPDATE entries SET last_access = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
+
+    def _store(self, url: str, response: httpx.Response, allow_compression: bool = True) -> None:
+        body = response.content
+        is_compressed = allow_compression and not httpx.URL(url).path.endswith(_PRECOMPRESSED_SUFFIXES)
+        stored = gzip.compress(body, compresslevel=self.config.compress_level) if is_compressed else body
+        file_name = hashlib.sha256(url.encode()).hexdigest()
+        # A unique temporary name, so concurrent stores of one URL cannot clobber each other's partial file.
+        fd, tmp_name = tempfile.mkstemp(dir=self.config.cache_dir, prefix=f"{file_name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                tmp_file.write(stored)
+            os.replace(tmp_name, self.config.cache_dir / file_name)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    file_name,
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                    int(is_compressed),
+                    len(stored),
+                    len(body),
+                    time.time(),
+                ),
+            )
+            self._db.commit()
+        self._evict(keep_url=url)
+
+    def _discard(self, url: str) -> None:
+        with self._lock:
+            row = self._db.execute("SELECT file_name FROM entries WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return
+            (self.config.cache_dir / row[0]).unlink(missing_ok=True)
+            self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+            self._db.commit()
+
+    def _evict(self, keep_url: str) -> None:
+        with self._lock:
+            total_bytes = self._db.execute("SELECT COALESCE(SUM(stored_bytes), 0) FROM entries").fetchone()[0]
+            if total_bytes <= self.config.max_bytes:
+                return
+            rows = self._db.execute(
+                "SELECT url, file_name, stored_bytes FROM entries WHERE url != ? ORDER BY last_access",
+                (keep_url,),
+            ).fetchall()
+            for url, file_name, stored_bytes in rows:
+                if total_bytes <= self.config.max_bytes:
+                    break
+                (self.config.cache_dir / file_name).unlink(missing_ok=True)
+                self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+                total_bytes -= stored_bytes
+                self.stats.evictions += 1
+            self._db.commit()
+
+    async def _revalidate(self, url: str, entry: Optional[Dict[str, Any]], manager: Any) -> Optional[httpx.Response]:
+        """Send a conditional GET; returns None on a network error if a cached copy exists."""
+        if manager is None:
+            from .utils import get_client_manager
+
+            manager = get_client_manager()
+        try:
+            return await manager.request(
+                "GET", url, headers=self._conditional_headers(entry), timeout=self.config.timeout
+            )
+        except httpx.TransportError:
+            if entry is None:
+                raise
+            return None
+
+    def _resolve(
+        self, url: str, entry: Optional[Dict[str, Any]], response: Optional[httpx.Response]
+    ) -> Optional[Dict[str, Any]]:
+        """Record the outcome of a conditional request; returns the entry to serve."""
+        if response is None:
+            # Network failure with a cached copy on disk: serve it stale.
+            logging.warning(f"Serving stale cached copy of {url}")
+            self.stats.stale_hits += 1
+            self._touch(url)
+            return entry
+        if response.status_code == httpx.codes.NOT_MODIFIED and entry is not None:
+            self.stats.hits += 1
+            self.stats.bytes_saved += entry["body_bytes"]
+            self._touch(url)
+            return entry
+        self.stats.misses += 1
+        self.stats.bytes_downloaded += len(response.content)
+        span = current_span()
+        if span is not None:
+            span.bytes_in += len(response.content)
+        return None
+
+    def _body(self, url: str, entry: Optional[Dict[str, Any]], response: Optional[httpx.Response]) -> bytes:
+        cached_entry = self._resolve(url, entry, response)
+        if cached_entry is not None:
+            return self._read(cached_entry)
+        if "ETag" in response.headers or "Last-Modified" in response.headers:
+            self._store(url, response)
+        else:
+            # Nothing to revalidate against: a stored copy would be downloaded again anyway.
+            self._discard(url)
+        return response.content
+
+    def _path(self, url: str, entry: Optional[Dict[str, Any]], response: Optional[httpx.Response]) -> Path:
+        cached_entry = self._resolve(url, entry, response)
+        if cached_entry is None:
+            # Kept even without validators, since the caller reads the file from disk.
+            self._store(url, response, allow_compression=False)
+            cached_entry = self._entry(url)
+        return self.config.cache_dir / cached_entry["file_name"]
+
+    def _path_entry(self, url: str) -> Optional[Dict[str, Any]]:
+        entry = self._entry(url)
+        return None if entry is not None and entry["is_compressed"] else entry
+
+    def get(self, url: str, manager: Any = None) -> bytes:
+        """
+        Return the body at ``url``, transferring it only if it changed.
+
+        Args:
+            url (str): The URL to fetch.
+            manager (Optional[HTTPClientManager]): The pooled client manager to
+                use. Defaults to the shared manager.
+
+        Returns:
+            bytes: The (decompressed) response body.
+
+        Raises:
+            httpx.RequestError: If the request fails and nothing is cached.
+            httpx.HTTPStatusError: If the response is an error status code.
+        """
+        entry = self._entry(url)
+        response = _run_sync(self._revalidate(url, entry, manager))
+        return self._body(url, entry, response)
+
+    async def aget(self, url: str, manager: Any = None) -> bytes:
+        """
+        Async variant of ``get``.
+
+        Args:
+            url (str): The URL to fetch.
+            manager (Optional[HTTPClientManager]): The pooled client manager to
+                use. Defaults to the shared manager.
+
+        Returns:
+            bytes: The (decompressed) response body.
+        """
+        entry = await asyncio.to_thread(self._entry, url)
+        response = await self._revalidate(url, entry, manager)
+        return await asyncio.to_thread(self._body, url, entry, response)
+
+    def get_path(self, url: str, manager: Any = None) -> Path:
+        """
+        Return a local, uncompressed file holding the body at ``url``.
+
+        Use this for files that are read straight from disk, such as parquet
+        files scanned with polars.
+
+        Args:
+            url (str): The URL to fetch.
+            manager (Optional[HTTPClientManager]): The pooled client manager to
+                use. Defaults to the shared manager.
+
+        Returns:
+            Path: Path of the cached file.
+        """
+        entry = self._path_entry(url)
+        response = _run_sync(self._revalidate(url, entry, manager))
+        return self._path(url, entry, response)
+
+    async def aget_path(self, url: str, manager: Any = None) -> Path:
+        """Async variant of ``get_path``."""
+        entry = await asyncio.to_thread(self._path_entry, url)
+        response = await self._revalidate(url, entry, manager)
+        return await asyncio.to_thread(self._path, url, entry, response)
+
+    def clear(self) -> None:
+        with self._lock:
+            for (file_name,) in self._db.execute("SELECT file_name FROM entries").fetchall():
+                (self.config.cache_dir / file_name).unlink(missing_ok=True)
+            self._db.execute("DELETE FROM entries")
+            self._db.commit()
+
+    def close(self) -> None:
+        self._db.close()
+
+
+_http_cache: Optional[HTTPCache] = None
+
+
+def get_http_cache(config: Optional[HTTPCacheConfig] = None) -> HTTPCache:
+    """
+    Return the process-wide download cache, creating it on first use.
+
+    Args:
+        config (Optional[HTTPCacheConfig]): Replaces the current cache with one
+            using this configuration.
+
+    Returns:
+        HTTPCache: The shared cache.
+    """
+    global _http_cache
+    if _http_cache is None or config is not None:
+        _http_cache = HTTPCache(config)
+    return _http_cache
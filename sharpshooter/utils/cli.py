@@ -0,0 +1,283 @@
+"""
+``sharpshooter`` command line entry point.
+
+Only the standard library is imported at startup. Each subcommand imports
+the modules it needs (polars, httpx, sqlalchemy, ...) when it runs, so short
+cron jobs and ``--help`` do not pay for the whole package. Use
+``sharpshooter importtime`` to check the import cost against its budget.
+"""
+
+import argparse
+import logging
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Modules imported by each subcommand, and the cumulative import time each may
+# take (``-X importtime``, milliseconds) on a warm filesystem cache.
+IMPORT_BUDGETS_MS: Dict[str, float] = {
+    "sharpshooter.utils.cli": 40.0,
+    "sharpshooter.utils.ingest": 1200.0,
+    "sharpshooter.utils.madden": 800.0,
+    "sharpshooter.utils.draftkings": 800.0,
+    "sharpshooter.utils.rankings": 600.0,
+}
+
+_IMPORT_MARKER = "-- sharpshooter importtime --"
+_IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure_import_time(module: str) -> Tuple[float, List[Tuple[str, float]]]:
+    """
+    Import ``module`` in a fresh interpreter under ``-X importtime``.
+
+    Args:
+        module (str): Dotted module name.
+
+    Returns:
+        Tuple[float, List[Tuple[str, float]]]: The total import time in
+        milliseconds, and the cumulative time of every top-level package it
+        pulled in (``polars``, ``httpx``, ...), slowest first.
+    """
+    import subprocess
+
+    # Interpreter startup (site, encodings, ...) is logged before the marker
+    # and is not part of the module's cost.
+    code = f"import sys; sys.stderr.write('{_IMPORT_MARKER}\\n'); import {module}"
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True
+    )
+    lines = completed.stderr.splitlines()
+    total = 0.0
+    packages: Dict[str, float] = {}
+    for line in lines[lines.index(_IMPORT_MARKER) + 1 :]:
+        match = _IMPORT_TIME_LINE.match(line)
+        if match is None:
+            continue
+        cumulative, depth, name = int(match.group(2)) / 1000, len(match.group(3)), match.group(4)
+        if depth == 1:
+            total += cumulative
+        if "." not in name:
+            packages[name] = max(packages.get(name, 0.0), cumulative)
+    return total, sorted(packages.items(), key=lambda item: item[1], reverse=True)
+
+
+def _importtime(args: argparse.Namespace) -> int:
+    modules = args.modules or list(IMPORT_BUDGETS_MS)
+    budgets = {module: args.budget_ms or IMPORT_BUDGETS_MS.get(module, 500.0) for module in modules}
+    over_budget = []
+    for module, budget in budgets.items():
+        total, packages = measure_import_time(module)
+        status = "ok" if total <= budget else "OVER BUDGET"
+        print(f"{module}: {total:.1f} ms (budget {budget:.0f} ms) {status}")
+        for name, elapsed in packages[: args.top]:
+            print(f"    {elapsed:8.1f} ms  {name}")
+        if total > budget:
+            over_budget.append(module)
+    return 1 if over_budget else 0
+
+
+def _ingest(args: argparse.Namespace) -> int:
+    from datetime import datetime
+
+    from .ingest import (
+        SEASONAL_DATA_TYPES,
+        STATIC_DATA_TYPES,
+        DataSourceConfig,
+        DBConfig,
+        NFLDataManager,
+        NFLVerseDataSource,
+        PostgresDataStorage,
+        nflverse_jobs,
+    )
+    from .tracing import TracerConfig, get_tracer
+
+    current_year = datetime.now().year
+    years = args.years or [current_year, current_year - 1, current_year - 2]
+    jobs = nflverse_jobs(
+        years,
+        data_types=args.data_types or SEASONAL_DATA_TYPES,
+        static_data_types=() if args.no_static else STATIC_DATA_TYPES,
+        schema_name=args.schema,
+    )
+    tracer = get_tracer(
+        TracerConfig(profile_stage=args.profile_stage, profile_memory=args.profile_memory, profile_dir=args.profile_dir)
+    )
+    source_config = DataSourceConfig(batch_rows=args.batch_rows) if args.batch_rows else DataSourceConfig()
+    manager = NFLDataManager(NFLVerseDataSource(source_config), PostgresDataStorage(DBConfig.from_env()))
+    results = manager.fetch_and_store_many(
+        jobs, max_workers=args.workers, max_concurrent_writes=args.writes, stream=args.stream
+    )
+
+    for total in tracer.summary():
+        logging.info(
+            f"{total['stage']}: {total['seconds']:.1f}s over {total['runs']} spans "
+            f"({total['rows']} rows, {total['retries']} retries)"
+        )
+    if args.metrics_jsonl:
+        tracer.write_jsonl(args.metrics_jsonl)
+    if args.metrics_prom:
+        tracer.write_prometheus(args.metrics_prom)
+    return 1 if any(result.status == "failed" for result in results) else 0
+
+
+def _refresh_ratings(args: argparse.Namespace) -> int:
+    import asyncio
+
+    from .madden import fetch_madden_ratings
+    from .utils import get_client_manager
+
+    ratings = asyncio.run(fetch_madden_ratings(args.iteration, locale=args.locale))
+    get_client_manager().rate_limiter.log_report()
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output.with_suffix(".tmp")
+    ratings.write_parquet(tmp_path)
+    tmp_path.replace(output)
+    logging.info(f"Wrote {ratings.height} ratings for {args.iteration} to {output}")
+    if args.history:
+        from .ratings_history import RatingsHistory
+
+        RatingsHistory(args.history).append(ratings, args.iteration)
+
+    if args.table:
+        from sqlalchemy import create_engine
+
+        from .ingest import DBConfig
+        from .postgres import upsert_dataframe
+
+        schema, table_name = args.table.split(".", 1)
+        upsert_dataframe(ratings, create_engine(DBConfig.from_env().url), schema, table_name, key_columns=["id"])
+    return 0
+
+
+def _poll_draftables(args: argparse.Namespace) -> int:
+    import asyncio
+
+    import polars as pl
+
+    from .draftkings import DraftablesPoller
+    from .utils import get_client_manager
+
+    poller = DraftablesPoller(args.draft_group_ids)
+    state = Path(args.state) if args.state else None
+    if state is not None and state.exists():
+        # Resume from the last run's snapshot so a cron-driven poll only reports changes.
+        snapshot = pl.read_parquet(state).filter(pl.col("draft_group_id").is_in(args.draft_group_ids))
+        poller.snapshots = {
+            key[0]: frame for key, frame in snapshot.partition_by("draft_group_id", as_dict=True).items()
+        }
+
+    async def run() -> None:
+        async for delta in poller.run(interval=args.interval, iterations=args.iterations):
+            if args.output:
+                with open(args.output, "ab") as file:
+                    delta.write_ndjson(file)
+            else:
+                sys.stdout.write(delta.write_ndjson())
+                sys.stdout.flush()
+            if state is not None:
+                tmp_path = state.with_suffix(".tmp")
+                poller.snapshot().write_parquet(tmp_path)
+                tmp_path.replace(state)
+
+    asyncio.run(run())
+    get_client_manager().rate_limiter.log_report()
+    return 0
+
+
+def _combine(args: argparse.Namespace) -> int:
+    from .crosswalk import PlayerCrosswalk
+    from .derived import DerivedTables
+    from .rankings import derive_combined_rankings
+
+    data_dir = Path(args.data_dir)
+    output_dir = Path(args.output_dir)
+    crosswalk_path = data_dir / "player_crosswalk.parquet"
+    crosswalk = PlayerCrosswalk.load(crosswalk_path)
+    tables = DerivedTables(data_dir / "derived")
+    combined, combined_madden = derive_combined_rankings(
+        tables,
+        crosswalk,
+        draftkings=data_dir / "DkPreDraftRankings.csv",
+        espn=data_dir / "NFL_Rankings_Complete.csv",
+        madden=Path(args.madden) if args.madden else data_dir / "madden_ratings.parquet",
+    )
+    tables.export(combined, output_dir / "combined_rankings.csv")
+    tables.export(combined_madden, output_dir / "combined_madden_rankings.csv")
+    crosswalk.save(crosswalk_path)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="sharpshooter", description="Sharpshooter data refresh jobs.")
+    parser.add_argument("--log-level", default="INFO", help="Logging level (default: INFO).")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="Load nflverse releases into PostgreSQL (DB_* environment variables).")
+    ingest.add_argument("--years", type=int, nargs="+", help="Seasons to load (default: current and previous two).")
+    ingest.add_argument("--data-types", nargs="+", help="Seasonal data types to load (default: all).")
+    ingest.add_argument("--no-static", action="store_true", help="Skip players and officials.")
+    ingest.add_argument("--schema", default="raw", help="Target schema (default: raw).")
+    ingest.add_argument("--workers", type=int, default=4, help="Jobs downloading at once (default: 4).")
+    ingest.add_argument("--writes", type=int, default=1, help="Jobs writing at once (default: 1).")
+    ingest.add_argument(
+        "--stream", action="store_true", help="Decode and write each file in record batches, with flat memory."
+    )
+    ingest.add_argument("--batch-rows", type=int, help="Rows per record batch when streaming (default: 10000).")
+    ingest.add_argument("--metrics-jsonl", help="Append the run's stage spans to this JSON lines file.")
+    ingest.add_argument("--metrics-prom", help="Write per-stage metrics in Prometheus text format to this file.")
+    ingest.add_argument("--profile-stage", help='Profile one stage with cProfile, e.g. "decode" or "write".')
+    ingest.add_argument("--profile-memory", action="store_true", help="Also trace the profiled stage's allocations.")
+    ingest.add_argument("--profile-dir", default="profiles", help="Where profiles are written (default: profiles).")
+    ingest.set_defaults(handler=_ingest)
+
+    refresh = commands.add_parser("refresh", help="Refresh an external source.").add_subparsers(
+        dest="source", required=True
+    )
+    ratings = refresh.add_parser("ratings", help="Fetch one Madden ratings iteration.")
+    ratings.add_argument("--iteration", required=True, help='Ratings iteration, e.g. "21-divisional-round".')
+    ratings.add_argument("--locale", default="en")
+    ratings.add_argument("--output", default="data/madden_ratings.parquet", help="Parquet file to write.")
+    ratings.add_argument(
+        "--history", help='Also store the iteration\'s changes in this ratings history, e.g. "data/madden_history".'
+    )
+    ratings.add_argument("--table", help='Also upsert into this PostgreSQL table, e.g. "raw.m25__player_ratings".')
+    ratings.set_defaults(handler=_refresh_ratings)
+
+    poll = commands.add_parser("poll", help="Poll a live source for changes.").add_subparsers(
+        dest="source", required=True
+    )
+    draftables = poll.add_parser("draftables", help="Poll DraftKings draft groups and emit changed draftables.")
+    draftables.add_argument("draft_group_ids", type=int, nargs="+", metavar="DRAFT_GROUP_ID")
+    draftables.add_argument("--interval", type=float, default=180.0, help="Seconds between polls (default: 180).")
+    draftables.add_argument("--iterations", type=int, default=1, help="Number of polls (default: 1).")
+    draftables.add_argument("--state", help="Parquet snapshot kept between runs, so only changes are emitted.")
+    draftables.add_argument("--output", help="Append deltas to this NDJSON file instead of stdout.")
+    draftables.set_defaults(handler=_poll_draftables)
+
+    combine = commands.add_parser("combine", help="Rebuild the combined rankings CSVs from changed inputs only.")
+    combine.add_argument(
+        "--data-dir", default="data", help="Rankings CSVs, crosswalk and derived tables (default: data)."
+    )
+    combine.add_argument("--madden", help="Madden ratings parquet (default: DATA_DIR/madden_ratings.parquet).")
+    combine.add_argument("--output-dir", default=".", help="Where the combined CSVs are written (default: .).")
+    combine.set_defaults(handler=_combine)
+
+    importtime = commands.add_parser("importtime", help="Check subcommand import times against their budget.")
+    importtime.add_argument("modules", nargs="*", metavar="MODULE", help="Modules to check (default: all budgeted).")
+    importtime.add_argument("--budget-ms", type=float, help="Budget overriding IMPORT_BUDGETS_MS.")
+    importtime.add_argument("--top", type=int, default=5, help="Slowest imports listed per module (default: 5).")
+    importtime.set_defaults(handler=_importtime)
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s - %(levelname)s - %(message)s")
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
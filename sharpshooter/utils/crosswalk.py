@@ -0,0 +1,192 @@
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import polars as pl
+
+from .derived import frame_fingerprint
+from .names import NameMatchResult, match_players, normalize_position, normalize_team
+from .postgres import qualified_name, upsert_dataframe
+
+# Source id columns tracked by the crosswalk and their types.
+CROSSWALK_ID_COLUMNS: Dict[str, pl.DataType] = {
+    "dk_player_id": pl.Int64,  # DraftKings playerId
+    "dk_player_dk_id": pl.Int64,  # DraftKings playerDkId (rankings "ID")
+    "madden_id": pl.Int64,  # EA drop-api id
+    "madden_primary_key": pl.Int64,  # Madden 24 ratings primaryKey
+    "gsis_id": pl.String,  # nflverse
+    "espn_name": pl.String,  # ESPN rankings have no player id
+}
+
+CROSSWALK_SCHEMA: Dict[str, pl.DataType] = {
+    "player_key": pl.Int64,
+    "name": pl.String,
+    "position": pl.String,
+    "team": pl.String,
+    **CROSSWALK_ID_COLUMNS,
+    "updated_at": pl.Datetime("us"),
+}
+
+
+class PlayerCrosswalk:
+    """
+    Persistent mapping from each source's player id to one integer ``player_key``.
+
+    The crosswalk is built incrementally: ``update`` only name-matches source
+    ids it has not seen before, and players it cannot match get a new key.
+    Once a source is attached with ``attach``, joins between sources are
+    integer joins on ``player_key`` that stay valid across seasons.
+
+    Example:
+        >>> crosswalk = PlayerCrosswalk.load("player_crosswalk.parquet")
+        >>> crosswalk.update(draftkings_df, ids={"dk_player_dk_id": "ID"}, name_column="Name",
+        ...                  position_column="Position", team_column="Team")
+        >>> crosswalk.save("player_crosswalk.parquet")
+        >>> draftkings_df = crosswalk.attach(draftkings_df, "dk_player_dk_id", "ID")
+    """
+
+    def __init__(self, frame: Optional[pl.DataFrame] = None):
+        self.frame = pl.DataFrame(schema=CROSSWALK_SCHEMA) if frame is None else frame.cast(CROSSWALK_SCHEMA)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "PlayerCrosswalk":
+        """Load a crosswalk from parquet, starting empty if the file does not exist."""
+        path = Path(path)
+        if not path.exists():
+            logging.info(f"No crosswalk at {path}, starting a new one")
+            return cls()
+        return cls(pl.read_parquet(path))
+
+    def save(self, path: Union[str, Path]) -> None:
+        path = Path(path)
+        tmp_path = path.with_suffix(".tmp")
+        self.frame.write_parquet(tmp_path)
+        tmp_path.replace(path)
+        logging.info(f"Saved {self.frame.height} crosswalk rows to {path}")
+
+    @classmethod
+    def from_postgres(cls, engine: Any, schema: str = "ref", table_name: str = "player_crosswalk") -> "PlayerCrosswalk":
+        """Load a crosswalk previously written with ``to_postgres``."""
+        frame = pl.read_database(f"SELECT * FROM {qualified_name(schema, table_name)}", engine)
+        return cls(frame.select(list(CROSSWALK_SCHEMA)))
+
+    def to_postgres(self, engine: Any, schema: str = "ref", table_name: str = "player_crosswalk") -> int:
+        """Upsert the changed crosswalk rows into PostgreSQL, keyed by ``player_key``."""
+        return upsert_dataframe(
+            self.frame, engine, schema, table_name, key_columns=["player_key"], exclude_from_hash=("updated_at",)
+        )
+
+    def update(
+        self,
+        df: pl.DataFrame,
+        ids: Dict[str, str],
+        name_column: str,
+        position_column: Optional[str] = None,
+        team_column: Optional[str] = None,
+        min_similarity: float = 0.6,
+    ) -> NameMatchResult:
+        """
+        Add a source's players to the crosswalk.
+
+        The first entry of ``ids`` is the source's primary id. Rows whose
+        primary id is already in the crosswalk only fill in missing ids and
+        refresh team and position. New ids are name-matched (see
+        ``match_players``) against crosswalk players that do not have one yet,
+        blocked by position and team when given. Players that still do not
+        match get a new ``player_key``.
+
+        Args:
+            df (pl.DataFrame): Source frame, one row per player.
+            ids (Dict[str, str]): Crosswalk id column -> column in ``df``, e.g.
+                ``{"dk_player_id": "playerId", "dk_player_dk_id": "playerDkId"}``.
+            name_column (str): Player name column in ``df``.
+            position_column (Optional[str]): Position column in ``df``.
+            team_column (Optional[str]): Team abbreviation column in ``df``.
+            min_similarity (float): Minimum trigram similarity for fuzzy matches.
+
+        Returns:
+            NameMatchResult: The name matching outcome for the new ids.
+        """
+        unknown = set(ids) - set(CROSSWALK_ID_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown crosswalk id columns: {sorted(unknown)}")
+        primary = next(iter(ids))
+
+        source = (
+            df.select(
+                *(pl.col(column).cast(CROSSWALK_ID_COLUMNS[id_column]).alias(id_column) for id_column, column in ids.items()),
+                pl.col(name_column).cast(pl.String).alias("name"),
+                (normalize_position(pl.col(position_column)) if position_column else pl.lit(None, pl.String)).alias("position"),
+                (normalize_team(pl.col(team_column)) if team_column else pl.lit(None, pl.String)).alias("team"),
+            )
+            .drop_nulls(primary)
+            .unique(subset=primary, keep="last", maintain_order=True)
+        )
+        known_keys = self.frame.select(primary, "player_key").drop_nulls(primary)
+        known = source.join(known_keys, on=primary, how="inner")
+        new = source.join(known_keys, on=primary, how="anti")
+
+        candidates = self.frame.filter(pl.col(primary).is_null())
+        if candidates.is_empty():
+            result = NameMatchResult(
+                matches=pl.DataFrame(schema={"left_id": source.schema[primary], "right_id": pl.Int64}), unmatched=new
+            )
+        else:
+            block_on = [column for column, given in (("position", position_column), ("team", team_column)) if given]
+            result = match_players(
+                new,
+                candidates,
+                left_name="name",
+                right_name="name",
+                left_id=primary,
+                right_id="player_key",
+                block_on=block_on,
+                min_similarity=min_similarity,
+            )
+        matched = new.join(
+            result.matches.select(pl.col("left_id").alias(primary), pl.col("right_id").alias("player_key")), on=primary
+        )
+        next_key = (self.frame["player_key"].max() or 0) + 1
+        added = result.unmatched.with_columns((pl.int_range(pl.len(), dtype=pl.Int64) + next_key).alias("player_key"))
+
+        updated_at = pl.lit(datetime.now(), pl.Datetime("us"))
+        changes = pl.concat([known, matched, added], how="diagonal_relaxed").with_columns(updated_at.alias("updated_at"))
+        # Existing ids and names win over the source's; team and position take the latest non-null value.
+        self.frame = (
+            pl.concat([self.frame, changes], how="diagonal_relaxed")
+            .group_by("player_key", maintain_order=True)
+            .agg(
+                pl.col("name").drop_nulls().first(),
+                pl.col("position", "team").drop_nulls().last(),
+                pl.col(list(CROSSWALK_ID_COLUMNS)).drop_nulls().first(),
+                pl.col("updated_at").max(),
+            )
+            .select(list(CROSSWALK_SCHEMA))
+            .cast(CROSSWALK_SCHEMA)
+        )
+        logging.info(
+            f"Crosswalk update for {primary}: {known.height} known, {matched.height} matched, {added.height} added"
+        )
+        return result
+
+    def fingerprint(self, id_column: str) -> str:
+        """Content fingerprint of one source's id -> ``player_key`` mapping, for ``DerivedTables`` state."""
+        return frame_fingerprint(self.frame.select(id_column, "player_key").drop_nulls(id_column).sort(id_column))
+
+    def attach(self, df: pl.DataFrame, id_column: str, source_column: str) -> pl.DataFrame:
+        """
+        Add the ``player_key`` column to a source frame.
+
+        Args:
+            df (pl.DataFrame): Source frame.
+            id_column (str): Crosswalk id column for the source, e.g. ``"madden_id"``.
+            source_column (str): Column in ``df`` holding that id.
+
+        Returns:
+            pl.DataFrame: ``df`` with a nullable ``player_key`` column.
+        """
+        keys = self.frame.select(pl.col(id_column).alias(source_column), "player_key").drop_nulls(source_column)
+        return df.join(
+            keys.with_columns(pl.col(source_column).cast(df.schema[source_column])), on=source_column, how="left"
+        )
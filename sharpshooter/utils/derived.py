@@ -0,0 +1,184 @@
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence, Union
+
+import polars as pl
+
+
+def frame_fingerprint(df: pl.DataFrame) -> str:
+    """
+    Content fingerprint of a frame: its schema and every row, in order.
+
+    Row hashes are only stable within a polars version, so the version is
+    part of the fingerprint and an upgrade invalidates everything once.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{pl.__version__}|{list(df.schema.items())}|{df.height}".encode())
+    if df.width:
+        digest.update(df.hash_rows(seed=0).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def file_fingerprint(path: Union[str, Path], chunk_size: int = 1024 * 1024) -> str:
+    """Content fingerprint of a file's bytes."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DerivedTable:
+    """
+    A pipeline input or intermediate: its content fingerprint and a way to load it.
+
+    The frame is only read when a downstream step actually has to be rebuilt.
+    """
+
+    def __init__(self, name: str, fingerprint: str, loader: Callable[[], pl.DataFrame]):
+        self.name = name
+        self.fingerprint = fingerprint
+        self._loader = loader
+        self._frame: Optional[pl.DataFrame] = None
+
+    def collect(self) -> pl.DataFrame:
+        if self._frame is None:
+            self._frame = self._loader()
+        return self._frame
+
+    def __repr__(self) -> str:
+        return f"DerivedTable({self.name!r}, {self.fingerprint})"
+
+
+class DerivedTables:
+    """
+    Small incremental pipeline for derived tables, keyed by content fingerprints.
+
+    Every step's output is stored as parquet next to a manifest recording the
+    fingerprints of the inputs it was built from. A step whose inputs are
+    unchanged is not run and its stored output is reused (and only read if a
+    downstream step needs it). A rebuilt step that produces identical output
+    keeps its fingerprint, so the steps below it are not rebuilt either.
+    ``export`` writes a final table only when its content changed.
+
+    Example:
+        >>> tables = DerivedTables("data/derived")
+        >>> espn = tables.source("espn_rankings", "data/NFL_Rankings_Complete.csv")
+        >>> ranked = tables.derive("espn_ranked", lambda df: df.sort("Overall Rank"), [espn])
+        >>> tables.export(ranked, "espn_ranked.csv")
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._manifest_path = self.directory / "manifest.json"
+        self._manifest: Dict[str, Dict[str, Any]] = {"steps": {}, "exports": {}}
+        if self._manifest_path.exists():
+            self._manifest.update(json.loads(self._manifest_path.read_text()))
+
+    def _save_manifest(self) -> None:
+        tmp_path = self._manifest_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self._manifest, indent=1, sort_keys=True))
+        tmp_path.replace(self._manifest_path)
+
+    @staticmethod
+    def _key(name: str, inputs: Sequence[DerivedTable], state: Sequence[Callable[[], str]], version: str) -> str:
+        parts = {
+            "name": name,
+            "version": version,
+            "inputs": [(table.name, table.fingerprint) for table in inputs],
+            "state": [fingerprint() for fingerprint in state],
+        }
+        return hashlib.blake2b(json.dumps(parts).encode(), digest_size=16).hexdigest()
+
+    def source(
+        self,
+        name: str,
+        data: Union[pl.DataFrame, str, Path],
+        reader: Callable[[Path], pl.DataFrame] = pl.read_csv,
+    ) -> DerivedTable:
+        """
+        Register a pipeline input.
+
+        Args:
+            name (str): Name of the input.
+            data (Union[pl.DataFrame, str, Path]): A frame, or a file that is
+                fingerprinted by its bytes and only parsed when needed.
+            reader (Callable[[Path], pl.DataFrame]): Reads ``data`` when it is a
+                file. Defaults to ``pl.read_csv``.
+
+        Returns:
+            DerivedTable: The input, to pass to ``derive``.
+        """
+        if isinstance(data, pl.DataFrame):
+            return DerivedTable(name, frame_fingerprint(data), lambda: data)
+        path = Path(data)
+        return DerivedTable(name, file_fingerprint(path), lambda: reader(path))
+
+    def derive(
+        self,
+        name: str,
+        build: Callable[..., pl.DataFrame],
+        inputs: Sequence[DerivedTable],
+        state: Sequence[Callable[[], str]] = (),
+        version: str = "",
+    ) -> DerivedTable:
+        """
+        Run a step, or reuse its stored output if its inputs are unchanged.
+
+        Args:
+            name (str): Step name, also the stored file name.
+            build (Callable[..., pl.DataFrame]): Called with the collected
+                ``inputs`` in order when the step has to be rebuilt.
+            inputs (Sequence[DerivedTable]): Sources and earlier steps.
+            state (Sequence[Callable[[], str]]): Fingerprints of outside state
+                the step reads, such as a crosswalk mapping. They are taken
+                again after the build, so state the step itself updates does
+                not trigger a rebuild on the next run.
+            version (str): Bump to force a rebuild when ``build`` changes.
+
+        Returns:
+            DerivedTable: The step's output.
+        """
+        path = self.directory / f"{name}.parquet"
+        entry = self._manifest["steps"].get(name)
+        if entry and entry["key"] == self._key(name, inputs, state, version) and path.exists():
+            logging.info(f"Reusing {name}: inputs unchanged")
+            return DerivedTable(name, entry["fingerprint"], lambda: pl.read_parquet(path))
+
+        frame = build(*(table.collect() for table in inputs))
+        fingerprint = frame_fingerprint(frame)
+        if entry is None or entry["fingerprint"] != fingerprint or not path.exists():
+            tmp_path = path.with_suffix(".tmp")
+            frame.write_parquet(tmp_path)
+            tmp_path.replace(path)
+        self._manifest["steps"][name] = {"key": self._key(name, inputs, state, version), "fingerprint": fingerprint}
+        self._save_manifest()
+        logging.info(f"Rebuilt {name}: {frame.height} rows")
+        return DerivedTable(name, fingerprint, lambda: frame)
+
+    def export(self, table: DerivedTable, path: Union[str, Path]) -> bool:
+        """
+        Write a table to CSV unless the file already holds the same content.
+
+        Args:
+            table (DerivedTable): The table to export.
+            path (Union[str, Path]): Destination CSV file.
+
+        Returns:
+            bool: Whether the file was written.
+        """
+        path = Path(path)
+        key = str(path.resolve())
+        if self._manifest["exports"].get(key) == table.fingerprint and path.exists():
+            logging.info(f"{path} is up to date")
+            return False
+        tmp_path = path.with_suffix(".tmp")
+        table.collect().write_csv(tmp_path)
+        tmp_path.replace(path)
+        self._manifest["exports"][key] = table.fingerprint
+        self._save_manifest()
+        logging.info(f"Wrote {path}")
+        return True
@@ -0,0 +1,316 @@
+import asyncio
+import hashlib
+import io
+import itertools
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Union
+
+import polars as pl
+from pydantic import BaseModel, ConfigDict
+
+from .utils import HTTPClientManager, get_client_manager
+
+DRAFTABLES_URL = "https://api.draftkings.com/draftgroups/v1/draftgroups/{draft_group_id}/draftables?format=json"
+
+_COMPETITION = pl.Struct({"competitionId": pl.Int64, "name": pl.String, "startTime": pl.String})
+
+# Declared schema of one draftable record. Free-form attribute lists are not
+# part of it and are dropped when the records are loaded.
+DRAFTABLE_SCHEMA: Dict[str, pl.DataType] = {
+    "draftableId": pl.Int64,
+    "playerId": pl.Int64,
+    "playerDkId": pl.Int64,
+    "firstName": pl.String,
+    "lastName": pl.String,
+    "displayName": pl.String,
+    "shortName": pl.String,
+    "position": pl.String,
+    "rosterSlotId": pl.Int64,
+    "salary": pl.Int64,
+    "status": pl.String,
+    "isSwappable": pl.Boolean,
+    "isDisabled": pl.Boolean,
+    "newsStatus": pl.String,
+    "teamId": pl.Int64,
+    "teamAbbreviation": pl.String,
+    "playerGameHash": pl.String,
+    "playerImage50": pl.String,
+    "playerImage160": pl.String,
+    "altPlayerImage50": pl.String,
+    "altPlayerImage160": pl.String,
+    "competition": _COMPETITION,
+    "competitions": pl.List(_COMPETITION),
+    "draftStatAttributes": pl.List(pl.Struct({"id": pl.Int64, "value": pl.String, "sortValue": pl.String})),
+}
+
+
+class DraftablesTables(BaseModel):
+    """
+    Normalized draftables of one draft group.
+
+    ``draftables`` has one row per draftable with a fixed schema, and the child
+    tables have one row per list element, keyed by ``(draft_group_id,
+    draftableId, ordinal)``. Every table carries ``draft_group_id``, so slates
+    can be appended to the same tables.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    draftables: pl.DataFrame
+    competitions: pl.DataFrame
+    draft_stat_attributes: pl.DataFrame
+
+
+def _parse_start_time(expr: pl.Expr) -> pl.Expr:
+    # DraftKings sends up to seven fractional digits ("2024-09-08T17:00:00.0000000Z").
+    return expr.str.replace(r"\.\d+", "").str.to_datetime("%Y-%m-%dT%H:%M:%SZ", time_zone="UTC", strict=False)
+
+
+def _explode_child(raw: pl.DataFrame, column: str) -> pl.DataFrame:
+    return (
+        raw.select(
+            "draft_group_id",
+            "draftableId",
+            pl.int_ranges(pl.col(column).list.len()).alias("ordinal"),
+            column,
+        )
+        .explode(["ordinal", column])
+        .drop_nulls(column)
+        .unnest(column)
+    )
+
+
+def load_draftables(payload: Union[bytes, Dict[str, Any], List[Dict[str, Any]]]) -> pl.DataFrame:
+    """Load draftable records into a frame with ``DRAFTABLE_SCHEMA``."""
+    if isinstance(payload, (bytes, str)):
+        # Parse the raw body straight into Arrow, skipping Python dicts entirely.
+        body = payload.encode() if isinstance(payload, str) else payload
+        response = pl.read_json(io.BytesIO(body), schema={"draftables": pl.List(pl.Struct(DRAFTABLE_SCHEMA))})
+        return response.select(pl.col("draftables").explode()).drop_nulls().unnest("draftables")
+    records = payload["draftables"] if isinstance(payload, dict) else payload
+    return pl.DataFrame(records, schema=DRAFTABLE_SCHEMA)
+
+
+def flatten_draftables(
+    payload: Union[bytes, Dict[str, Any], List[Dict[str, Any]]], draft_group_id: Optional[int] = None
+) -> DraftablesTables:
+    """
+    Flatten a draftables response into a fixed-schema table and long child tables.
+
+    The records are loaded into Arrow against ``DRAFTABLE_SCHEMA`` in one pass,
+    fastest straight from the raw response body. ``competitions`` and
+    ``draftStatAttributes`` are exploded into their own tables instead of being
+    widened into ``competition_{i}_*`` columns, so the schema does not depend
+    on the slate. No Python code runs per row.
+
+    Args:
+        payload (Union[bytes, Dict[str, Any], List[Dict[str, Any]]]): The raw
+            response body, the decoded response (``{"draftables": [...]}``) or
+            its list of draftables.
+        draft_group_id (Optional[int]): Draft group the draftables belong to.
+
+    Returns:
+        DraftablesTables: The draftables, competitions and stat attribute tables.
+    """
+    raw = load_draftables(payload).with_columns(pl.lit(draft_group_id, pl.Int64).alias("draft_group_id"))
+
+    scalars = [name for name, dtype in DRAFTABLE_SCHEMA.items() if not dtype.is_nested()]
+    draftables = raw.select(
+        "draft_group_id",
+        *scalars,
+        pl.col("competition").struct.field("competitionId").alias("competition_id"),
+        pl.col("competition").struct.field("name").alias("competition_name"),
+        _parse_start_time(pl.col("competition").struct.field("startTime")).alias("competition_start_time"),
+    )
+    competitions = _explode_child(raw, "competitions").with_columns(_parse_start_time(pl.col("startTime")))
+    draft_stat_attributes = _explode_child(raw, "draftStatAttributes").rename({"id": "statId"})
+
+    logging.info(
+        f"Flattened {draftables.height} draftables, {competitions.height} competitions and "
+        f"{draft_stat_attributes.height} stat attributes for draft group {draft_group_id}"
+    )
+    return DraftablesTables(
+        draftables=draftables, competitions=competitions, draft_stat_attributes=draft_stat_attributes
+    )
+
+
+# Draftable fields whose changes are reported by ``DraftablesPoller``.
+TRACKED_COLUMNS = ("salary", "status", "newsStatus", "isSwappable")
+
+# Identifying fields kept in every snapshot next to the tracked ones.
+SNAPSHOT_ID_COLUMNS = ("draft_group_id", "draftableId", "playerId", "displayName", "position", "teamAbbreviation")
+
+
+def diff_draftables(
+    previous: pl.DataFrame,
+    current: pl.DataFrame,
+    polled_at: datetime,
+    tracked_columns: Sequence[str] = TRACKED_COLUMNS,
+) -> pl.DataFrame:
+    """
+    Compare two snapshots of a draft group, keyed by ``draftableId``.
+
+    Args:
+        previous (pl.DataFrame): The last snapshot (may be empty).
+        current (pl.DataFrame): The new snapshot.
+        polled_at (datetime): When ``current`` was fetched.
+        tracked_columns (Sequence[str]): Columns compared between snapshots.
+
+    Returns:
+        pl.DataFrame: One row per added, removed or changed draftable with
+        ``change`` ("added", "removed" or "changed"), ``changed_columns``,
+        ``polled_at``, the current values and a ``previous_`` column per
+        tracked column.
+    """
+    key = ["draft_group_id", "draftableId"]
+    identity = [name for name in SNAPSHOT_ID_COLUMNS if name not in key]
+    joined = current.with_columns(pl.lit(True).alias("_current")).join(
+        previous.select(
+            *key,
+            *(pl.col(name).alias(f"_previous_{name}") for name in identity),
+            *(pl.col(name).alias(f"previous_{name}") for name in tracked_columns),
+            pl.lit(True).alias("_previous"),
+        ),
+        on=key,
+        how="full",
+        coalesce=True,
+    )
+    in_both = pl.col("_current").is_not_null() & pl.col("_previous").is_not_null()
+    changed = [in_both & pl.col(name).ne_missing(pl.col(f"previous_{name}")) for name in tracked_columns]
+    change = (
+        pl.when(pl.col("_previous").is_null())
+        .then(pl.lit("added"))
+        .when(pl.col("_current").is_null())
+        .then(pl.lit("removed"))
+        .when(pl.any_horizontal(changed))
+        .then(pl.lit("changed"))
+    )
+    return (
+        joined.select(
+            *key,
+            *(pl.coalesce(name, f"_previous_{name}").alias(name) for name in identity),
+            change.alias("change"),
+            pl.concat_list(pl.when(is_changed).then(pl.lit(name)) for name, is_changed in zip(tracked_columns, changed))
+            .list.drop_nulls()
+            .alias("changed_columns"),
+            pl.lit(polled_at, pl.Datetime("us", "UTC")).alias("polled_at"),
+            *(pl.col(name) for name in tracked_columns),
+            *(pl.col(f"previous_{name}") for name in tracked_columns),
+        )
+        .drop_nulls("change")
+        .sort(key)
+    )
+
+
+class DraftablesPoller:
+    """
+    Poll many DraftKings draft groups concurrently and emit only what changed.
+
+    The last snapshot of every group (identity plus ``tracked_columns``, keyed
+    by ``draftableId``) is kept in memory. Each ``poll`` fetches all groups at
+    once over the shared client pool and returns a delta table of the
+    draftables that were added, removed or had a tracked value change (salary
+    moves, status and news flips, swappability). A body identical to the last
+    one is not parsed again. The first poll of a group reports every draftable
+    as added.
+
+    Example:
+        >>> poller = DraftablesPoller([112297, 112298])
+        >>> async for delta in poller.run(interval=180):
+        ...     delta.filter(pl.col("change") == "changed")
+    """
+
+    def __init__(
+        self,
+        draft_group_ids: Iterable[int],
+        tracked_columns: Sequence[str] = TRACKED_COLUMNS,
+        manager: Optional[HTTPClientManager] = None,
+    ):
+        self.draft_group_ids = list(draft_group_ids)
+        self.tracked_columns = list(tracked_columns)
+        self.manager = manager
+        self.snapshots: Dict[int, pl.DataFrame] = {}
+        self._body_hashes: Dict[int, bytes] = {}
+
+    def _empty_delta(self) -> pl.DataFrame:
+        snapshot = self._select_snapshot(flatten_draftables([]).draftables)
+        return diff_draftables(snapshot, snapshot, datetime.now(timezone.utc), self.tracked_columns)
+
+    def _select_snapshot(self, draftables: pl.DataFrame) -> pl.DataFrame:
+        return draftables.select(*SNAPSHOT_ID_COLUMNS, *self.tracked_columns).unique("draftableId", keep="last")
+
+    async def poll_group(self, draft_group_id: int) -> Optional[pl.DataFrame]:
+        """
+        Fetch one draft group and diff it against its last snapshot.
+
+        Returns:
+            Optional[pl.DataFrame]: The delta rows, or None when the body did
+            not change since the last poll.
+        """
+        manager = self.manager or get_client_manager()
+        response = await manager.request("GET", DRAFTABLES_URL.format(draft_group_id=draft_group_id))
+        polled_at = datetime.now(timezone.utc)
+        body_hash = hashlib.blake2b(response.content, digest_size=16).digest()
+        if self._body_hashes.get(draft_group_id) == body_hash:
+            return None
+
+        # Parsing runs off the event loop so other groups keep downloading.
+        tables = await asyncio.to_thread(flatten_draftables, response.content, draft_group_id)
+        current = self._select_snapshot(tables.draftables)
+        previous = self.snapshots.get(draft_group_id, current.clear())
+        delta = diff_draftables(previous, current, polled_at, self.tracked_columns)
+        self.snapshots[draft_group_id] = current
+        self._body_hashes[draft_group_id] = body_hash
+        return delta
+
+    async def poll(self) -> pl.DataFrame:
+        """
+        Poll every draft group concurrently.
+
+        Groups that fail to fetch are logged and keep their last snapshot, so
+        their changes are reported by the next successful poll.
+
+        Returns:
+            pl.DataFrame: The delta rows of all groups (see ``diff_draftables``).
+        """
+        results = await asyncio.gather(
+            *(self.poll_group(draft_group_id) for draft_group_id in self.draft_group_ids), return_exceptions=True
+        )
+        deltas = []
+        for draft_group_id, result in zip(self.draft_group_ids, results):
+            if isinstance(result, Exception):
+                logging.error(f"Polling draft group {draft_group_id} failed: {result!r}")
+            elif result is not None:
+                deltas.append(result)
+        delta = pl.concat(deltas) if deltas else self._empty_delta()
+        logging.info(f"Polled {len(self.draft_group_ids)} draft groups: {delta.height} changed draftables")
+        return delta
+
+    async def run(self, interval: float = 180.0, iterations: Optional[int] = None) -> AsyncIterator[pl.DataFrame]:
+        """
+        Poll every ``interval`` seconds, yielding each non-empty delta.
+
+        Args:
+            interval (float): Seconds between the start of two polls.
+            iterations (Optional[int]): Number of polls. Defaults to polling forever.
+                The generator ends right after the last poll, without waiting.
+
+        Yields:
+            pl.DataFrame: The delta rows of one poll.
+        """
+        started: Optional[float] = None
+        for _ in itertools.count() if iterations is None else range(iterations):
+            if started is not None:
+                await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+            started = time.monotonic()
+            delta = await self.poll()
+            if not delta.is_empty():
+                yield delta
+
+    def snapshot(self) -> pl.DataFrame:
+        """The latest snapshot of every polled draft group."""
+        if not self.snapshots:
+            return self._select_snapshot(flatten_draftables([]).draftables)
+        return pl.concat(list(self.snapshots.values()))
@@ -0,0 +1,621 @@
+import contextvars
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from string import Template
+from typing import Dict, Iterable, Iterator, List, Optional, TypeVar
+
+import polars as pl
+from pydantic import BaseModel, Field
+from sqlalchemy import URL, Column, DateTime, String, create_engine, inspect
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from .cache import HTTPCache, get_http_cache
+from .nflverse import NFLVERSE_BASE_URL
+from .postgres import copy_batches, copy_dataframe, upsert_batches, upsert_dataframe
+from .tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Release asset of every nflverse data type, as ``string.Template`` patterns.
+NFLVERSE_URL_PATTERNS: Dict[str, str] = {
+    "weekly_rosters": "${base_url}/weekly_rosters/roster_weekly_${year}.parquet",
+    "depth_charts": "${base_url}/depth_charts/depth_charts_${year}.parquet",
+    "pbp": "${base_url}/pbp/play_by_play_${year}.parquet",
+    "players": "${base_url}/players/players.parquet",
+    "injuries": "${base_url}/injuries/injuries_${year}.parquet",
+    "player_stats": "${base_url}/player_stats/player_stats_${year}.parquet",
+    "rosters": "${base_url}/rosters/roster_${year}.parquet",
+    "officials": "${base_url}/officials/officials.parquet",
+}
+
+SEASONAL_DATA_TYPES = ("weekly_rosters", "depth_charts", "pbp", "injuries", "player_stats", "rosters")
+STATIC_DATA_TYPES = ("players", "officials")
+
+# SQLAlchemy setup
+Base = declarative_base()
+
+
+class DataUploadLog(Base):
+    __tablename__ = "data_upload_log"
+    id = Column(String, primary_key=True)
+    data_type = Column(String)
+    year = Column(String)
+    date_uploaded = Column(DateTime)
+
+
+class DBConfig(BaseModel):
+    username: str = Field(default="")
+    password: str = Field(default="")
+    host: str = Field(default="localhost")
+    port: str = Field(default="5432")
+    database: str = Field(default="sportsdata")
+
+    @classmethod
+    def from_env(cls) -> "DBConfig":
+        """Read the connection settings from ``DB_USERNAME``, ``DB_PASSWORD``, ``DB_HOST``, ``DB_PORT`` and ``DB_NAME``."""
+        return cls(
+            username=os.getenv("DB_USERNAME", ""),
+            password=os.getenv("DB_PASSWORD", ""),
+            host=os.getenv("DB_HOST", "localhost"),
+            port=os.getenv("DB_PORT", "5432"),
+            database=os.getenv("DB_NAME", "sportsdata"),
+        )
+
+    @property
+    def url(self) -> URL:
+        """SQLAlchemy URL of the database. A ``host`` starting with "/" is a Unix socket directory."""
+        is_socket = self.host.startswith("/")
+        return URL.create(
+            "postgresql+psycopg2",
+            username=self.username or None,
+            password=self.password or None,
+            host=None if is_socket else self.host,
+            port=None if is_socket else int(self.port),
+            database=self.database,
+            query={"host": self.host, "port": self.port} if is_socket else {},
+        )
+
+
+class DataSourceConfig(BaseModel):
+    base_url: str = Field(default=NFLVERSE_BASE_URL)
+    url_patterns: Dict[str, str] = Field(default_factory=lambda: dict(NFLVERSE_URL_PATTERNS))
+    # Natural keys of data types that are refreshed incrementally in the current season
+    natural_keys: Dict[str, List[str]] = Field(
+        default_factory=lambda: {
+            "pbp": ["game_id", "play_id"],
+            "weekly_rosters": ["gsis_id", "week"],
+        }
+    )
+    # Rows per record batch, and batches decoded ahead of the writer, when streaming
+    batch_rows: int = Field(default=10_000)
+    max_pending_batches: int = Field(default=2)
+
+
+class IngestionJob(BaseModel):
+    data_type: str
+    year: Optional[int] = None
+    schema_name: str = Field(default="raw")
+    table_name: str
+
+
+class IngestionResult(BaseModel):
+    job: IngestionJob
+    status: str  # "stored", "skipped" or "failed"
+    rows: int = Field(default=0)
+    fetch_seconds: float = Field(default=0.0)
+    wait_seconds: float = Field(default=0.0)
+    store_seconds: float = Field(default=0.0)
+    error: Optional[str] = None
+
+
+T = TypeVar("T")
+
+
+class _Failed:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+_EXHAUSTED = object()
+
+
+def prefetch(items: Iterable[T], max_pending: int = 2) -> Iterator[T]:
+    """
+    Produce ``items`` on a background thread, at most ``max_pending`` ahead of the consumer.
+
+    The bounded queue is the backpressure: when the consumer (e.g. a ``COPY``
+    into PostgreSQL) falls behind, the producer blocks instead of buffering,
+    so decoding overlaps writing while memory stays at ``max_pending`` items.
+    An exception raised by the producer is re-raised in the consumer. Closing
+    the iterator early stops the producer after the item it is working on.
+    The producer runs in a copy of the caller's context, so its spans nest
+    under the caller's.
+
+    :param items: The items to produce, e.g. ``NFLVerseDataSource.read_batches(...)``.
+    :param max_pending: Items produced but not yet consumed.
+    :return: An iterator over ``items``, in order.
+    """
+    pending: queue.Queue = queue.Queue(maxsize=max_pending)
+    stopped = threading.Event()
+
+    def put(item) -> bool:
+        while not stopped.is_set():
+            try:
+                pending.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in items:
+                if not put(item):
+                    return
+        except BaseException as e:
+            put(_Failed(e))
+        else:
+            put(_EXHAUSTED)
+
+    producer = threading.Thread(target=contextvars.copy_context().run, args=(produce,), name="prefetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = pending.get()
+            if item is _EXHAUSTED:
+                return
+            if isinstance(item, _Failed):
+                raise item.error
+            yield item
+    finally:
+        stopped.set()
+        producer.join()
+
+
+class NFLVerseDataSource:
+    def __init__(self, config: DataSourceConfig, cache: Optional[HTTPCache] = None):
+        self.config = config
+        self.cache = cache or get_http_cache()
+
+    def url(self, data_type: str, year: Optional[int] = None) -> str:
+        if data_type not in self.config.url_patterns:
+            raise ValueError(f"Unsupported data type: {data_type}")
+
+        url_template = self.config.url_patterns[data_type]
+        template = Template(url_template)
+
+        substitution = {"base_url": self.config.base_url, "year": year}
+
+        return template.safe_substitute(substitution)
+
+    def download(self, data_type: str, year: Optional[int] = None) -> Path:
+        """Download (or revalidate) the release file of a data type into the HTTP cache and return its path."""
+        url = self.url(data_type, year)
+        with span("download", url=url):
+            return self.cache.get_path(url)
+
+    @staticmethod
+    def _enrich(df: pl.DataFrame, data_type: str, year: Optional[int], uploaded_at: datetime) -> pl.DataFrame:
+        return df.with_columns(
+            [
+                pl.lit(uploaded_at).alias("date_uploaded"),
+                pl.lit(data_type).alias("data_type"),
+                pl.lit(str(year) if year else "N/A").alias("year"),
+            ]
+        )
+
+    def fetch_data(self, data_type: str, year: Optional[int] = None) -> Optional[pl.DataFrame]:
+        """
+        Download (or revalidate) a release file and decode it with the upload columns added.
+
+        :param data_type: Type of data to fetch.
+        :param year: Year of the data.
+        :return: The enriched frame, or None if the download or decode failed (the error is logged).
+        """
+        try:
+            path = self.download(data_type, year)
+            with span("decode") as decode:
+                decode.bytes_in = path.stat().st_size
+                df = pl.read_parquet(path)
+                decode.rows, decode.bytes_out = df.height, df.estimated_size()
+            with span("enrich") as enrich:
+                df = self._enrich(df, data_type, year, datetime.now())
+                enrich.rows, enrich.bytes_out = df.height, df.estimated_size()
+            return df
+        except Exception as e:
+            logger.error(f"Error fetching data for {data_type} (year: {year}): {str(e)}")
+            return None
+
+    def read_batches(
+        self, path: Path, data_type: str, year: Optional[int] = None, batch_rows: Optional[int] = None
+    ) -> Iterator[pl.DataFrame]:
+        """
+        Decode a downloaded release file one record batch at a time.
+
+        Every batch gets the same ``date_uploaded``, ``data_type`` and ``year``
+        columns as ``fetch_data`` adds to the whole frame. Only the row group
+        being read and the current batch are held in memory, however large
+        the season.
+
+        :param path: The parquet file, e.g. from ``download``.
+        :param data_type: Type of data in the file.
+        :param year: Year of the data.
+        :param batch_rows: Rows per batch (default: ``config.batch_rows``).
+        :return: An iterator of enriched frames sharing one schema.
+        """
+        # Imported here: pyarrow adds ~150 ms to importing this module and only streaming needs it.
+        import pyarrow.parquet as pq
+
+        uploaded_at = datetime.now()
+        with pq.ParquetFile(path) as parquet:
+            for record_batch in parquet.iter_batches(batch_size=batch_rows or self.config.batch_rows):
+                with span("decode") as decode:
+                    df = self._enrich(pl.from_arrow(record_batch), data_type, year, uploaded_at)
+                    decode.rows, decode.bytes_in, decode.bytes_out = df.height, record_batch.nbytes, df.estimated_size()
+                yield df
+
+    def iter_batches(
+        self, data_type: str, year: Optional[int] = None, batch_rows: Optional[int] = None
+    ) -> Iterator[pl.DataFrame]:
+        """Download a release file and decode it one enriched batch at a time (see ``read_batches``)."""
+        return self.read_batches(self.download(data_type, year), data_type, year, batch_rows)
+
+
+class PostgresDataStorage:
+    def __init__(self, config: DBConfig):
+        self.config = config
+        self.engine = create_engine(config.url)
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+
+    def store_data(
+        self,
+        df: pl.DataFrame,
+        schema: str,
+        table_name: str,
+        if_exists: str = "append",
+        key_columns: Optional[List[str]] = None,
+    ) -> bool:
+        """
+        Store data into PostgreSQL table.
+
+        :param df: DataFrame to store.
+        :param schema: Schema name.
+        :param table_name: Table name.
+        :param if_exists: Behavior when table exists ('append', 'replace' or 'upsert').
+            'upsert' applies only new or changed rows, matched on ``key_columns``.
+        :param key_columns: Natural key of the table, required for 'upsert'.
+        :return: True if the data was stored, False otherwise.
+        """
+        if df is None or df.is_empty():
+            logger.warning(f"No data to store for {table_name}")
+            return False
+
+        session = self.Session()
+        try:
+            with span("write", table=f"{schema}.{table_name}", mode=if_exists) as write:
+                write.rows, write.bytes_in = df.height, df.estimated_size()
+                if if_exists == "upsert":
+                    if not key_columns:
+                        raise ValueError(f"Upsert into '{schema}.{table_name}' requires key columns")
+                    upsert_dataframe(df, self.engine, schema, table_name, key_columns)
+                else:
+                    copy_dataframe(df, self.engine, schema, table_name, if_exists=if_exists)
+            if if_exists == "replace":
+                logger.info(f"Data for '{schema}.{table_name}' has been replaced.")
+            elif if_exists == "upsert":
+                logger.info(f"Data for '{schema}.{table_name}' has been incrementally updated.")
+            else:
+                logger.info(f"Data successfully stored in {schema}.{table_name}")
+            if if_exists == "append":
+                self._log_upload(session, table_name)
+            session.commit()
+            return True
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error storing data to PostgreSQL: {str(e)}")
+            return False
+        finally:
+            session.close()
+
+    def store_batches(
+        self,
+        batches: Iterable[pl.DataFrame],
+        schema: str,
+        table_name: str,
+        if_exists: str = "append",
+        key_columns: Optional[List[str]] = None,
+    ) -> Optional[int]:
+        """
+        Store a stream of frames into a PostgreSQL table, one batch at a time.
+
+        Like ``store_data``, but the rows are never held in memory at once:
+        each batch is written as it arrives, in one transaction per table.
+        An empty stream is a successful write of 0 rows that leaves the table
+        as it was.
+
+        :param batches: Frames sharing one schema, e.g. from ``NFLVerseDataSource.read_batches``.
+        :param schema: Schema name.
+        :param table_name: Table name.
+        :param if_exists: Behavior when table exists ('append', 'replace' or 'upsert').
+        :param key_columns: Natural key of the table, required for 'upsert'.
+        :return: Number of rows read from ``batches``, or None if the write failed.
+        """
+        session = self.Session()
+        try:
+            with span("write", table=f"{schema}.{table_name}", mode=if_exists) as write:
+
+                def counted() -> Iterator[pl.DataFrame]:
+                    for batch in batches:
+                        write.rows += batch.height
+                        write.bytes_in += batch.estimated_size()
+                        yield batch
+
+                if if_exists == "upsert":
+                    if not key_columns:
+                        raise ValueError(f"Upsert into '{schema}.{table_name}' requires key columns")
+                    upsert_batches(counted(), self.engine, schema, table_name, key_columns)
+                else:
+                    copy_batches(counted(), self.engine, schema, table_name, if_exists=if_exists)
+            if not write.rows:
+                logger.info(f"No rows to store for {schema}.{table_name}")
+                return 0
+            if if_exists == "replace":
+                logger.info(f"Data for '{schema}.{table_name}' has been replaced.")
+            elif if_exists == "upsert":
+                logger.info(f"Data for '{schema}.{table_name}' has been incrementally updated.")
+            else:
+                logger.info(f"Data successfully stored in {schema}.{table_name}")
+            if if_exists == "append":
+                self._log_upload(session, table_name)
+            session.commit()
+            return write.rows
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error storing data to PostgreSQL: {str(e)}")
+            return None
+        finally:
+            session.close()
+
+    def _log_upload(self, session, table_name):
+        log_entry = DataUploadLog(
+            id=f"{table_name}_{datetime.now().strftime('%Y%m%d%H%M%S')}",
+            data_type=table_name,
+            year=str(datetime.now().year),
+            date_uploaded=datetime.now(),
+        )
+        session.add(log_entry)
+
+    def table_exists(self, schema: str, table_name: str) -> bool:
+        """
+        Check if a table exists in the specified schema.
+
+        :param schema: The schema name.
+        :param table_name: The table name.
+        :return: True if the table exists, False otherwise.
+        """
+        inspector = inspect(self.engine)
+        exists = inspector.has_table(table_name, schema=schema)
+        logger.info(f"Table '{schema}.{table_name}' exists: {exists}")
+        return exists
+
+    def is_data_uploaded(self, table_name: str) -> bool:
+        """
+        Check if data for the given table has already been uploaded.
+
+        :param table_name: The name of the table.
+        :return: True if data is already uploaded, False otherwise.
+        """
+        session = self.Session()
+        try:
+            exists = session.query(DataUploadLog).filter_by(data_type=table_name).first() is not None
+            logger.info(f"Data for table '{table_name}' already uploaded: {exists}")
+            return exists
+        except Exception as e:
+            logger.error(f"Error checking upload log for {table_name}: {str(e)}")
+            return False
+        finally:
+            session.close()
+
+
+class NFLDataManager:
+    def __init__(self, data_source: NFLVerseDataSource, data_storage: PostgresDataStorage):
+        self.data_source = data_source
+        self.data_storage = data_storage
+        self.current_year = datetime.now().year
+
+    def _plan_write(self, data_type: str, year: Optional[int], schema: str, table_name: str) -> Optional[str]:
+        """
+        Decide how a (data_type, year) job should be written.
+
+        :return: The ``if_exists`` mode to store with ('append', 'replace' or 'upsert'),
+            or None to skip the job.
+        """
+        if year is not None:
+            if year < self.current_year:
+                # For past seasons, skip if data already exists
+                if self.data_storage.is_data_uploaded(table_name):
+                    logger.info(f"Data for table '{table_name}' (year: {year}) already exists. Skipping.")
+                    return None
+            elif year > self.current_year:
+                logger.warning(f"Year {year} is in the future. Skipping data ingestion for '{table_name}'.")
+                return None
+        else:
+            # Handle non-year-specific data (e.g., players)
+            if self.data_storage.is_data_uploaded(table_name):
+                logger.info(f"Data for table '{table_name}' has already been uploaded. Skipping.")
+                return None
+
+        # For current season, apply only changed rows when the data type has a
+        # natural key, otherwise replace existing data
+        if year == self.current_year and self.data_storage.table_exists(schema, table_name):
+            if data_type in self.data_source.config.natural_keys:
+                logger.info(f"Table '{schema}.{table_name}' exists for current year. Upserting changed rows.")
+                return "upsert"
+            logger.info(f"Table '{schema}.{table_name}' exists for current year. Replacing existing data.")
+            return "replace"
+        return "append"
+
+    def fetch_and_store_data(self, data_type: str, year: Optional[int], schema: str, table_name: str):
+        """
+        Fetch data from the source and store it into PostgreSQL.
+
+        :param data_type: Type of data to fetch.
+        :param year: Year of the data.
+        :param schema: Schema name in PostgreSQL.
+        :param table_name: Table name in PostgreSQL.
+        """
+        with span("ingest_job", data_type=data_type, year=year, table=table_name):
+            try:
+                with span("plan"):
+                    if_exists = self._plan_write(data_type, year, schema, table_name)
+                if if_exists is None:
+                    return
+
+                df = self.data_source.fetch_data(data_type, year)
+                if df is not None:
+                    key_columns = self.data_source.config.natural_keys.get(data_type)
+                    self.data_storage.store_data(df, schema, table_name, if_exists=if_exists, key_columns=key_columns)
+                else:
+                    logger.warning(f"No data fetched for {data_type} (year: {year})")
+            except Exception as e:
+                logger.error(f"Error processing {data_type} data: {str(e)}")
+
+    def _run_job(
+        self, job: IngestionJob, write_slots: threading.BoundedSemaphore, stream: bool = False
+    ) -> IngestionResult:
+        result = IngestionResult(job=job, status="skipped")
+        with span("ingest_job", data_type=job.data_type, year=job.year, table=job.table_name) as job_span:
+            try:
+                with span("plan"):
+                    if_exists = self._plan_write(job.data_type, job.year, job.schema_name, job.table_name)
+                if if_exists is None:
+                    return result
+
+                started = time.perf_counter()
+                if stream:
+                    path, df = self.data_source.download(job.data_type, job.year), None
+                else:
+                    df = self.data_source.fetch_data(job.data_type, job.year)
+                result.fetch_seconds = time.perf_counter() - started
+                if not stream:
+                    if df is None:
+                        result.status, result.error = "failed", "No data fetched"
+                        return result
+                    result.rows = job_span.rows = df.height
+
+                # Downloads and transforms overlap freely; writes wait for a free slot
+                # so the database only sees ``max_concurrent_writes`` loads at a time.
+                started = time.perf_counter()
+                with span("write_wait"):
+                    write_slots.acquire()
+                try:
+                    result.wait_seconds = time.perf_counter() - started
+                    started = time.perf_counter()
+                    key_columns = self.data_source.config.natural_keys.get(job.data_type)
+                    if stream:
+                        # Decoding runs on a producer thread, a few batches ahead of the COPY.
+                        batches = prefetch(
+                            self.data_source.read_batches(path, job.data_type, job.year),
+                            self.data_source.config.max_pending_batches,
+                        )
+                        with closing(batches):
+                            rows = self.data_storage.store_batches(
+                                batches, job.schema_name, job.table_name, if_exists=if_exists, key_columns=key_columns
+                            )
+                        is_stored = rows is not None
+                        result.rows = job_span.rows = rows or 0
+                    else:
+                        is_stored = self.data_storage.store_data(
+                            df, job.schema_name, job.table_name, if_exists=if_exists, key_columns=key_columns
+                        )
+                    result.store_seconds = time.perf_counter() - started
+                finally:
+                    write_slots.release()
+                result.status = "stored" if is_stored else "failed"
+                if not is_stored:
+                    result.error = "Store failed"
+            except Exception as e:
+                result.status, result.error = "failed", str(e)
+            finally:
+                job_span.attributes["result"] = result.status
+                if result.status == "failed":
+                    job_span.status, job_span.error = "error", result.error
+        return result
+
+    def fetch_and_store_many(
+        self,
+        jobs: Iterable[IngestionJob],
+        max_workers: int = 4,
+        max_concurrent_writes: int = 1,
+        stream: bool = False,
+    ) -> List[IngestionResult]:
+        """
+        Run many ingestion jobs on a bounded worker pool.
+
+        Downloads and transforms run on up to ``max_workers`` threads, while
+        writes to PostgreSQL are limited to ``max_concurrent_writes`` at a time.
+        A failing job is recorded and the remaining jobs keep going.
+
+        With ``stream``, a job downloads its file, then waits for a write slot
+        and decodes it one record batch at a time on a producer thread while
+        the previous batches are copied into PostgreSQL (see ``prefetch``).
+        Peak memory per job is then a few batches instead of the whole season,
+        and ``store_seconds`` includes the decode.
+
+        :param jobs: The (data_type, year) jobs to run.
+        :param max_workers: Number of jobs downloading/transforming at once.
+        :param max_concurrent_writes: Number of jobs writing to PostgreSQL at once.
+        :param stream: Stream each file into PostgreSQL in batches instead of loading it whole.
+        :return: One result per job, in submission order, with per-stage timings.
+        """
+        jobs = list(jobs)
+        write_slots = threading.BoundedSemaphore(max_concurrent_writes)
+        results: Dict[int, IngestionResult] = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self._run_job, job, write_slots, stream): i for i, job in enumerate(jobs)}
+            for future in as_completed(futures):
+                result = future.result()
+                results[futures[future]] = result
+                logger.info(
+                    f"{result.job.table_name}: {result.status} ({result.rows} rows, "
+                    f"fetch {result.fetch_seconds:.1f}s, wait {result.wait_seconds:.1f}s, store {result.store_seconds:.1f}s)"
+                    + (f" - {result.error}" if result.error else "")
+                )
+        ordered = [results[i] for i in range(len(jobs))]
+        failed = [r.job.table_name for r in ordered if r.status == "failed"]
+        if failed:
+            logger.warning(f"{len(failed)} of {len(ordered)} ingestion jobs failed: {failed}")
+        return ordered
+
+
+def nflverse_jobs(
+    years: Iterable[int],
+    data_types: Iterable[str] = SEASONAL_DATA_TYPES,
+    static_data_types: Iterable[str] = STATIC_DATA_TYPES,
+    schema_name: str = "raw",
+) -> List[IngestionJob]:
+    """
+    One ingestion job per (data_type, year), plus one per data type that is not split by season.
+
+    Tables are named ``nflverse__{data_type}_{year}`` and ``nflverse__{data_type}``.
+    """
+    jobs = [
+        IngestionJob(
+            data_type=data_type, year=year, schema_name=schema_name, table_name=f"nflverse__{data_type}_{year}"
+        )
+        for year in years
+        for data_type in data_types
+    ]
+    jobs += [
+        IngestionJob(data_type=data_type, schema_name=schema_name, table_name=f"nflverse__{data_type}")
+        for data_type in static_data_types
+    ]
+    return jobs
@@ -0,0 +1,335 @@
+import warnings
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import polars as pl
+
+from .utils import HTTPClientManager, fetch_paginated
+
+# EA drop-api ratings endpoint, paginated with ``limit``/``offset``.
+MADDEN_RATINGS_URL = "https://drop-api.ea.com/rating/madden-nfl"
+
+# Declared schema of one drop-api ratings item. ``stats`` is added per call,
+# since the set of rating names is only known from the payload.
+MADDEN_RATING_SCHEMA: Dict[str, pl.DataType] = {
+    "id": pl.Int64,
+    "overallRating": pl.Int64,
+    "firstName": pl.String,
+    "lastName": pl.String,
+    "birthdate": pl.String,
+    "height": pl.Int64,
+    "weight": pl.Int64,
+    "college": pl.String,
+    "handedness": pl.Int64,
+    "age": pl.Int64,
+    "jerseyNum": pl.Int64,
+    "yearsPro": pl.Int64,
+    "avatarUrl": pl.String,
+    "team": pl.Struct({"id": pl.Int64, "label": pl.String, "imageUrl": pl.String, "isPopular": pl.Boolean}),
+    "position": pl.Struct(
+        {
+            "id": pl.String,
+            "shortLabel": pl.String,
+            "label": pl.String,
+            "positionType": pl.Struct({"id": pl.String, "name": pl.String}),
+        }
+    ),
+    "iteration": pl.Struct({"id": pl.String, "label": pl.String}),
+    "archetype": pl.Struct({"id": pl.String, "label": pl.String}),
+}
+
+# Ratings whose value is a label rather than a number.
+STRING_STATS = ("runningStyle",)
+
+# Output column -> field path of each flattened nested field.
+NESTED_FIELDS: Dict[str, List[str]] = {
+    "team_id": ["team", "id"],
+    "team_label": ["team", "label"],
+    "team_imageUrl": ["team", "imageUrl"],
+    "team_isPopular": ["team", "isPopular"],
+    "position_id": ["position", "id"],
+    "position_shortLabel": ["position", "shortLabel"],
+    "position_label": ["position", "label"],
+    "position_type_id": ["position", "positionType", "id"],
+    "position_type_name": ["position", "positionType", "name"],
+    "iteration_id": ["iteration", "id"],
+    "iteration_label": ["iteration", "label"],
+    "archetype_id": ["archetype", "id"],
+    "archetype_label": ["archetype", "label"],
+}
+
+
+def madden_stats_dtype(stat_names: Iterable[str]) -> pl.Struct:
+    """Struct dtype of the ``stats`` object for the given rating names."""
+    return pl.Struct(
+        {
+            name: pl.Struct({"value": pl.String if name in STRING_STATS else pl.Float64, "diff": pl.Int64})
+            for name in stat_names
+        }
+    )
+
+
+def _field(path: List[str]) -> pl.Expr:
+    expr = pl.col(path[0])
+    for name in path[1:]:
+        expr = expr.struct.field(name)
+    return expr
+
+
+def decode_madden_ratings(
+    items: List[Dict[str, Any]],
+    stat_names: Optional[Iterable[str]] = None,
+    stat_format: str = "{}_rating",
+    include_archetype: bool = True,
+) -> pl.DataFrame:
+    """
+    Decode drop-api ratings items into a flat, typed frame in one pass.
+
+    The items are loaded straight into Arrow memory against a declared schema,
+    so every column already has its final type. The team, position, iteration,
+    archetype and stats fields are then unnested in a single ``select``. No
+    pydantic model or per-column ``with_columns``/cast loop is involved.
+
+    Args:
+        items (List[Dict[str, Any]]): Decoded ratings items, as returned by
+            ``fetch_paginated``.
+        stat_names (Optional[Iterable[str]]): Ratings to keep from ``stats``.
+            Defaults to every rating present in the payload.
+        stat_format (str): Output column name for a rating. Defaults to
+            ``"{}_rating"``.
+        include_archetype (bool): Whether to emit the archetype columns.
+
+    Returns:
+        pl.DataFrame: One row per player with ``fullName``, the flattened
+        nested fields, one column per rating value and one ``{name}_diff``
+        column per rating with its change since the previous iteration.
+    """
+    if stat_names is None:
+        stat_names = dict.fromkeys(name for item in items for name in item.get("stats") or {})
+    stat_names = list(stat_names)
+    schema = {**MADDEN_RATING_SCHEMA, "stats": madden_stats_dtype(stat_names)}
+    if not include_archetype:
+        del schema["archetype"]
+    raw = pl.DataFrame(items, schema=schema)
+
+    scalar_columns = [name for name, dtype in schema.items() if not isinstance(dtype, pl.Struct)]
+    nested_fields = {name: path for name, path in NESTED_FIELDS.items() if include_archetype or path[0] != "archetype"}
+    return raw.select(
+        *(
+            pl.col(name)
+            .str.to_date("%Y-%m-%d", strict=False)
+            .fill_null(pl.col(name).str.to_date("%m/%d/%Y", strict=False))
+            if name == "birthdate"
+            else pl.col(name)
+            for name in scalar_columns
+        ),
+        (pl.col("firstName") + " " + pl.col("lastName")).alias("fullName"),
+        *(_field(path).alias(name) for name, path in nested_fields.items()),
+        *(
+            pl.col("stats").struct.field(name).struct.field("value").alias(stat_format.format(name))
+            for name in stat_names
+        ),
+        *(pl.col("stats").struct.field(name).struct.field("diff").alias(f"{name}_diff") for name in stat_names),
+    )
+
+
+async def fetch_madden_ratings(
+    iteration: str,
+    locale: str = "en",
+    max_concurrency: int = 8,
+    manager: Optional[HTTPClientManager] = None,
+) -> pl.DataFrame:
+    """
+    Fetch every drop-api ratings page of an iteration and decode it.
+
+    Args:
+        iteration (str): Ratings iteration, e.g. ``"21-divisional-round"``.
+        locale (str): The locale for the ratings. Defaults to "en".
+        max_concurrency (int): Maximum number of pages in flight.
+        manager (Optional[HTTPClientManager]): Client manager to fetch with.
+
+    Returns:
+        pl.DataFrame: The decoded ratings (see ``decode_madden_ratings``).
+    """
+    url = f"{MADDEN_RATINGS_URL}?locale={locale}&iteration={iteration}"
+    items = await fetch_paginated(url, max_concurrency=max_concurrency, manager=manager)
+    return decode_madden_ratings(items)
+
+
+def _attribute_columns(df: pl.DataFrame) -> List[str]:
+    """``*_rating`` numeric columns plus the ``*_diff`` columns that belong to them."""
+    ratings = [name for name, dtype in df.schema.items() if name.endswith("_rating") and dtype.is_numeric()]
+    stems = {name[: -len("_rating")] for name in ratings}
+    diffs = [name for name in df.columns if name.endswith("_diff") and name[: -len("_diff")] in stems]
+    return ratings + diffs
+
+
+class RatingsMatrix:
+    """
+    Compact, array-backed store of Madden rating and diff attributes.
+
+    All attributes live in one contiguous ``players x attributes`` NumPy matrix
+    of int8 (or int16 when values do not fit), alongside a player index and an
+    attribute index. A league-wide iteration takes a few hundred KB instead of
+    thousands of pydantic objects. Filters, sorts and per-position aggregates
+    are vectorized over the matrix.
+
+    Missing ratings are stored as the dtype's minimum (``missing_value``) and
+    ignored by aggregates. Missing diffs mean "no change" and are stored as 0.
+
+    Example:
+        >>> matrix = RatingsMatrix.from_frame(madden_df, id_column="primaryKey", position_column="position")
+        >>> fast = matrix.filter(matrix.column("speed_rating") >= 90).sort_by("speed_rating")
+        >>> matrix.position_aggregate(["speed_rating", "awareness_rating"], how="mean")
+    """
+
+    def __init__(
+        self,
+        values: np.ndarray,
+        player_ids: np.ndarray,
+        positions: np.ndarray,
+        attributes: List[str],
+        iteration: Optional[str] = None,
+    ):
+        if values.shape != (len(player_ids), len(attributes)):
+            raise ValueError(
+                f"Matrix shape {values.shape} does not match {len(player_ids)} players x {len(attributes)} attributes"
+            )
+        self.values = values
+        self.player_ids = player_ids
+        self.positions = positions
+        self.attributes = list(attributes)
+        self.iteration = iteration
+        self.attribute_index: Dict[str, int] = {name: i for i, name in enumerate(self.attributes)}
+        self._player_index: Optional[Dict[Any, int]] = None
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pl.DataFrame,
+        id_column: str,
+        position_column: str,
+        attributes: Optional[List[str]] = None,
+        iteration: Optional[str] = None,
+    ) -> "RatingsMatrix":
+        """
+        Build a matrix from a ratings frame.
+
+        Args:
+            df (pl.DataFrame): One row per player.
+            id_column (str): Player id column (e.g. ``"primaryKey"`` or ``"id"``).
+            position_column (str): Position column used for aggregates.
+            attributes (Optional[List[str]]): Columns to store. Defaults to every
+                numeric ``*_rating`` column and its ``*_diff`` column.
+            iteration (Optional[str]): Label of the ratings iteration.
+
+        Returns:
+            RatingsMatrix: The matrix.
+        """
+        attributes = attributes or _attribute_columns(df)
+        frame = df.select(pl.col(name).fill_null(0) if name.endswith("_diff") else pl.col(name) for name in attributes)
+        bounds = frame.select(
+            pl.min_horizontal(pl.all().min()).alias("min"), pl.max_horizontal(pl.all().max()).alias("max")
+        ).row(0)
+        dtype = np.int8
+        if bounds[0] is not None and (bounds[0] <= np.iinfo(np.int8).min or bounds[1] > np.iinfo(np.int8).max):
+            dtype = np.int16
+        missing_value = int(np.iinfo(dtype).min)
+        values = frame.select(pl.all().fill_null(missing_value).cast(pl.Int16)).to_numpy().astype(dtype)
+        return cls(
+            np.ascontiguousarray(values),
+            df[id_column].to_numpy(),
+            df[position_column].to_numpy(),
+            attributes,
+            iteration,
+        )
+
+    @property
+    def missing_value(self) -> int:
+        return int(np.iinfo(self.values.dtype).min)
+
+    @property
+    def player_index(self) -> Dict[Any, int]:
+        if self._player_index is None:
+            self._player_index = {player_id: i for i, player_id in enumerate(self.player_ids.tolist())}
+        return self._player_index
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + self.player_ids.nbytes + self.positions.nbytes
+
+    def __len__(self) -> int:
+        return len(self.player_ids)
+
+    def column(self, attribute: str) -> np.ndarray:
+        """A view of one attribute across all players."""
+        return self.values[:, self.attribute_index[attribute]]
+
+    def player(self, player_id: Any) -> Dict[str, int]:
+        row = self.values[self.player_index[player_id]]
+        return dict(zip(self.attributes, row.tolist()))
+
+    def _take(self, rows: np.ndarray) -> "RatingsMatrix":
+        return RatingsMatrix(
+            self.values[rows], self.player_ids[rows], self.positions[rows], self.attributes, self.iteration
+        )
+
+    def filter(self, mask: np.ndarray) -> "RatingsMatrix":
+        """Keep the players where ``mask`` is True (e.g. ``matrix.column("speed_rating") >= 90``)."""
+        return self._take(np.asarray(mask, dtype=bool))
+
+    def at_position(self, *positions: str) -> "RatingsMatrix":
+        return self.filter(np.isin(self.positions, positions))
+
+    def sort_by(self, attribute: str, descending: bool = True) -> "RatingsMatrix":
+        """Sort players by one attribute; missing values sort last."""
+        column = self.column(attribute).astype(np.int32)
+        key = -column if descending else column
+        key[column == self.missing_value] = np.iinfo(np.int32).max
+        order = np.argsort(key, kind="stable")
+        return self._take(order)
+
+    def top(self, attribute: str, n: int = 10) -> "RatingsMatrix":
+        return self.sort_by(attribute)._take(np.arange(min(n, len(self))))
+
+    def position_aggregate(self, attributes: Optional[List[str]] = None, how: str = "mean") -> pl.DataFrame:
+        """
+        Aggregate attributes per position, ignoring missing ratings.
+
+        Args:
+            attributes (Optional[List[str]]): Attributes to aggregate. Defaults to all.
+            how (str): One of "mean", "median", "min", "max" or "std".
+
+        Returns:
+            pl.DataFrame: One row per position with a ``players`` count.
+        """
+        reducers = {"mean": np.nanmean, "median": np.nanmedian, "min": np.nanmin, "max": np.nanmax, "std": np.nanstd}
+        if how not in reducers:
+            raise ValueError(f"Unsupported aggregate: {how}")
+        attributes = attributes or self.attributes
+        columns = [self.attribute_index[name] for name in attributes]
+        values = self.values[:, columns].astype(np.float32)
+        values[self.values[:, columns] == self.missing_value] = np.nan
+
+        labels, codes = np.unique(self.positions, return_inverse=True)
+        order = np.argsort(codes, kind="stable")
+        starts = np.searchsorted(codes[order], np.arange(len(labels)))
+        with np.errstate(all="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            groups = [reducers[how](block, axis=0) for block in np.split(values[order], starts[1:])]
+        return pl.DataFrame(
+            {
+                "position": labels,
+                "players": np.bincount(codes, minlength=len(labels)),
+                **{name: np.array([group[i] for group in groups]) for i, name in enumerate(attributes)},
+            }
+        )
+
+    def to_frame(self, id_column: str = "player_id", position_column: str = "position") -> pl.DataFrame:
+        """Convert back to a frame, with missing ratings as nulls."""
+        frame = pl.DataFrame(self.values, schema=self.attributes, orient="row")
+        return frame.select(
+            pl.Series(id_column, self.player_ids),
+            pl.Series(position_column, self.positions),
+            pl.all().replace(self.missing_value, None),
+        )
@@ -0,0 +1,221 @@
+import logging
+from typing import Dict, List, Optional, Sequence
+
+import polars as pl
+from pydantic import BaseModel, ConfigDict
+
+NAME_SUFFIXES = ("jr", "sr", "ii", "iii", "iv", "v")
+
+# Known nicknames, keyed and valued by normalized name.
+NAME_ALIASES: Dict[str, str] = {
+    "hollywood brown": "marquise brown",
+}
+
+# Team abbreviations that differ between sources, mapped to the DraftKings form.
+TEAM_ALIASES: Dict[str, str] = {
+    "JAC": "JAX",
+    "WSH": "WAS",
+    "LA": "LAR",
+    "LVR": "LV",
+    "OAK": "LV",
+    "SD": "LAC",
+    "STL": "LAR",
+}
+
+POSITION_ALIASES: Dict[str, str] = {
+    "HB": "RB",
+    "D/ST": "DST",
+    "DEF": "DST",
+}
+
+
+def normalize_name(name: pl.Expr, aliases: Optional[Dict[str, str]] = None) -> pl.Expr:
+    """
+    Normalize player names so the same player compares equal across sources.
+
+    Lowercases, drops punctuation, turns hyphens into spaces, strips generational
+    suffixes (Jr, Sr, II-V) and joins leading initials, so "D.J. Moore",
+    "DJ Moore" and "D J Moore" all become "dj moore". Everything runs as native
+    polars string expressions.
+
+    Args:
+        name (pl.Expr): Expression holding the raw name.
+        aliases (Optional[Dict[str, str]]): Normalized nickname -> normalized
+            name replacements applied last. Defaults to ``NAME_ALIASES``.
+
+    Returns:
+        pl.Expr: The normalized name.
+    """
+    suffixes = "|".join(NAME_SUFFIXES)
+    normalized = (
+        name.str.to_lowercase()
+        .str.replace_all(r"[.'’`]", "")
+        .str.replace_all(r"[-_,]", " ")
+        .str.replace_all(r"\s+", " ")
+        .str.strip_chars()
+        .str.replace(rf" ({suffixes})$", "")
+        .str.replace(r"^([a-z]) ([a-z]) ", "${1}${2} ")
+    )
+    aliases = NAME_ALIASES if aliases is None else aliases
+    return normalized.replace(aliases) if aliases else normalized
+
+
+def normalize_team(team: pl.Expr) -> pl.Expr:
+    return team.str.to_uppercase().str.strip_chars().replace(TEAM_ALIASES)
+
+
+def normalize_position(position: pl.Expr) -> pl.Expr:
+    """Uppercase a position and map source-specific labels (e.g. "HB") to a common one."""
+    return position.str.to_uppercase().str.strip_chars().replace(POSITION_ALIASES)
+
+
+class NameMatchResult(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    matches: pl.DataFrame
+    unmatched: pl.DataFrame
+
+    @property
+    def match_rate(self) -> float:
+        total = self.matches.height + self.unmatched.height
+        return self.matches.height / total if total else 1.0
+
+
+def _prepare(df: pl.DataFrame, name_column: str, block_on: Sequence[str], aliases: Optional[Dict[str, str]]):
+    return df.with_row_index("_row").select(
+        "_row",
+        *block_on,
+        normalize_name(pl.col(name_column), aliases).alias("_name"),
+    ).with_columns(pl.col("_name").str.split(" ").list.last().alias("_last"))
+
+
+def _one_to_one(pairs: pl.DataFrame) -> pl.DataFrame:
+    """Keep only pairs whose left and right rows each appear exactly once."""
+    return pairs.filter((pl.len().over("_left_row") == 1) & (pl.len().over("_right_row") == 1))
+
+
+def _key_pairs(left: pl.DataFrame, right: pl.DataFrame, on: List[str]) -> pl.DataFrame:
+    pairs = left.select("_row", *on).join(right.select("_row", *on), on=on, how="inner", suffix="_right")
+    return _one_to_one(pairs.select(pl.col("_row").alias("_left_row"), pl.col("_row_right").alias("_right_row")))
+
+
+def _trigrams(df: pl.DataFrame, block_on: Sequence[str]) -> pl.DataFrame:
+    padded = pl.lit("  ") + pl.col("_name") + pl.lit(" ")
+    return (
+        df.select("_row", *block_on, padded.alias("_padded"))
+        .with_columns(pl.int_ranges(0, pl.col("_padded").str.len_chars() - 2).alias("_offset"))
+        .explode("_offset")
+        .select("_row", *block_on, pl.col("_padded").str.slice(pl.col("_offset"), 3).alias("_gram"))
+        .unique()
+    )
+
+
+def _fuzzy_pairs(left: pl.DataFrame, right: pl.DataFrame, block_on: Sequence[str], min_similarity: float):
+    """Best mutual trigram-Jaccard pairs within each block, scored in one batch."""
+    left_grams = _trigrams(left, block_on)
+    right_grams = _trigrams(right, block_on)
+    left_sizes = left_grams.group_by("_row").len("_left_size").rename({"_row": "_left_row"})
+    right_sizes = right_grams.group_by("_row").len("_right_size").rename({"_row": "_right_row"})
+
+    shared = (
+        left_grams.join(right_grams, on=[*block_on, "_gram"], how="inner", suffix="_right")
+        .group_by(pl.col("_row").alias("_left_row"), pl.col("_row_right").alias("_right_row"))
+        .len("_shared")
+    )
+    scored = (
+        shared.join(left_sizes, on="_left_row")
+        .join(right_sizes, on="_right_row")
+        .with_columns(
+            (pl.col("_shared") / (pl.col("_left_size") + pl.col("_right_size") - pl.col("_shared"))).alias("_score")
+        )
+        .filter(pl.col("_score") >= min_similarity)
+        .filter(
+            (pl.col("_score") == pl.col("_score").max().over("_left_row"))
+            & (pl.col("_score") == pl.col("_score").max().over("_right_row"))
+        )
+    )
+    return _one_to_one(scored.select("_left_row", "_right_row", "_score"))
+
+
+def match_players(
+    left: pl.DataFrame,
+    right: pl.DataFrame,
+    left_name: str,
+    right_name: str,
+    left_id: str,
+    right_id: str,
+    block_on: Sequence[str] = (),
+    aliases: Optional[Dict[str, str]] = None,
+    min_similarity: float = 0.6,
+) -> NameMatchResult:
+    """
+    Match players between two sources by name, one-to-one.
+
+    Names are normalized with ``normalize_name`` and matched in tiers, each tier
+    only considering rows left unmatched by the previous ones:
+
+    1. ``exact``: same normalized name within the block.
+    2. ``name``: same normalized name ignoring the block (e.g. a team change).
+    3. ``last_name``: same last name within the block (skipped without a block).
+    4. ``fuzzy``: best mutual trigram Jaccard similarity within the block, at
+       least ``min_similarity``.
+
+    A pair is accepted only when it is unambiguous on both sides. Every tier is
+    a polars join, so no Python function runs per row.
+
+    Args:
+        left (pl.DataFrame): Source to match from.
+        right (pl.DataFrame): Source to match against.
+        left_name (str): Player name column in ``left``.
+        right_name (str): Player name column in ``right``.
+        left_id (str): Unique player id column in ``left``.
+        right_id (str): Unique player id column in ``right``.
+        block_on (Sequence[str]): Columns present in both frames (e.g. normalized
+            team and position) that a match must agree on.
+        aliases (Optional[Dict[str, str]]): Nickname replacements passed to
+            ``normalize_name``.
+        min_similarity (float): Minimum trigram similarity for fuzzy matches.
+
+    Returns:
+        NameMatchResult: ``matches`` with ``left_id``, ``right_id``,
+        ``match_method`` and ``match_score`` columns, and the ``unmatched``
+        rows of ``left``.
+    """
+    block_on = list(block_on)
+    left_pool = _prepare(left, left_name, block_on, aliases)
+    right_pool = _prepare(right, right_name, block_on, aliases)
+
+    tiers = [("exact", ["_name", *block_on]), ("name", ["_name"])]
+    if block_on:
+        tiers.append(("last_name", ["_last", *block_on]))
+
+    matched: List[pl.DataFrame] = []
+    for method, on in [*tiers, ("fuzzy", None)]:
+        if left_pool.is_empty() or right_pool.is_empty():
+            break
+        if on is None:
+            pairs = _fuzzy_pairs(left_pool, right_pool, block_on, min_similarity)
+        else:
+            pairs = _key_pairs(left_pool, right_pool, on).with_columns(pl.lit(1.0).alias("_score"))
+        matched.append(pairs.with_columns(pl.lit(method).alias("match_method")))
+        left_pool = left_pool.join(pairs, left_on="_row", right_on="_left_row", how="anti")
+        right_pool = right_pool.join(pairs, left_on="_row", right_on="_right_row", how="anti")
+
+    pairs = pl.concat(matched) if matched else pl.DataFrame(
+        schema={"_left_row": pl.UInt32, "_right_row": pl.UInt32, "_score": pl.Float64, "match_method": pl.String}
+    )
+    left_ids = left.select(pl.col(left_id).alias("left_id")).with_row_index("_left_row")
+    right_ids = right.select(pl.col(right_id).alias("right_id")).with_row_index("_right_row")
+    matches = (
+        pairs.join(left_ids, on="_left_row")
+        .join(right_ids, on="_right_row")
+        .sort("_left_row")
+        .select("left_id", "right_id", "match_method", pl.col("_score").alias("match_score"))
+    )
+    unmatched = left.with_row_index("_row").join(left_pool.select("_row"), on="_row", how="semi").drop("_row")
+
+    if unmatched.height:
+        sample = ", ".join(unmatched[left_name].head(10).cast(pl.String).to_list())
+        logging.warning(f"{unmatched.height} of {left.height} players unmatched by name, e.g. {sample}")
+    logging.info(f"Matched {matches.height} players: {matches['match_method'].value_counts().rows()}")
+    return NameMatchResult(matches=matches, unmatched=unmatched)
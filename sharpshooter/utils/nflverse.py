@@ -0,0 +1,128 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple, Union
+
+import polars as pl
+
+from .cache import HTTPCache, get_http_cache
+
+NFLVERSE_BASE_URL = "https://github.com/nflverse/nflverse-data/releases/download"
+
+
+def pbp_url(season: int, base_url: str = NFLVERSE_BASE_URL) -> str:
+    return f"{base_url}/pbp/play_by_play_{season}.parquet"
+
+
+def player_stats_url(season: int, base_url: str = NFLVERSE_BASE_URL) -> str:
+    return f"{base_url}/player_stats/player_stats_{season}.parquet"
+
+
+def _scan_seasons(
+    url: Callable[[int], str],
+    seasons: Union[int, Iterable[int]],
+    columns: Optional[Sequence[str]],
+    filters: List[pl.Expr],
+    cache: Optional[HTTPCache],
+) -> pl.LazyFrame:
+    seasons = [seasons] if isinstance(seasons, int) else list(seasons)
+    if not seasons:
+        raise ValueError("At least one season is required")
+    cache = cache or get_http_cache()
+
+    with ThreadPoolExecutor(max_workers=min(4, len(seasons))) as executor:
+        paths = list(executor.map(lambda season: cache.get_path(url(season)), seasons))
+
+    frames = []
+    for path in paths:
+        frame = pl.scan_parquet(path)
+        if filters:
+            frame = frame.filter(pl.all_horizontal(filters))
+        if columns is not None:
+            frame = frame.select(columns)
+        frames.append(frame)
+
+    # Column types drift between seasons, so each season is scanned on its own
+    # and the results are unioned with relaxed type coercion.
+    return pl.concat(frames, how="diagonal_relaxed")
+
+
+def scan_nflverse_pbp(
+    seasons: Union[int, Iterable[int]],
+    columns: Optional[Sequence[str]] = None,
+    season_type: Optional[str] = None,
+    weeks: Optional[Tuple[int, int]] = None,
+    play_types: Optional[Sequence[str]] = None,
+    predicate: Optional[pl.Expr] = None,
+    cache: Optional[HTTPCache] = None,
+) -> pl.LazyFrame:
+    """
+    Lazily scan nflverse play-by-play across one or more seasons.
+
+    Season files are downloaded (or revalidated) through the on-disk cache and
+    scanned from local disk. Nothing is read until the frame is collected. The
+    projection and the filters are pushed down into the parquet reader, so only
+    the requested columns of matching row groups are materialized.
+
+    Args:
+        seasons (Union[int, Iterable[int]]): Season or seasons to scan.
+        columns (Optional[Sequence[str]]): Columns to keep. All columns when None.
+        season_type (Optional[str]): Keep only this ``season_type`` ("REG" or "POST").
+        weeks (Optional[Tuple[int, int]]): Inclusive ``(first, last)`` week range.
+        play_types (Optional[Sequence[str]]): Keep only these ``play_type`` values.
+        predicate (Optional[pl.Expr]): Any additional filter expression.
+        cache (Optional[HTTPCache]): Download cache. Defaults to the shared cache.
+
+    Returns:
+        pl.LazyFrame: The filtered, projected play-by-play across all seasons.
+
+    Example:
+        >>> targets = (
+        ...     scan_nflverse_pbp(range(2018, 2025), columns=["season", "week", "receiver_player_id"],
+        ...                       season_type="REG", play_types=["pass"])
+        ...     .group_by("season", "week", "receiver_player_id").len()
+        ...     .collect()
+        ... )
+    """
+    filters: List[pl.Expr] = []
+    if season_type is not None:
+        filters.append(pl.col("season_type") == season_type)
+    if weeks is not None:
+        filters.append(pl.col("week").is_between(weeks[0], weeks[1]))
+    if play_types is not None:
+        filters.append(pl.col("play_type").is_in(list(play_types)))
+    if predicate is not None:
+        filters.append(predicate)
+    logging.info(f"Scanning play-by-play for seasons {seasons}")
+    return _scan_seasons(pbp_url, seasons, columns, filters, cache)
+
+
+def scan_nflverse_player_stats(
+    seasons: Union[int, Iterable[int]],
+    columns: Optional[Sequence[str]] = None,
+    season_type: Optional[str] = None,
+    positions: Optional[Sequence[str]] = None,
+    cache: Optional[HTTPCache] = None,
+) -> pl.LazyFrame:
+    """
+    Lazily scan nflverse weekly player stats across one or more seasons.
+
+    Works like ``scan_nflverse_pbp``: files go through the download cache and
+    the projection and filters are pushed down into the parquet reader.
+
+    Args:
+        seasons (Union[int, Iterable[int]]): Season or seasons to scan.
+        columns (Optional[Sequence[str]]): Columns to keep. All columns when None.
+        season_type (Optional[str]): Keep only this ``season_type`` ("REG" or "POST").
+        positions (Optional[Sequence[str]]): Keep only these positions.
+        cache (Optional[HTTPCache]): Download cache. Defaults to the shared cache.
+
+    Returns:
+        pl.LazyFrame: One row per player and week.
+    """
+    filters: List[pl.Expr] = []
+    if season_type is not None:
+        filters.append(pl.col("season_type") == season_type)
+    if positions is not None:
+        filters.append(pl.col("position").is_in(list(positions)))
+    logging.info(f"Scanning weekly player stats for seasons {seasons}")
+    return _scan_seasons(player_stats_url, seasons, columns, filters, cache)
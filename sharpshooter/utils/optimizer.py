@@ -0,0 +1,689 @@
+import itertools
+import logging
+import math
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import polars as pl
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class RosterSlot(BaseModel):
+    name: str
+    positions: Tuple[str, ...]
+    count: int = Field(default=1)
+
+
+# DraftKings NFL Classic: QB, 2 RB, 3 WR, TE, FLEX (RB/WR/TE), DST under a $50,000 cap.
+CLASSIC_ROSTER: Tuple[RosterSlot, ...] = (
+    RosterSlot(name="QB", positions=("QB",)),
+    RosterSlot(name="RB", positions=("RB",), count=2),
+    RosterSlot(name="WR", positions=("WR",), count=3),
+    RosterSlot(name="TE", positions=("TE",)),
+    RosterSlot(name="FLEX", positions=("RB", "WR", "TE")),
+    RosterSlot(name="DST", positions=("DST",)),
+)
+
+
+class Stack(BaseModel):
+    """
+    Require ``count`` teammates (and ``opponent_count`` players from the
+    opposing team) alongside every rostered ``primary`` player.
+    """
+
+    primary: Tuple[str, ...] = Field(default=("QB",))
+    teammates: Tuple[str, ...] = Field(default=("WR", "TE"))
+    count: int = Field(default=1)
+    opponents: Tuple[str, ...] = Field(default=("RB", "WR", "TE"))
+    opponent_count: int = Field(default=0)
+
+
+class OptimizerSettings(BaseModel):
+    roster: Tuple[RosterSlot, ...] = Field(default=CLASSIC_ROSTER)
+    salary_cap: int = Field(default=50000)
+    min_salary: int = Field(default=0)
+    min_unique: int = Field(default=1)
+    max_exposure: float = Field(default=1.0)
+    exposures: Dict[int, float] = Field(default_factory=dict)  # playerId -> max share of lineups
+    stacks: Tuple[Stack, ...] = Field(default=())
+    min_games: int = Field(default=2)
+    max_per_team: Optional[int] = Field(default=None)
+    games: Optional[Tuple[int, ...]] = Field(default=None)  # competition ids to draw players from
+    locked: Tuple[int, ...] = Field(default=())  # playerIds in every lineup
+    excluded: Tuple[int, ...] = Field(default=())  # playerIds in no lineup
+
+
+class LineupSet(BaseModel):
+    """
+    Lineups produced by ``LineupOptimizer``.
+
+    ``lineups`` is long, one row per rostered player, keyed by ``lineup_id``
+    and ``slot``. ``summary`` has one row per lineup with its salary and
+    projection, best first.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    lineups: pl.DataFrame
+    summary: pl.DataFrame
+
+    def __len__(self) -> int:
+        return self.summary.height
+
+    def exposures(self) -> pl.DataFrame:
+        """Share of lineups each player appears in."""
+        return (
+            self.lineups.group_by("playerId", "displayName", "position", "teamAbbreviation")
+            .agg(pl.col("lineup_id").n_unique().alias("lineups"))
+            .with_columns((pl.col("lineups") / max(len(self), 1)).alias("exposure"))
+            .sort("lineups", "playerId", descending=[True, False])
+        )
+
+    def to_entries(self) -> pl.DataFrame:
+        """One row per lineup with a draftableId column per slot (``RB1``, ``RB2``, ...), e.g. for upload."""
+        return (
+            self.lineups.with_columns((pl.col("slot") + (pl.col("slot_index") + 1).cast(pl.String)).alias("entry_slot"))
+            .pivot(on="entry_slot", index="lineup_id", values="draftableId", sort_columns=False)
+            .join(self.summary, on="lineup_id")
+            .sort("lineup_id")
+        )
+
+
+def _assign_slots(positions: List[str], roster: Tuple[RosterSlot, ...]) -> Optional[List[str]]:
+    """Slot name for each position, by bipartite matching; None if they do not fill the roster."""
+    slots = [slot for slot in roster for _ in range(slot.count)]
+    owner: List[Optional[int]] = [None] * len(slots)
+
+    def place(player: int, seen: set) -> bool:
+        for index, slot in enumerate(slots):
+            if positions[player] in slot.positions and index not in seen:
+                seen.add(index)
+                if owner[index] is None or place(owner[index], seen):
+                    owner[index] = player
+                    return True
+        return False
+
+    if len(positions) != len(slots) or not all(place(player, set()) for player in range(len(positions))):
+        return None
+    names = [""] * len(positions)
+    for index, player in enumerate(owner):
+        names[player] = slots[index].name
+    return names
+
+
+class _Composition(BaseModel):
+    """One way of filling the roster, as a count per position."""
+
+    groups: List[Tuple[str, int]]
+    column_positions: List[str]
+    column_slots: List[str]
+
+
+class _Search(BaseModel):
+    """
+    One independent branch of the search: a composition, and with an
+    in-search stack the team of its primary player.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    composition: int
+    groups: List[Tuple[np.ndarray, int]]  # candidate player rows and how many to pick, per group
+    team: Optional[int] = Field(default=None)
+    need: Tuple[int, int] = Field(default=(0, 0))  # teammates and opponents still required
+
+
+class _SearchTooLarge(Exception):
+    pass
+
+
+class _Selection:
+    """
+    Lineups accepted so far, taken greedily best first, with the exposure
+    counts and the overlap state the next candidates are checked against.
+    """
+
+    def __init__(self, n: int, limits: np.ndarray, min_unique: int):
+        self.n = n
+        self.limits = limits
+        self.used = np.zeros(len(limits), dtype=np.int64)
+        self.min_unique = min_unique
+        self.seen: set = set()
+        self.scores: List[float] = []
+        self.lineups: List[np.ndarray] = []
+        self.compositions: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def offer(self, scores: np.ndarray, lineups: np.ndarray, compositions: np.ndarray) -> np.ndarray:
+        """
+        Accept, best first, the candidates that respect ``min_unique`` and the
+        exposure limits against the lineups already taken.
+
+        Returns:
+            np.ndarray: Player rows that reached their exposure limit.
+        """
+        full = self.used >= self.limits
+        open_ = ~full[lineups].any(axis=1)
+        # Two lineups share too many players iff they share a subset of this size.
+        shared = lineups.shape[1] - self.min_unique + 1
+        for score, lineup, composition in zip(scores[open_], lineups[open_], compositions[open_]):
+            if len(self) == self.n:
+                break
+            if np.any(self.used[lineup] >= self.limits[lineup]):
+                continue
+            subsets = list(itertools.combinations(sorted(lineup.tolist()), shared))
+            if any(subset in self.seen for subset in subsets):
+                continue
+            self.seen.update(subsets)
+            self.used[lineup] += 1
+            self.scores.append(float(score))
+            self.lineups.append(lineup)
+            self.compositions.append(int(composition))
+        return np.flatnonzero((self.used >= self.limits) & ~full)
+
+
+class LineupOptimizer:
+    """
+    Exact top-N salary-cap lineup optimizer over DraftKings draftables.
+
+    The search is a vectorized branch-and-bound over position groups, run once
+    per way of filling the roster (e.g. the FLEX as an RB, WR or TE). A dynamic
+    program over salary first gives, for every point of the search, the best
+    score any completion can still reach with the remaining salary. Every
+    lineup scoring at least a threshold is then enumerated level by level with
+    NumPy, pruning partial lineups whose bound falls short. The bound is exact,
+    so every kept partial lineup completes into a kept lineup and the work
+    grows with the number of lineups returned, not with the slate size. The
+    threshold is lowered band by band until enough lineups pass the
+    constraints.
+
+    The first stack whose primary fills a single roster slot (the usual QB
+    stack) is part of the search: there is one branch per primary team, and
+    the bound also tracks the teammates and opponents still required. Other
+    stacks, team and game limits are checked on the enumerated lineups.
+
+    Lineups are accepted best first, skipping any that break ``min_unique`` or
+    an exposure limit against the ones already taken. That gives the same
+    lineups as re-solving an integer program with cuts after every lineup, at
+    a small fraction of the cost. Players at their exposure limit are dropped
+    from the search before the next band. With ``workers > 1`` the branches
+    are spread over processes.
+
+    Example:
+        >>> draftables = flatten_draftables(body, draft_group_id).draftables.join(projections, on="playerId")
+        >>> optimizer = LineupOptimizer(draftables, "projection", OptimizerSettings(stacks=(Stack(count=2),)))
+        >>> lineups = optimizer.optimize(3000, workers=4)
+        >>> lineups.summary.head()
+    """
+
+    # Partial lineups expanded per vectorized step, and the most kept at any level.
+    block_size = 4096
+    max_states = 2_000_000
+    # Lineups each band of scores is sized to hold.
+    band_size = 100_000
+    # Bound tables kept between passes; beyond this they are rebuilt.
+    table_cache_bytes = 512 * 1024**2
+
+    def __init__(self, draftables: pl.DataFrame, projection_column: str, settings: Optional[OptimizerSettings] = None):
+        self.projection_column = projection_column
+        self.settings = settings or OptimizerSettings()
+        players = draftables.filter(
+            pl.col(projection_column).is_not_null(),
+            pl.col("salary").is_not_null(),
+            ~pl.col("playerId").is_in(list(self.settings.excluded)),
+        )
+        if "isDisabled" in players.columns:
+            players = players.filter(~pl.col("isDisabled").fill_null(False))
+        if self.settings.games is not None:
+            players = players.filter(pl.col("competition_id").is_in(list(self.settings.games)))
+        if "competition_id" not in players.columns:
+            players = players.with_columns(pl.lit(None, pl.Int64).alias("competition_id"))
+        # One draftable per player, with its primary position; highest projection first.
+        self.players = (
+            players.with_columns(
+                pl.col(projection_column).cast(pl.Float64).alias("projection"),
+                pl.col("position").str.split("/").list.first().alias("position"),
+            )
+            .sort("projection", "salary", "playerId", descending=[True, False, False])
+            .unique("playerId", keep="first", maintain_order=True)
+        )
+        self._tables: Dict[int, List[np.ndarray]] = {}
+        self._prepare()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Worker processes rebuild the bound tables they need.
+        return {**self.__dict__, "_tables": {}}
+
+    def _prepare(self) -> None:
+        settings = self.settings
+        players = self.players
+        salary = players["salary"].to_numpy().astype(np.int64)
+        self.unit = math.gcd(settings.salary_cap, *salary.tolist()) or 1
+        self.salary = salary // self.unit
+        self.projection = players["projection"].to_numpy()
+        self.positions = players["position"].to_numpy()
+        self.team_code = players["teamAbbreviation"].rank("dense").cast(pl.Int64).to_numpy() - 1
+        self.game_code = players["competition_id"].rank("dense").cast(pl.Int64).fill_null(0).to_numpy() - 1
+        self.opponent = self._opponent_codes()
+
+        locked = players["playerId"].is_in(list(settings.locked)).to_numpy()
+        missing = set(settings.locked) - set(players.filter(pl.Series(locked))["playerId"].to_list())
+        if missing:
+            raise ValueError(f"Locked players are not on the slate: {sorted(missing)}")
+        self.locked_rows = np.flatnonzero(locked)
+        self.cap = settings.salary_cap // self.unit - int(self.salary[self.locked_rows].sum())
+        self.locked_score = float(self.projection[self.locked_rows].sum())
+        self.position_rows = {
+            position: np.flatnonzero((self.positions == position) & ~locked) for position in np.unique(self.positions)
+        }
+        self.compositions = self._compositions()
+        if not self.compositions:
+            raise ValueError("The slate cannot fill the roster")
+        self.search_stack = next(
+            (
+                stack
+                for stack in settings.stacks
+                if all(
+                    sum(position in stack.primary for position in composition.column_positions) == 1
+                    for composition in self.compositions
+                )
+            ),
+            None,
+        )
+        self.available = ~locked
+        self.searches = self._searches()
+
+    def _opponent_codes(self) -> np.ndarray:
+        """Opponent team code per team code (-1 when unknown)."""
+        opponent = np.full(int(self.team_code.max(initial=-1)) + 1, -1, dtype=np.int64)
+        pairs = np.unique(np.stack([self.game_code, self.team_code], axis=1), axis=0)
+        for game in np.unique(pairs[:, 0]):
+            teams = pairs[pairs[:, 0] == game, 1]
+            if game >= 0 and len(teams) == 2:
+                opponent[teams[0]], opponent[teams[1]] = teams[1], teams[0]
+        return opponent
+
+    def _compositions(self) -> List[_Composition]:
+        roster = self.settings.roster
+        locked_positions = Counter(self.positions[self.locked_rows].tolist())
+        counts = {
+            tuple(sorted(Counter(choice).items()))
+            for choice in itertools.product(*(slot.positions for slot in roster for _ in range(slot.count)))
+        }
+        compositions = []
+        for count in sorted(counts):
+            remaining = Counter(dict(count))
+            remaining.subtract(locked_positions)
+            if any(value < 0 for value in remaining.values()):
+                continue
+            groups = [(position, value) for position, value in remaining.items() if value > 0]
+            if any(len(self.position_rows.get(position, [])) < value for position, value in groups):
+                continue
+            # Expand small groups first, so the early levels of the search stay narrow.
+            groups.sort(key=lambda group: math.comb(len(self.position_rows[group[0]]), group[1]))
+            column_positions = [position for position, value in groups for _ in range(value)]
+            column_positions += self.positions[self.locked_rows].tolist()
+            column_slots = _assign_slots(column_positions, roster)
+            if column_slots is not None:
+                compositions.append(
+                    _Composition(groups=groups, column_positions=column_positions, column_slots=column_slots)
+                )
+        return compositions
+
+    def _tags(self, team: Optional[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Players counting as teammates and as opponents for a stack on ``team``."""
+        stack = self.search_stack
+        if team is None or stack is None:
+            none = np.zeros(len(self.positions), dtype=bool)
+            return none, none
+        teammate = np.isin(self.positions, stack.teammates) & (self.team_code == team)
+        opponent = np.isin(self.positions, stack.opponents) & (self.team_code == self.opponent[team])
+        return teammate, opponent & (self.opponent[team] >= 0)
+
+    def _searches(self) -> List[_Search]:
+        """Search branches over the players still available."""
+        stack = self.search_stack
+        searches = []
+        for index, composition in enumerate(self.compositions):
+            groups = [
+                (position, self.position_rows[position][self.available[self.position_rows[position]]], count)
+                for position, count in composition.groups
+            ]
+            if any(len(rows) < count for _, rows, count in groups):
+                continue
+            if stack is None:
+                searches.append(_Search(composition=index, groups=[(rows, count) for _, rows, count in groups]))
+                continue
+            locked_primary = [row for row in self.locked_rows if self.positions[row] in stack.primary]
+            if locked_primary:
+                teams = [int(self.team_code[locked_primary[0]])]
+            else:
+                primary_rows = np.concatenate([rows for position, rows, _ in groups if position in stack.primary])
+                teams = np.unique(self.team_code[primary_rows]).tolist()
+            for team in teams:
+                team_groups = [
+                    (rows[self.team_code[rows] == team] if position in stack.primary else rows, count)
+                    for position, rows, count in groups
+                ]
+                if any(len(rows) < count for rows, count in team_groups):
+                    continue
+                teammate, opponent = self._tags(team)
+                need = (
+                    max(stack.count - int(teammate[self.locked_rows].sum()), 0),
+                    max(stack.opponent_count - int(opponent[self.locked_rows].sum()), 0),
+                )
+                searches.append(_Search(composition=index, groups=team_groups, team=team, need=need))
+        return searches
+
+    def _exclude(self, rows: np.ndarray) -> None:
+        """Drop players from every later search, e.g. once they reach their exposure limit."""
+        self.available[rows] = False
+        self.searches = self._searches()
+        self._tables = {}
+
+    def _bound_tables(self, search: _Search) -> List[np.ndarray]:
+        """
+        ``tables[g][i, k, s, a, b]``: best score from picking ``k`` more
+        players of group ``g`` among its items ``i..`` plus every later group
+        in full, within salary ``s``, while still needing ``a`` stack teammates
+        and ``b`` opponents (-inf when impossible).
+        """
+        cap = max(self.cap, 0)
+        teammate, opponent = self._tags(search.team)
+        need_teammates, need_opponents = search.need
+        next_teammates = np.maximum(np.arange(need_teammates + 1) - 1, 0)
+        next_opponents = np.maximum(np.arange(need_opponents + 1) - 1, 0)
+        later = np.full((cap + 1, need_teammates + 1, need_opponents + 1), -np.inf)
+        later[:, 0, 0] = 0.0
+        tables: List[np.ndarray] = [np.empty(0)] * len(search.groups)
+        for index in reversed(range(len(search.groups))):
+            rows, count = search.groups[index]
+            table = np.empty((len(rows) + 1, count + 1, *later.shape))
+            table[:, 0] = later
+            table[-1, 1:] = -np.inf
+            for item in range(len(rows) - 1, -1, -1):
+                row = rows[item]
+                weight = self.salary[row]
+                table[item, 1:] = table[item + 1, 1:]
+                if weight > cap:
+                    continue
+                previous = table[item + 1, :-1, : cap + 1 - weight]
+                if teammate[row]:
+                    previous = previous[:, :, next_teammates]
+                if opponent[row]:
+                    previous = previous[:, :, :, next_opponents]
+                target = table[item, 1:, weight:]
+                np.maximum(target, self.projection[row] + previous, out=target)
+            tables[index] = table
+            later = table[0, count]
+        return tables
+
+    def _tables_for(self, index: int) -> List[np.ndarray]:
+        if index in self._tables:
+            return self._tables[index]
+        tables = self._bound_tables(self.searches[index])
+        cached = sum(table.nbytes for entry in self._tables.values() for table in entry)
+        if cached + sum(table.nbytes for table in tables) <= self.table_cache_bytes:
+            self._tables[index] = tables
+        return tables
+
+    def _best(self, index: int) -> float:
+        search = self.searches[index]
+        if self.cap < 0 or not search.groups:
+            return self.locked_score if self.cap >= 0 and search.need == (0, 0) else -np.inf
+        _, count = search.groups[0]
+        bound = self._tables_for(index)[0][0, count, self.cap, search.need[0], search.need[1]]
+        return float(bound) + self.locked_score
+
+    def _enumerate(self, index: int, threshold: float, part: int = 0, parts: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """Every lineup of a search branch scoring at least ``threshold``, as (scores, player rows)."""
+        search = self.searches[index]
+        tables = self._tables_for(index) if self.cap >= 0 else []
+        teammate, opponent = self._tags(search.team)
+        width = len(self.compositions[search.composition].column_positions)
+        score = np.zeros(1)
+        remaining = np.array([self.cap], dtype=np.int64)
+        chosen = np.zeros((1, 0), dtype=np.int32)
+        need_teammates = np.array([search.need[0]], dtype=np.int64)
+        need_opponents = np.array([search.need[1]], dtype=np.int64)
+        if self.cap < 0:
+            return np.zeros(0), np.zeros((0, width), dtype=np.int32)
+        # Scores below are of the players still to pick.
+        threshold -= self.locked_score
+        for level, (rows, count) in enumerate(search.groups):
+            weights, values = self.salary[rows], self.projection[rows]
+            is_teammate, is_opponent = teammate[rows].astype(np.int64), opponent[rows].astype(np.int64)
+            items = np.arange(len(rows))
+            start = np.zeros(len(score), dtype=np.int64)
+            for pick in range(count):
+                # Bounds after this pick, flattened so they can be looked up with a single ``take``.
+                bounds = np.ascontiguousarray(tables[level][:, count - pick - 1])
+                salaries, teammates, opponents = bounds.shape[1:]
+                bounds = bounds.ravel()
+                allowed = items % parts == part if level == 0 and pick == 0 else np.ones(len(items), dtype=bool)
+                blocks = []
+                for block in range(0, len(score), self.block_size):
+                    fits = (
+                        (items[None, :] >= start[block : block + self.block_size, None])
+                        & (weights[None, :] <= remaining[block : block + self.block_size, None])
+                        & allowed[None, :]
+                    )
+                    parent, item = np.nonzero(fits)
+                    parent += block
+                    new_score = score[parent] + values[item]
+                    new_remaining = remaining[parent] - weights[item]
+                    new_teammates = np.maximum(need_teammates[parent] - is_teammate[item], 0)
+                    new_opponents = np.maximum(need_opponents[parent] - is_opponent[item], 0)
+                    position = (((item + 1) * salaries + new_remaining) * teammates + new_teammates) * opponents
+                    keep = new_score + bounds.take(position + new_opponents) >= threshold - 1e-9
+                    parent, item = parent[keep], item[keep]
+                    blocks.append(
+                        (
+                            new_score[keep],
+                            new_remaining[keep],
+                            np.column_stack([chosen[parent], rows[item].astype(np.int32)]),
+                            item + 1,
+                            new_teammates[keep],
+                            new_opponents[keep],
+                        )
+                    )
+                score, remaining, chosen, start, need_teammates, need_opponents = (
+                    np.concatenate(arrays) for arrays in zip(*blocks)
+                )
+                if not len(score):
+                    return score, np.zeros((0, width), dtype=np.int32)
+                if len(score) > self.max_states:
+                    raise _SearchTooLarge(f"{len(score)} partial lineups above threshold {threshold:.2f}")
+        locked = np.broadcast_to(self.locked_rows.astype(np.int32), (len(score), len(self.locked_rows)))
+        return score + self.locked_score, np.hstack([chosen, locked])
+
+    def _satisfies(self, composition: _Composition, chosen: np.ndarray) -> np.ndarray:
+        """Mask of the lineups meeting the salary floor, team, game and stack constraints."""
+        settings = self.settings
+        keep = np.ones(len(chosen), dtype=bool)
+        if settings.min_salary:
+            keep &= self.salary[chosen].sum(axis=1) * self.unit >= settings.min_salary
+        teams = self.team_code[chosen]
+        if settings.max_per_team is not None:
+            ordered = np.sort(teams, axis=1)
+            largest = np.max(
+                [(ordered == ordered[:, [column]]).sum(axis=1) for column in range(ordered.shape[1])], axis=0
+            )
+            keep &= largest <= settings.max_per_team
+        if settings.min_games > 1 and self.game_code.max(initial=-1) >= settings.min_games - 1:
+            games = np.sort(self.game_code[chosen], axis=1)
+            keep &= 1 + (np.diff(games, axis=1) != 0).sum(axis=1) >= settings.min_games
+        positions = np.array(composition.column_positions)
+        for stack in settings.stacks:
+            primary = np.flatnonzero(np.isin(positions, stack.primary))
+            teammates = np.isin(positions, stack.teammates)
+            opponents = np.isin(positions, stack.opponents)
+            for column in primary:
+                team = teams[:, [column]]
+                primaries = (teams[:, primary] == team).sum(axis=1)
+                keep &= (teams[:, teammates] == team).sum(axis=1) >= stack.count * primaries
+                if stack.opponent_count:
+                    opponent = self.opponent[team]
+                    keep &= (teams[:, opponents] == opponent).sum(axis=1) >= stack.opponent_count * primaries
+        return keep
+
+    def _candidates(
+        self, threshold: float, pool: Optional[ProcessPoolExecutor], workers: int
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Constraint-satisfying lineups scoring at least ``threshold``, best first."""
+        # Split the first level of each branch as well when there are fewer branches than workers.
+        parts = max(workers // len(self.searches), 1)
+        jobs = [(index, threshold, part, parts) for index in range(len(self.searches)) for part in range(parts)]
+        if pool is not None:
+            results = list(pool.map(self._enumerate_job, jobs))
+        else:
+            results = [self._enumerate_job(job) for job in jobs]
+
+        scores, lineups, compositions = [], [], []
+        for (index, *_), (score, chosen) in zip(jobs, results):
+            composition = self.searches[index].composition
+            keep = self._satisfies(self.compositions[composition], chosen)
+            scores.append(score[keep])
+            lineups.append(chosen[keep])
+            compositions.append(np.full(keep.sum(), composition))
+        scores, compositions = np.concatenate(scores), np.concatenate(compositions)
+        width = max(chosen.shape[1] for chosen in lineups)
+        lineups = np.concatenate([chosen.reshape(-1, width) for chosen in lineups])
+        # Best first; ties broken by player rows so the order is deterministic.
+        order = np.lexsort((*np.sort(lineups, axis=1).T[::-1], -scores))
+        return scores[order], lineups[order], compositions[order]
+
+    def _enumerate_job(self, job: Tuple[int, float, int, int]) -> Tuple[np.ndarray, np.ndarray]:
+        return self._enumerate(*job)
+
+    def _exposure_limits(self, n: int) -> np.ndarray:
+        shares = np.full(len(self.projection), self.settings.max_exposure)
+        if self.settings.exposures:
+            ids = self.players["playerId"].to_numpy()
+            for player_id, share in self.settings.exposures.items():
+                shares[ids == player_id] = share
+        limits = np.floor(shares * n + 1e-9).astype(np.int64)
+        limits[self.locked_rows] = n
+        return limits
+
+    def optimize(self, n: int, workers: int = 1, margin: Optional[float] = None) -> LineupSet:
+        """
+        Build the top ``n`` lineups.
+
+        Args:
+            n (int): Number of lineups.
+            workers (int): Processes to run the search in.
+            margin (Optional[float]): Width of the first score band below the
+                optimal score to enumerate. Later bands are sized from how
+                many lineups the previous one gave. Defaults to 2% of the
+                optimal score.
+
+        Returns:
+            LineupSet: The lineups, best first. Fewer than ``n`` when the
+            constraints allow no more.
+        """
+        self.available = np.ones(len(self.projection), dtype=bool)
+        self.available[self.locked_rows] = False
+        self._exclude(np.flatnonzero(self._exposure_limits(n) <= 0))
+        selection = _Selection(n, self._exposure_limits(n), self.settings.min_unique)
+        pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            self._search(selection, margin, pool, workers)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        if not len(selection):
+            logging.warning("No lineup meets the constraints")
+        width = len(self.compositions[0].column_positions)
+        return self._to_lineup_set(
+            np.array(selection.lineups, dtype=np.int64).reshape(-1, width),
+            np.array(selection.scores),
+            np.array(selection.compositions, dtype=np.int64),
+        )
+
+    def _search(
+        self, selection: _Selection, margin: Optional[float], pool: Optional[ProcessPoolExecutor], workers: int
+    ) -> None:
+        """
+        Enumerate bands of lineup scores, best first, until ``selection`` is
+        full or no lineup is left.
+
+        Lineups scoring at least ``offered`` have all been offered already.
+        Players reaching their exposure limit are dropped from the search, so
+        later bands only hold lineups that can still be taken. A band that
+        grows past ``max_states`` is halved.
+        """
+        offered = math.inf
+        step, high = margin, math.inf
+        while len(selection) < selection.n and self.searches:
+            best = max(self._best(index) for index in range(len(self.searches)))
+            if not np.isfinite(best):
+                break
+            step = step or max(abs(best) * 0.02, 1e-6)
+            upper = min(best, offered)
+            threshold = upper - step
+            # No lineup scores below this, so a lower threshold enumerates everything.
+            floor = self.locked_score + min(
+                sum(count * float(self.projection[rows].min()) for rows, count in search.groups)
+                for search in self.searches
+            )
+            exhaustive = threshold <= floor
+            try:
+                scores, lineups, compositions = self._candidates(-np.inf if exhaustive else threshold, pool, workers)
+            except _SearchTooLarge as exc:
+                logging.info(f"Band of {step:.2f} below {upper:.2f} is too large ({exc}); narrowing")
+                high = step
+                step /= 2
+                if step < 1e-6 * max(abs(best), 1.0):
+                    logging.warning(f"Stopping at {len(selection)} lineups; raise max_states to search deeper")
+                    break
+                continue
+            fresh = scores < offered - 1e-9
+            taken = len(selection)
+            full = selection.offer(scores[fresh], lineups[fresh], compositions[fresh])
+            taken = len(selection) - taken
+            logging.info(
+                f"Enumerated {fresh.sum()} lineups between {threshold:.2f} and {upper:.2f}; "
+                f"kept {taken}, {len(selection)} in total"
+            )
+            if exhaustive:
+                break
+            offered = threshold
+            if len(full):
+                self._exclude(full)
+                high = math.inf
+            # Aim the next band at enough lineups for the count still needed at the last acceptance rate, but
+            # keep bands small: players filling up are only dropped from the search between bands.
+            needed = selection.n - len(selection)
+            wanted = min(1.5 * needed * fresh.sum() / max(taken, 1), self.band_size)
+            growth = min(max(wanted / fresh.sum(), 0.25), 1.25) if fresh.any() else 2.0
+            step = min(step * growth, (step + high) / 2)
+
+    def _to_lineup_set(self, lineups: np.ndarray, scores: np.ndarray, compositions: np.ndarray) -> LineupSet:
+        columns = ["draftableId", "playerId", "displayName", "position", "teamAbbreviation", "salary", "projection"]
+        width = lineups.shape[1]
+        slots = np.array([self.compositions[index].column_slots for index in compositions]).reshape(-1, width)
+        long = (
+            self.players[lineups.ravel()]
+            .select(columns)
+            .with_columns(
+                pl.Series("lineup_id", np.repeat(np.arange(len(lineups)), width), pl.Int64),
+                pl.Series("slot", slots.ravel(), pl.String),
+                pl.Series("slot_order", np.tile(np.arange(width), len(lineups)), pl.Int64),
+            )
+        )
+        slot_rank = {slot.name: rank for rank, slot in enumerate(self.settings.roster)}
+        long = (
+            long.with_columns(pl.col("slot").replace_strict(slot_rank, return_dtype=pl.Int64).alias("slot_rank"))
+            .sort("lineup_id", "slot_rank", "slot_order")
+            .select("lineup_id", "slot", pl.int_range(pl.len()).over("lineup_id", "slot").alias("slot_index"), *columns)
+        )
+        summary = long.group_by("lineup_id", maintain_order=True).agg(
+            pl.col("salary").sum(), pl.col("projection").sum()
+        )
+        logging.info(f"Built {len(lineups)} lineups from {self.players.height} players")
+        return LineupSet(lineups=long, summary=summary)
@@ -0,0 +1,468 @@
+import hashlib
+import io
+import logging
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+import polars as pl
+
+ROW_HASH_COLUMN = "_row_hash"
+
+# Explicit polars -> PostgreSQL column types used when creating tables.
+POLARS_TO_POSTGRES: Dict[Any, str] = {
+    pl.Boolean: "BOOLEAN",
+    pl.Int8: "SMALLINT",
+    pl.Int16: "SMALLINT",
+    pl.Int32: "INTEGER",
+    pl.Int64: "BIGINT",
+    pl.UInt8: "SMALLINT",
+    pl.UInt16: "INTEGER",
+    pl.UInt32: "BIGINT",
+    pl.UInt64: "NUMERIC(20)",
+    pl.Float32: "REAL",
+    pl.Float64: "DOUBLE PRECISION",
+    pl.Decimal: "NUMERIC",
+    pl.String: "TEXT",
+    pl.Categorical: "TEXT",
+    pl.Enum: "TEXT",
+    pl.Date: "DATE",
+    pl.Time: "TIME",
+    pl.Duration: "INTERVAL",
+    pl.Null: "TEXT",
+    pl.List: "JSONB",
+    pl.Array: "JSONB",
+    pl.Struct: "JSONB",
+}
+
+
+def quote_ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def qualified_name(schema: str, table_name: str) -> str:
+    return f"{quote_ident(schema)}.{quote_ident(table_name)}"
+
+
+def postgres_type(dtype: pl.DataType) -> str:
+    """
+    Map a polars dtype to the PostgreSQL column type used for it.
+
+    Args:
+        dtype (pl.DataType): The polars dtype.
+
+    Returns:
+        str: The PostgreSQL type name. Nested types map to ``JSONB``.
+    """
+    if isinstance(dtype, pl.Datetime):
+        return "TIMESTAMPTZ" if dtype.time_zone else "TIMESTAMP"
+    base_type = dtype.base_type()
+    if base_type not in POLARS_TO_POSTGRES:
+        raise ValueError(f"No PostgreSQL type mapping for polars dtype {dtype}")
+    return POLARS_TO_POSTGRES[base_type]
+
+
+def create_table_sql(
+    schema: str, table_name: str, frame_schema: pl.Schema, column_types: Optional[Dict[str, str]] = None
+) -> str:
+    """
+    Build a ``CREATE TABLE IF NOT EXISTS`` statement for a polars schema.
+
+    Args:
+        schema (str): Schema name.
+        table_name (str): Table name.
+        frame_schema (pl.Schema): Column names and dtypes of the frame.
+        column_types (Optional[Dict[str, str]]): Per-column PostgreSQL type overrides.
+
+    Returns:
+        str: The DDL statement.
+    """
+    column_types = column_types or {}
+    columns = ", ".join(
+        f"{quote_ident(name)} {column_types.get(name) or postgres_type(dtype)}"
+        for name, dtype in frame_schema.items()
+    )
+    return f"CREATE TABLE IF NOT EXISTS {qualified_name(schema, table_name)} ({columns})"
+
+
+def to_copyable(df: pl.DataFrame) -> pl.DataFrame:
+    """Encode nested columns as JSON text so the frame can be written as CSV."""
+    nested = [name for name, dtype in df.schema.items() if dtype.is_nested()]
+    if not nested:
+        return df
+    return df.with_columns(
+        pl.struct(pl.col(name).alias("v")).struct.json_encode().str.json_path_match("$.v").alias(name)
+        for name in nested
+    )
+
+
+class CSVChunkReader(io.RawIOBase):
+    """
+    File-like reader that serializes a frame to CSV one chunk at a time.
+
+    Passed to ``cursor.copy_expert`` so a single ``COPY`` streams the whole
+    frame while only one chunk of CSV text is held in memory.
+    """
+
+    def __init__(self, frames: Iterator[pl.DataFrame]):
+        self._frames = frames
+        self._buffer = b""
+        self._position = 0
+        self.rows = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def _next_chunk(self) -> bool:
+        for frame in self._frames:
+            self.rows += frame.height
+            chunk = io.BytesIO()
+            to_copyable(frame).write_csv(chunk, include_header=False)
+            self._buffer, self._position = chunk.getvalue(), 0
+            if self._buffer:
+                return True
+        return False
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0:
+            return b"".join(iter(lambda: self.read(1 << 20), b""))
+        if self._position >= len(self._buffer) and not self._next_chunk():
+            return b""
+        data = self._buffer[self._position : self._position + size]
+        self._position += len(data)
+        return data
+
+
+def iter_slices(df: pl.DataFrame, chunk_rows: int) -> Iterator[pl.DataFrame]:
+    for offset in range(0, df.height, chunk_rows):
+        yield df.slice(offset, chunk_rows)
+
+
+def copy_frames(cursor: Any, frames: Iterator[pl.DataFrame], schema: str, table_name: str, columns: List[str]) -> int:
+    """
+    Stream frames into an existing table with one ``COPY ... FROM STDIN``.
+
+    Args:
+        cursor: A psycopg2 cursor.
+        frames (Iterator[pl.DataFrame]): Frames sharing ``columns``, written in order.
+        schema (str): Schema name.
+        table_name (str): Table name.
+        columns (List[str]): Target column names, in frame column order.
+
+    Returns:
+        int: Number of rows copied.
+    """
+    column_list = ", ".join(quote_ident(name) for name in columns)
+    reader = CSVChunkReader(frames)
+    cursor.copy_expert(
+        f"COPY {qualified_name(schema, table_name)} ({column_list}) FROM STDIN WITH (FORMAT csv)",
+        reader,
+    )
+    return reader.rows
+
+
+def copy_batches(
+    batches: Iterable[pl.DataFrame],
+    engine: Any,
+    schema: str,
+    table_name: str,
+    if_exists: str = "append",
+    chunk_rows: int = 50_000,
+    column_types: Optional[Dict[str, str]] = None,
+) -> int:
+    """
+    Bulk load a stream of polars frames into PostgreSQL with one ``COPY``.
+
+    Batches are pulled one at a time and serialized to CSV in chunks of at
+    most ``chunk_rows`` rows, so peak memory is one batch plus one chunk no
+    matter how many rows the stream holds. The table is created from the first
+    batch's schema, with ``POLARS_TO_POSTGRES`` (plus ``column_types``
+    overrides), when missing. Everything runs in one transaction: with
+    ``if_exists="replace"`` readers never see an empty table, and a failure
+    part way through the stream leaves the table as it was.
+
+    Args:
+        batches (Iterable[pl.DataFrame]): Frames sharing one schema, written in order.
+        engine: A SQLAlchemy engine for a psycopg2 connection.
+        schema (str): Schema name.
+        table_name (str): Table name.
+        if_exists (str): 'append' or 'replace'. Defaults to 'append'.
+        chunk_rows (int): Rows serialized per chunk. Defaults to 50,000.
+        column_types (Optional[Dict[str, str]]): Per-column PostgreSQL type overrides.
+
+    Returns:
+        int: Number of rows loaded. Nothing is written for an empty stream.
+    """
+    if if_exists not in ("append", "replace"):
+        raise ValueError(f"Unsupported if_exists value: {if_exists}")
+
+    batches = iter(batches)
+    first = next(batches, None)
+    if first is None:
+        return 0
+
+    connection = engine.raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            if if_exists == "replace":
+                cursor.execute(f"DROP TABLE IF EXISTS {qualified_name(schema, table_name)}")
+            cursor.execute(create_table_sql(schema, table_name, first.schema, column_types))
+            frames = (chunk for batch in chain([first], batches) for chunk in iter_slices(batch, chunk_rows))
+            rows = copy_frames(cursor, frames, schema, table_name, first.columns)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+    logging.info(f"Copied {rows} rows into {schema}.{table_name}")
+    return rows
+
+
+def copy_dataframe(
+    df: pl.DataFrame,
+    engine: Any,
+    schema: str,
+    table_name: str,
+    if_exists: str = "append",
+    chunk_rows: int = 50_000,
+    column_types: Optional[Dict[str, str]] = None,
+) -> int:
+    """
+    Bulk load a polars frame into PostgreSQL with ``COPY ... FROM STDIN``.
+
+    The frame is never converted to pandas. It is serialized to CSV in chunks of
+    ``chunk_rows`` rows and streamed through psycopg2, so peak memory grows by
+    one chunk rather than a full copy of the frame. The table is created from
+    ``POLARS_TO_POSTGRES`` (plus ``column_types`` overrides) when missing. With
+    ``if_exists="replace"``, the drop, create and load run in one transaction,
+    so readers never see an empty table.
+
+    Args:
+        df (pl.DataFrame): The frame to load.
+        engine: A SQLAlchemy engine for a psycopg2 connection.
+        schema (str): Schema name.
+        table_name (str): Table name.
+        if_exists (str): 'append' or 'replace'. Defaults to 'append'.
+        chunk_rows (int): Rows serialized per chunk. Defaults to 50,000.
+        column_types (Optional[Dict[str, str]]): Per-column PostgreSQL type overrides.
+
+    Returns:
+        int: Number of rows loaded.
+    """
+    return copy_batches([df], engine, schema, table_name, if_exists, chunk_rows, column_types)
+
+
+def with_row_hash(df: pl.DataFrame, exclude_columns: Sequence[str] = ()) -> pl.DataFrame:
+    """
+    Add a ``_row_hash`` column hashing every column except ``exclude_columns``.
+
+    The hash is a blake2b digest of each row encoded as JSON, columns in name
+    order. It is stored with the rows, so unlike ``DataFrame.hash_rows`` it
+    must not change with the polars version, or an upgrade would rewrite
+    every table. Exclude columns that change on every load (such as
+    ``date_uploaded``) so an unchanged row keeps the same hash from one run to
+    the next.
+    """
+    hashed = df.select(pl.exclude(list(exclude_columns)))
+    encoded = hashed.select(pl.struct(sorted(hashed.columns)).struct.json_encode().cast(pl.Binary)).to_series()
+    digests = b"".join([hashlib.blake2b(row, digest_size=8).digest() for row in encoded.to_list()])
+    return df.with_columns(pl.Series(ROW_HASH_COLUMN, np.frombuffer(digests, dtype="<i8"), dtype=pl.Int64))
+
+
+def _read_key_hashes(cursor: Any, schema: str, table_name: str, key_schema: Dict[str, pl.DataType]) -> pl.DataFrame:
+    columns = ", ".join(quote_ident(name) for name in [*key_schema, ROW_HASH_COLUMN])
+    buffer = io.BytesIO()
+    cursor.copy_expert(
+        f"COPY (SELECT {columns} FROM {qualified_name(schema, table_name)}) TO STDOUT WITH (FORMAT csv, HEADER)",
+        buffer,
+    )
+    buffer.seek(0)
+    return pl.read_csv(buffer, schema={**key_schema, ROW_HASH_COLUMN: pl.Int64})
+
+
+def _drop_duplicate_keys(cursor: Any, schema: str, table_name: str, key_columns: Sequence[str]) -> int:
+    """
+    Delete all but the last loaded row of every natural key stored more than once.
+
+    Tables filled with ``if_exists="append"`` can repeat a key, which would
+    make the unique index on it fail. Rows with a null key are left alone.
+
+    Returns:
+        int: Number of rows deleted.
+    """
+    target = qualified_name(schema, table_name)
+    key_list = ", ".join(quote_ident(name) for name in key_columns)
+    not_null = " AND ".join(f"{quote_ident(name)} IS NOT NULL" for name in key_columns)
+    cursor.execute(
+        f"DELETE FROM {target} WHERE ctid IN ("
+        f"SELECT ctid FROM (SELECT ctid, row_number() OVER (PARTITION BY {key_list} ORDER BY ctid DESC) AS copy "
+        f"FROM {target} WHERE {not_null}) ranked WHERE copy > 1)"
+    )
+    return cursor.rowcount
+
+
+def upsert_batches(
+    batches: Iterable[pl.DataFrame],
+    engine: Any,
+    schema: str,
+    table_name: str,
+    key_columns: Sequence[str],
+    exclude_from_hash: Sequence[str] = ("date_uploaded",),
+    chunk_rows: int = 50_000,
+    column_types: Optional[Dict[str, str]] = None,
+) -> int:
+    """
+    Apply only the changed rows of a stream of frames to a table, keyed by its natural key.
+
+    Each row is hashed (see ``with_row_hash``). The stored ``(key, _row_hash)``
+    pairs are read back once, and every batch's new or changed rows are
+    streamed with one ``COPY`` into a temporary table. They are then applied
+    with ``INSERT ... ON CONFLICT (key) DO UPDATE``, the last staged row of a
+    key winning. Everything runs in one transaction, so readers never see a
+    partially written or empty table. Rows missing upstream are left in place.
+
+    Only one batch, one chunk and the stored keys and hashes are held in
+    memory at a time.
+
+    The table, any new columns, the ``_row_hash`` column and a unique index on
+    the key are created when missing, from the first batch's schema. Before
+    the index is created, rows repeating a key (e.g. from earlier
+    ``if_exists="append"`` loads) are dropped, keeping the last one loaded.
+
+    Args:
+        batches (Iterable[pl.DataFrame]): The full current snapshot of the data,
+            as frames sharing one schema.
+        engine: A SQLAlchemy engine for a psycopg2 connection.
+        schema (str): Schema name.
+        table_name (str): Table name.
+        key_columns (Sequence[str]): Natural key, e.g. ``["game_id", "play_id"]``.
+        exclude_from_hash (Sequence[str]): Columns ignored when detecting changes.
+        chunk_rows (int): Rows serialized per ``COPY`` chunk. Defaults to 50,000.
+        column_types (Optional[Dict[str, str]]): Per-column PostgreSQL type overrides.
+
+    Returns:
+        int: Number of rows inserted or updated.
+    """
+    key_columns = list(key_columns)
+    batches = iter(batches)
+    first = next(batches, None)
+    if first is None:
+        return 0
+    frame_schema = with_row_hash(first.head(0), exclude_from_hash).schema
+
+    target = qualified_name(schema, table_name)
+    stage = quote_ident("stage")
+    key_list = ", ".join(quote_ident(name) for name in key_columns)
+    column_list = ", ".join(quote_ident(name) for name in frame_schema)
+    seen = missing_keys = 0
+
+    def changed_rows(existing: pl.DataFrame) -> Iterator[pl.DataFrame]:
+        nonlocal seen, missing_keys
+        # A key staged from an earlier batch is staged again even if unchanged, so its last row wins.
+        staged_keys = existing.select(key_columns).clear()
+        for batch in chain([first], batches):
+            missing_keys += batch.filter(pl.any_horizontal(pl.col(key_columns).is_null())).height
+            batch = with_row_hash(
+                batch.drop_nulls(key_columns).unique(subset=key_columns, keep="last", maintain_order=True),
+                exclude_from_hash,
+            )
+            seen += batch.height
+            delta = batch.join(existing, on=[*key_columns, ROW_HASH_COLUMN], how="anti")
+            if staged_keys.height:
+                restaged = batch.join(staged_keys, on=key_columns, how="semi")
+                delta = pl.concat([delta, restaged]).unique(subset=key_columns, maintain_order=True)
+            staged_keys = pl.concat([staged_keys, delta.select(key_columns)]).unique()
+            yield from iter_slices(delta, chunk_rows)
+
+    connection = engine.raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(create_table_sql(schema, table_name, frame_schema, column_types))
+            for name, dtype in frame_schema.items():
+                column_type = (column_types or {}).get(name) or postgres_type(dtype)
+                cursor.execute(f"ALTER TABLE {target} ADD COLUMN IF NOT EXISTS {quote_ident(name)} {column_type}")
+            index = qualified_name(schema, f"{table_name}_natural_key")
+            cursor.execute("SELECT to_regclass(%s)", (index,))
+            if cursor.fetchone()[0] is None:
+                duplicates = _drop_duplicate_keys(cursor, schema, table_name, key_columns)
+                if duplicates:
+                    logging.warning(
+                        f"Dropped {duplicates} rows repeating a {key_columns} key in {schema}.{table_name} "
+                        f"before indexing it; the last loaded row of each key is kept"
+                    )
+                cursor.execute(
+                    f"CREATE UNIQUE INDEX IF NOT EXISTS {quote_ident(f'{table_name}_natural_key')} "
+                    f"ON {target} ({key_list})"
+                )
+
+            existing = _read_key_hashes(cursor, schema, table_name, {name: frame_schema[name] for name in key_columns})
+            # _stage_order keeps the stream order, so a key repeated across batches resolves to its last row.
+            cursor.execute(f"CREATE TEMP TABLE {stage} (LIKE {target}) ON COMMIT DROP")
+            cursor.execute(f"ALTER TABLE pg_temp.{stage} ADD COLUMN _stage_order BIGSERIAL")
+            staged = copy_frames(cursor, changed_rows(existing), "pg_temp", "stage", list(frame_schema))
+            changed = 0
+            if staged:
+                updates = ", ".join(
+                    f"{quote_ident(name)} = EXCLUDED.{quote_ident(name)}"
+                    for name in frame_schema
+                    if name not in key_columns
+                )
+                cursor.execute(
+                    f"INSERT INTO {target} ({column_list}) "
+                    f"SELECT DISTINCT ON ({key_list}) {column_list} FROM pg_temp.{stage} "
+                    f"ORDER BY {key_list}, _stage_order DESC "
+                    f"ON CONFLICT ({key_list}) DO UPDATE SET {updates} "
+                    f"WHERE {target}.{quote_ident(ROW_HASH_COLUMN)} IS DISTINCT FROM EXCLUDED.{quote_ident(ROW_HASH_COLUMN)}"
+                )
+                changed = cursor.rowcount
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+    if missing_keys:
+        logging.warning(f"Skipped {missing_keys} rows with a null {key_columns} key for {schema}.{table_name}")
+    logging.info(f"Upserted {changed} changed of {seen} rows into {schema}.{table_name}")
+    return changed
+
+
+def upsert_dataframe(
+    df: pl.DataFrame,
+    engine: Any,
+    schema: str,
+    table_name: str,
+    key_columns: Sequence[str],
+    exclude_from_hash: Sequence[str] = ("date_uploaded",),
+    chunk_rows: int = 50_000,
+    column_types: Optional[Dict[str, str]] = None,
+) -> int:
+    """
+    Apply only the changed rows of ``df`` to a table, keyed by its natural key.
+
+    Each row is hashed (see ``with_row_hash``). The stored ``(key, _row_hash)``
+    pairs are read back and only new or changed rows are staged with ``COPY``
+    into a temporary table. They are then applied with
+    ``INSERT ... ON CONFLICT (key) DO UPDATE``. Everything runs in one
+    transaction, so readers never see a partially written or empty table. Rows
+    missing upstream are left in place.
+
+    The table, any new columns, the ``_row_hash`` column and a unique index on
+    the key are created when missing; rows repeating a key are dropped first
+    (see ``upsert_batches``).
+
+    Args:
+        df (pl.DataFrame): The full current snapshot of the data.
+        engine: A SQLAlchemy engine for a psycopg2 connection.
+        schema (str): Schema name.
+        table_name (str): Table name.
+        key_columns (Sequence[str]): Natural key, e.g. ``["game_id", "play_id"]``.
+        exclude_from_hash (Sequence[str]): Columns ignored when detecting changes.
+        chunk_rows (int): Rows serialized per ``COPY`` chunk. Defaults to 50,000.
+        column_types (Optional[Dict[str, str]]): Per-column PostgreSQL type overrides.
+
+    Returns:
+        int: Number of rows inserted or updated.
+    """
+    return upsert_batches([df], engine, schema, table_name, key_columns, exclude_from_hash, chunk_rows, column_types)
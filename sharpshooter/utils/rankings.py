@@ -0,0 +1,147 @@
+from functools import partial
+from pathlib import Path
+from typing import List, Tuple, Union
+
+import polars as pl
+
+from .crosswalk import PlayerCrosswalk
+from .derived import DerivedTable, DerivedTables
+
+# Columns of the combined Madden rankings table.
+COMBINED_MADDEN_COLUMNS: List[str] = [
+    "ID",
+    "player_key",
+    "Name",
+    "DraftKings_Position",
+    "DraftKings_ADP",
+    "DraftKings_Team",
+    "ESPN_Rank",
+    "ESPN_Positional_Rank",
+    "overallRating",
+]
+
+
+def draftkings_with_keys(draftkings_df: pl.DataFrame, crosswalk: PlayerCrosswalk) -> pl.DataFrame:
+    """
+    Register the DraftKings rankings in the crosswalk and attach their player key.
+
+    Args:
+        draftkings_df (pl.DataFrame): DraftKings rankings (``DkPreDraftRankings.csv``).
+        crosswalk (PlayerCrosswalk): Player id crosswalk, updated in place.
+
+    Returns:
+        pl.DataFrame: The rankings with source-prefixed columns and ``player_key``.
+    """
+    draftkings_df = draftkings_df.rename(
+        {"ADP": "DraftKings_ADP", "Position": "DraftKings_Position", "Team": "DraftKings_Team"}
+    )
+    crosswalk.update(
+        draftkings_df,
+        ids={"dk_player_dk_id": "ID"},
+        name_column="Name",
+        position_column="DraftKings_Position",
+        team_column="DraftKings_Team",
+    )
+    return crosswalk.attach(draftkings_df, "dk_player_dk_id", "ID")
+
+
+def espn_with_keys(espn_df: pl.DataFrame, crosswalk: PlayerCrosswalk) -> pl.DataFrame:
+    """
+    Register the ESPN rankings in the crosswalk and attach their player key.
+
+    ESPN has no player id, so the player name is the source key.
+
+    Args:
+        espn_df (pl.DataFrame): ESPN rankings (``NFL_Rankings_Complete.csv``).
+        crosswalk (PlayerCrosswalk): Player id crosswalk, updated in place.
+
+    Returns:
+        pl.DataFrame: The rankings with source-prefixed columns and ``player_key``.
+    """
+    espn_df = espn_df.rename(
+        {
+            "Overall Rank": "ESPN_Rank",
+            "Positional Rank": "ESPN_Positional_Rank",
+            "Salary Cap Value": "ESPN_Salary_Cap_Value",
+        }
+    )
+    crosswalk.update(
+        espn_df.with_columns(pl.col("ESPN_Positional_Rank").str.replace(r"\d+$", "").alias("ESPN_Position")),
+        ids={"espn_name": "Player Name"},
+        name_column="Player Name",
+        position_column="ESPN_Position",
+        team_column="Team",
+    )
+    return crosswalk.attach(espn_df, "espn_name", "Player Name")
+
+
+def madden_with_keys(madden_df: pl.DataFrame, crosswalk: PlayerCrosswalk) -> pl.DataFrame:
+    """
+    Register Madden ratings (see ``decode_madden_ratings``) in the crosswalk and attach their player key.
+
+    Args:
+        madden_df (pl.DataFrame): Decoded Madden ratings.
+        crosswalk (PlayerCrosswalk): Player id crosswalk, updated in place.
+
+    Returns:
+        pl.DataFrame: The ratings with ``player_key``.
+    """
+    # Madden labels running backs "HB"; normalize_position maps it to RB.
+    crosswalk.update(madden_df, ids={"madden_id": "id"}, name_column="fullName", position_column="position_shortLabel")
+    return crosswalk.attach(madden_df, "madden_id", "id")
+
+
+def combine_rankings(draftkings_df: pl.DataFrame, espn_df: pl.DataFrame) -> pl.DataFrame:
+    """Left join the keyed ESPN rankings onto the keyed DraftKings rankings."""
+    return draftkings_df.join(espn_df, on="player_key", how="left")
+
+
+def combine_madden_with_rankings(combined_df: pl.DataFrame, madden_df: pl.DataFrame) -> pl.DataFrame:
+    """Left join the keyed Madden ratings onto the combined rankings and keep ``COMBINED_MADDEN_COLUMNS``."""
+    return combined_df.join(madden_df, on="player_key", how="left").select(COMBINED_MADDEN_COLUMNS)
+
+
+def derive_combined_rankings(
+    tables: DerivedTables,
+    crosswalk: PlayerCrosswalk,
+    draftkings: Union[pl.DataFrame, str, Path],
+    espn: Union[pl.DataFrame, str, Path],
+    madden: Union[pl.DataFrame, str, Path],
+) -> Tuple[DerivedTable, DerivedTable]:
+    """
+    Build the combined rankings tables, rebuilding only what changed.
+
+    Each source is keyed in its own step, so an ESPN update reuses the keyed
+    DraftKings and Madden tables and only reruns the ESPN step and the joins.
+
+    Args:
+        tables (DerivedTables): Where steps and their fingerprints are stored.
+        crosswalk (PlayerCrosswalk): Player id crosswalk, updated in place.
+        draftkings (Union[pl.DataFrame, str, Path]): DraftKings rankings frame or CSV.
+        espn (Union[pl.DataFrame, str, Path]): ESPN rankings frame or CSV.
+        madden (Union[pl.DataFrame, str, Path]): Decoded Madden ratings frame or parquet file.
+
+    Returns:
+        Tuple[DerivedTable, DerivedTable]: The combined rankings and the combined Madden rankings.
+    """
+    draftkings_keyed = tables.derive(
+        "draftkings_keyed",
+        partial(draftkings_with_keys, crosswalk=crosswalk),
+        [tables.source("draftkings_rankings", draftkings)],
+        state=[partial(crosswalk.fingerprint, "dk_player_dk_id")],
+    )
+    espn_keyed = tables.derive(
+        "espn_keyed",
+        partial(espn_with_keys, crosswalk=crosswalk),
+        [tables.source("espn_rankings", espn)],
+        state=[partial(crosswalk.fingerprint, "espn_name")],
+    )
+    madden_keyed = tables.derive(
+        "madden_keyed",
+        partial(madden_with_keys, crosswalk=crosswalk),
+        [tables.source("madden_ratings", madden, reader=pl.read_parquet)],
+        state=[partial(crosswalk.fingerprint, "madden_id")],
+    )
+    combined = tables.derive("combined_rankings", combine_rankings, [draftkings_keyed, espn_keyed])
+    combined_madden = tables.derive("combined_madden_rankings", combine_madden_with_rankings, [combined, madden_keyed])
+    return combined, combined_madden
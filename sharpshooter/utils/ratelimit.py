@@ -0,0 +1,292 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Deque, Dict, List, Optional, Tuple
+
+import httpx
+from pydantic import BaseModel, Field
+
+# Statuses that mean the upstream wants us to slow down.
+THROTTLE_STATUSES = (429, 503)
+
+
+class RateLimitConfig(BaseModel):
+    # Requests per second allowed at the start, and the bounds the rate adapts within
+    initial_rate: float = Field(default=20.0)
+    min_rate: float = Field(default=0.5)
+    max_rate: float = Field(default=200.0)
+    # Requests that may be sent back to back before the rate applies
+    burst: int = Field(default=20)
+    # Requests per second added after each second of clean traffic
+    increase_step: float = Field(default=2.0)
+    # Factor applied to the rate on a throttle response or a high error rate
+    decrease_factor: float = Field(default=0.5)
+    # Minimum seconds between two decreases, so one burst of 429s counts once
+    decrease_cooldown: float = Field(default=1.0)
+    # Recent responses the error rate is computed over, and the rate that triggers a decrease
+    error_window: int = Field(default=50)
+    error_rate_threshold: float = Field(default=0.2)
+    # Consecutive failures that open the circuit, and how long it stays open
+    failure_threshold: int = Field(default=5)
+    open_seconds: float = Field(default=30.0)
+    # Seconds of successes the sustained throughput is measured over
+    throughput_window: float = Field(default=60.0)
+
+
+class HostRateStats(BaseModel):
+    host: str
+    rate: float
+    sustained_rate: float
+    requests: int
+    successes: int
+    throttled: int
+    failures: int
+    circuit: str
+    circuit_opens: int
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised instead of sending a request while a host's circuit breaker is open."""
+
+    def __init__(self, host: str, retry_in: float, request: httpx.Request):
+        super().__init__(f"Circuit open for {host}; retry in {retry_in:.1f}s", request=request)
+        self.host = host
+        self.retry_in = retry_in
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """
+    Seconds to wait from a ``Retry-After`` header, in delta-seconds or HTTP-date form.
+
+    Returns:
+        Optional[float]: The delay, or None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    now = time.time() if now is None else now
+    return max(0.0, retry_at.timestamp() - now)
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter: uniform in ``[0, min(cap, base * 2**attempt)]``."""
+    return random.uniform(0.0, min(cap, base * 2**attempt))
+
+
+class HostRateLimiter:
+    """
+    Adaptive token bucket and circuit breaker for one host.
+
+    Requests take a token from a bucket refilled at ``rate`` per second. The
+    rate grows additively while responses are clean and is cut
+    multiplicatively on a throttle response (429/503) or when the error rate
+    over the last ``error_window`` responses passes its threshold, so it
+    settles near the fastest rate the host tolerates. ``Retry-After`` pauses
+    the whole host until the given time.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    requests fail fast with ``CircuitOpenError`` for ``open_seconds``. Then a
+    single probe request is let through: a success closes the circuit, a
+    failure opens it again. A probe given up without an outcome (``release``)
+    or not heard from within ``open_seconds`` lets the next request probe.
+
+    The state is guarded by a thread lock and never awaited on, so a limiter
+    can be shared by several event loops.
+    """
+
+    def __init__(self, host: str, config: Optional[RateLimitConfig] = None):
+        self.host = host
+        self.config = config or RateLimitConfig()
+        self.rate = self.config.initial_rate
+        self._tokens = float(self.config.burst)
+        self._refilled_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+        self._outcomes: Deque[bool] = deque(maxlen=self.config.error_window)
+        self._success_times: Deque[float] = deque()
+        self._first_request: Optional[float] = None
+        self._consecutive_failures = 0
+        self._circuit = "closed"
+        self._open_until = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+        self.requests = self.successes = self.throttled = self.failures = self.circuit_opens = 0
+
+    def _try_take(self, now: float) -> Tuple[float, Optional[float]]:
+        """Take a token if one is free. Returns ``(seconds to wait, seconds the circuit stays open)``."""
+        if self._circuit == "open":
+            if now < self._open_until:
+                return 0.0, self._open_until - now
+            self._circuit = "half_open"
+        if self._circuit == "half_open":
+            probe_lapses_at = self._probe_started + self.config.open_seconds
+            if self._probe_in_flight and now < probe_lapses_at:
+                return 0.0, probe_lapses_at - now
+            self._probe_in_flight = True
+            self._probe_started = now
+        if now < self._blocked_until:
+            if self._circuit == "half_open":
+                self._probe_in_flight = False
+            return self._blocked_until - now, None
+
+        self._tokens = min(float(self.config.burst), self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+        if self._tokens < 1.0:
+            if self._circuit == "half_open":
+                self._probe_in_flight = False
+            return (1.0 - self._tokens) / self.rate, None
+        self._tokens -= 1.0
+        self.requests += 1
+        if self._first_request is None:
+            self._first_request = now
+        return 0.0, None
+
+    async def acquire(self, request: httpx.Request) -> None:
+        """
+        Wait until ``request`` may be sent.
+
+        Raises:
+            CircuitOpenError: If the host's circuit is open.
+        """
+        while True:
+            with self._lock:
+                wait, open_for = self._try_take(time.monotonic())
+            if open_for is not None:
+                raise CircuitOpenError(self.host, open_for, request)
+            if wait <= 0.0:
+                return
+            await asyncio.sleep(wait)
+
+    def release(self) -> None:
+        """Give up an acquired request that ended without an outcome (e.g. cancelled), freeing a half-open probe."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _decrease(self, now: float, reason: str) -> None:
+        if now - self._last_decrease < self.config.decrease_cooldown:
+            return
+        self._last_decrease = now
+        rate = max(self.config.min_rate, self.rate * self.config.decrease_factor)
+        if rate < self.rate:
+            logging.warning(f"Slowing {self.host} from {self.rate:.1f} to {rate:.1f} requests/s ({reason})")
+        self.rate = rate
+
+    def _fail(self, now: float) -> None:
+        self.failures += 1
+        self._consecutive_failures += 1
+        if self._circuit == "half_open" or self._consecutive_failures >= self.config.failure_threshold:
+            if self._circuit != "open":
+                self.circuit_opens += 1
+                logging.error(
+                    f"Circuit open for {self.host} after {self._consecutive_failures} failures; "
+                    f"pausing {self.config.open_seconds:.0f}s"
+                )
+            self._circuit = "open"
+            self._open_until = now + self.config.open_seconds
+        self._probe_in_flight = False
+
+    def record(self, response: Optional[httpx.Response]) -> None:
+        """
+        Adapt to the outcome of a request.
+
+        Args:
+            response (Optional[httpx.Response]): The response, or None if the
+                request failed with a transport error.
+        """
+        now = time.monotonic()
+        with self._lock:
+            status = response.status_code if response is not None else None
+            is_throttle = status in THROTTLE_STATUSES
+            is_failure = status is None or status >= 500 or is_throttle
+            self._outcomes.append(is_failure)
+            if is_throttle:
+                self.throttled += 1
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after is not None:
+                    self._blocked_until = max(self._blocked_until, now + retry_after)
+                self._decrease(now, f"HTTP {status}")
+            if is_failure:
+                self._fail(now)
+                error_rate = sum(self._outcomes) / len(self._outcomes)
+                if not is_throttle and len(self._outcomes) >= 10 and error_rate > self.config.error_rate_threshold:
+                    self._decrease(now, f"error rate {error_rate:.0%}")
+                return
+
+            self.successes += 1
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+            if self._circuit != "closed":
+                logging.info(f"Circuit closed for {self.host}")
+                self._circuit = "closed"
+            self._success_times.append(now)
+            while self._success_times[0] < now - self.config.throughput_window:
+                self._success_times.popleft()
+            error_rate = sum(self._outcomes) / len(self._outcomes)
+            if error_rate <= self.config.error_rate_threshold / 2:
+                self.rate = min(self.config.max_rate, self.rate + self.config.increase_step / self.rate)
+
+    def stats(self) -> HostRateStats:
+        now = time.monotonic()
+        with self._lock:
+            recent = [t for t in self._success_times if t >= now - self.config.throughput_window]
+            elapsed = min(self.config.throughput_window, now - self._first_request) if self._first_request else 0.0
+            return HostRateStats(
+                host=self.host,
+                rate=round(self.rate, 2),
+                sustained_rate=round(len(recent) / elapsed, 2) if elapsed > 0 else 0.0,
+                requests=self.requests,
+                successes=self.successes,
+                throttled=self.throttled,
+                failures=self.failures,
+                circuit=self._circuit,
+                circuit_opens=self.circuit_opens,
+            )
+
+
+class RateLimiter:
+    """
+    One ``HostRateLimiter`` per host, created on first use.
+
+    Args:
+        config (Optional[RateLimitConfig]): Settings for hosts without an override.
+        host_configs (Optional[Dict[str, RateLimitConfig]]): Per-host settings.
+    """
+
+    def __init__(
+        self, config: Optional[RateLimitConfig] = None, host_configs: Optional[Dict[str, RateLimitConfig]] = None
+    ):
+        self.config = config or RateLimitConfig()
+        self.host_configs = dict(host_configs or {})
+        self._hosts: Dict[str, HostRateLimiter] = {}
+        self._lock = threading.Lock()
+
+    def host(self, host: str) -> HostRateLimiter:
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = HostRateLimiter(host, self.host_configs.get(host, self.config))
+            return self._hosts[host]
+
+    def report(self) -> List[HostRateStats]:
+        """Current rate, sustained throughput and outcome counts of every host."""
+        with self._lock:
+            hosts = list(self._hosts.values())
+        return [limiter.stats() for limiter in hosts]
+
+    def log_report(self) -> None:
+        for stats in self.report():
+            logging.info(
+                f"{stats.host}: sustained {stats.sustained_rate:.1f} requests/s (limit {stats.rate:.1f}), "
+                f"{stats.successes}/{stats.requests} ok, {stats.throttled} throttled, {stats.failures} failed, "
+                f"circuit {stats.circuit}"
+            )
@@ -0,0 +1,397 @@
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import polars as pl
+
+from .madden import _attribute_columns
+
+# Columns describing a player rather than rating them. They are kept as of the
+# player's latest iteration, not per iteration.
+IDENTITY_COLUMNS = ("fullName", "position_shortLabel", "team_label")
+
+# Stored value of a rating the player no longer has (e.g. they left the roster).
+MISSING = int(np.iinfo(np.int16).min)
+
+# Index keys pack (player code, attribute code, iteration) into one int64, so a
+# point-in-time lookup is a single ``np.searchsorted``.
+_ATTRIBUTE_BITS = 12
+_SEQUENCE_BITS = 16
+_ATTRIBUTE_MASK = (1 << _ATTRIBUTE_BITS) - 1
+_SEQUENCE_MASK = (1 << _SEQUENCE_BITS) - 1
+
+
+def rating_attributes(df: pl.DataFrame) -> List[str]:
+    """``overallRating`` and the numeric ``*_rating`` columns of a decoded ratings frame."""
+    ratings = [name for name in _attribute_columns(df) if not name.endswith("_diff")]
+    return (["overallRating"] if "overallRating" in df.columns else []) + ratings
+
+
+class RatingsHistory:
+    """
+    Point-in-time store of Madden ratings iterations, kept as changes.
+
+    The first iteration appended is the base snapshot. Every later one only
+    stores the ``(player, attribute, value)`` cells that differ from the
+    ratings as of the iteration before it, plus removals for players who left
+    the roster, so the store grows with actual rating changes rather than a
+    full roster per week. Changes live in one parquet file per iteration next
+    to a manifest, both written atomically.
+
+    In memory every change is indexed by ``(player, attribute, iteration)``.
+    "Ratings as of iteration N" is then one ``searchsorted`` per
+    ``(player, attribute)``, and "biggest movers between N and M" only looks
+    at the changes made between the two, never rebuilding a full snapshot.
+
+    Iterations are identified by their id (e.g. ``"1-base"``) or by their
+    position in the order they were appended; negative positions count from
+    the latest.
+
+    Example:
+        >>> history = RatingsHistory("data/madden_history")
+        >>> history.append(await fetch_madden_ratings("1-base"), "1-base")
+        >>> history.append(await fetch_madden_ratings("2-week-1"), "2-week-1")
+        >>> history.as_of("1-base")
+        >>> history.movers("1-base", -1, attribute="overallRating", n=10)
+    """
+
+    def __init__(self, directory: Union[str, Path], id_column: str = "id"):
+        self.directory = Path(directory)
+        (self.directory / "changes").mkdir(parents=True, exist_ok=True)
+        self.id_column = id_column
+        self._manifest_path = self.directory / "manifest.json"
+        self._players_path = self.directory / "players.parquet"
+        self._manifest: Dict[str, Any] = {"attributes": [], "iterations": []}
+        if self._manifest_path.exists():
+            self._manifest.update(json.loads(self._manifest_path.read_text()))
+        # One row per player ever seen; a player's row number is their code in the index.
+        self.players: Optional[pl.DataFrame] = None
+        if self._manifest["iterations"] and self._players_path.exists():
+            self.players = pl.read_parquet(self._players_path)
+        self._player_codes: Dict[Any, int] = {}
+        if self.players is not None:
+            self._player_codes = {player_id: i for i, player_id in enumerate(self.players["player_id"].to_list())}
+
+        changes = [
+            pl.read_parquet(self.directory / entry["file"]).with_columns(pl.lit(seq, pl.Int32).alias("seq"))
+            for seq, entry in enumerate(self._manifest["iterations"])
+        ]
+        self._keys = np.empty(0, dtype=np.int64)
+        self._seqs = np.empty(0, dtype=np.int32)
+        self._values = np.empty(0, dtype=np.int16)
+        self._offsets = [0]
+        for frame in changes:
+            self._extend(frame)
+        self._reindex()
+
+    @property
+    def attributes(self) -> List[str]:
+        return list(self._manifest["attributes"])
+
+    @property
+    def iterations(self) -> List[str]:
+        return [entry["id"] for entry in self._manifest["iterations"]]
+
+    def sequence(self, iteration: Union[int, str]) -> int:
+        """Position of an iteration, given its id or position."""
+        count = len(self._manifest["iterations"])
+        if isinstance(iteration, str):
+            if iteration not in self.iterations:
+                raise KeyError(f"Unknown ratings iteration: {iteration}")
+            return self.iterations.index(iteration)
+        seq = iteration + count if iteration < 0 else iteration
+        if not 0 <= seq < count:
+            raise IndexError(f"Iteration {iteration} out of range for {count} stored iterations")
+        return seq
+
+    def _extend(self, changes: pl.DataFrame) -> None:
+        """Append one iteration's changes (``player_id``, ``attribute``, ``value``, ``seq``) to the log arrays."""
+        attribute_codes = {name: i for i, name in enumerate(self._manifest["attributes"])}
+        player_codes = changes["player_id"].replace_strict(self._player_codes, return_dtype=pl.Int64).to_numpy()
+        codes = changes["attribute"].replace_strict(attribute_codes, return_dtype=pl.Int64).to_numpy()
+        self._keys = np.concatenate([self._keys, (player_codes << _ATTRIBUTE_BITS) | codes])
+        self._seqs = np.concatenate([self._seqs, changes["seq"].to_numpy().astype(np.int32)])
+        self._values = np.concatenate([self._values, changes["value"].fill_null(MISSING).to_numpy().astype(np.int16)])
+        self._offsets.append(len(self._keys))
+
+    def _reindex(self) -> None:
+        """Sort the change log by ``(player, attribute, iteration)``."""
+        composite = (self._keys << _SEQUENCE_BITS) | self._seqs.astype(np.int64)
+        order = np.argsort(composite, kind="stable")
+        self._index = composite[order]
+        self._index_values = self._values[order]
+        self._index_keys = np.unique(self._keys)
+
+    def _lookup(self, keys: np.ndarray, seq: int) -> np.ndarray:
+        """Value of every ``(player, attribute)`` key as of an iteration, ``MISSING`` where it has none."""
+        positions = np.searchsorted(self._index, (keys << _SEQUENCE_BITS) | seq, side="right") - 1
+        found = positions >= 0
+        found[found] = (self._index[positions[found]] >> _SEQUENCE_BITS) == keys[found]
+        values = np.full(len(keys), MISSING, dtype=np.int16)
+        values[found] = self._index_values[positions[found]]
+        return values
+
+    def _attribute_codes(self, attributes: Optional[Sequence[str]]) -> np.ndarray:
+        names = self._manifest["attributes"]
+        if attributes is None:
+            return np.arange(len(names))
+        unknown = [name for name in attributes if name not in names]
+        if unknown:
+            raise KeyError(f"Unknown rating attributes: {unknown}")
+        return np.array([names.index(name) for name in attributes], dtype=np.int64)
+
+    def _long_frame(self, keys: np.ndarray, columns: Dict[str, np.ndarray]) -> pl.DataFrame:
+        """``player_id``, ``attribute`` and the given columns for packed keys, with identity columns."""
+        frame = pl.DataFrame(
+            {
+                "player_code": (keys >> _ATTRIBUTE_BITS).astype(np.uint32),
+                "attribute": np.array(self._manifest["attributes"], dtype=object)[keys & _ATTRIBUTE_MASK],
+                **columns,
+            },
+            schema_overrides={"attribute": pl.String},
+        )
+        identity = [name for name in self.players.columns if name not in ("player_id", "last_seen")]
+        players = self.players.with_row_index("player_code").select("player_code", "player_id", *identity)
+        return frame.join(players, on="player_code", how="left").select("player_id", *identity, "attribute", *columns)
+
+    def as_of(self, iteration: Union[int, str], attributes: Optional[Sequence[str]] = None) -> pl.DataFrame:
+        """
+        Ratings of every rostered player as of an iteration.
+
+        Args:
+            iteration (Union[int, str]): Iteration id or position.
+            attributes (Optional[Sequence[str]]): Ratings to return. Defaults to all.
+
+        Returns:
+            pl.DataFrame: One row per player with ``player_id``, the identity
+            columns and one Int16 column per rating (null where the player
+            has no such rating).
+        """
+        seq = self.sequence(iteration)
+        codes = self._attribute_codes(attributes)
+        keys = self._index_keys[np.isin(self._index_keys & _ATTRIBUTE_MASK, codes)]
+        values = self._lookup(keys, seq)
+        keys, values = keys[values != MISSING], values[values != MISSING]
+
+        player_codes, rows = np.unique(keys >> _ATTRIBUTE_BITS, return_inverse=True)
+        column_of = np.full(len(self._manifest["attributes"]), -1, dtype=np.int64)
+        column_of[codes] = np.arange(len(codes))
+        matrix = np.full((len(player_codes), len(codes)), MISSING, dtype=np.int16)
+        matrix[rows, column_of[keys & _ATTRIBUTE_MASK]] = values
+
+        names = [self._manifest["attributes"][code] for code in codes]
+        ratings = pl.DataFrame(matrix, schema=names, orient="row").select(pl.all().replace(MISSING, None))
+        players = self.players[player_codes.tolist()].drop("last_seen")
+        return pl.concat([players, ratings], how="horizontal")
+
+    def rating(self, player_id: Any, attribute: str, iteration: Union[int, str] = -1) -> Optional[int]:
+        """One player's rating as of an iteration, or None if they had none."""
+        if player_id not in self._player_codes:
+            return None
+        code = self._attribute_codes([attribute])[0]
+        key = np.array([(self._player_codes[player_id] << _ATTRIBUTE_BITS) | code], dtype=np.int64)
+        value = int(self._lookup(key, self.sequence(iteration))[0])
+        return None if value == MISSING else value
+
+    def player_history(self, player_id: Any, attributes: Optional[Sequence[str]] = None) -> pl.DataFrame:
+        """
+        Every stored change of one player's ratings, oldest first.
+
+        Returns:
+            pl.DataFrame: ``iteration``, ``attribute`` and ``value`` (null once
+            the player left the roster).
+        """
+        schema = {"iteration": pl.String, "attribute": pl.String, "value": pl.Int16}
+        if player_id not in self._player_codes:
+            return pl.DataFrame(schema=schema)
+        code = self._player_codes[player_id]
+        start, end = np.searchsorted(
+            self._index, [code << (_ATTRIBUTE_BITS + _SEQUENCE_BITS), (code + 1) << (_ATTRIBUTE_BITS + _SEQUENCE_BITS)]
+        )
+        composite, values = self._index[start:end], self._index_values[start:end]
+        attribute_codes = (composite >> _SEQUENCE_BITS) & _ATTRIBUTE_MASK
+        keep = np.isin(attribute_codes, self._attribute_codes(attributes))
+        seqs = (composite & _SEQUENCE_MASK)[keep]
+        return (
+            pl.DataFrame(
+                {
+                    "seq": seqs,
+                    "iteration": [self._manifest["iterations"][seq]["id"] for seq in seqs.tolist()],
+                    "attribute": [self._manifest["attributes"][code] for code in attribute_codes[keep].tolist()],
+                    "value": values[keep],
+                },
+                schema_overrides=schema,
+            )
+            .sort("seq", "attribute")
+            .select("iteration", "attribute", pl.col("value").replace(MISSING, None))
+        )
+
+    def movers(
+        self,
+        start: Union[int, str],
+        end: Union[int, str],
+        attribute: Optional[str] = "overallRating",
+        n: Optional[int] = 25,
+    ) -> pl.DataFrame:
+        """
+        Biggest rating changes between two iterations.
+
+        Only the changes stored after ``start`` up to ``end`` are read. Players
+        without the rating at either iteration (added or removed in between)
+        are left out.
+
+        Args:
+            start (Union[int, str]): Earlier iteration id or position.
+            end (Union[int, str]): Later iteration id or position.
+            attribute (Optional[str]): Rating to compare, or None for every rating.
+            n (Optional[int]): Rows to return, or None for all.
+
+        Returns:
+            pl.DataFrame: ``player_id``, the identity columns, ``attribute``,
+            ``start_value``, ``end_value`` and ``change``, largest absolute
+            change first.
+        """
+        start_seq, end_seq = self.sequence(start), self.sequence(end)
+        if start_seq >= end_seq:
+            raise ValueError(f"Iteration {start} is not before {end}")
+        keys = self._keys[self._offsets[start_seq + 1] : self._offsets[end_seq + 1]]
+        if attribute is not None:
+            keys = keys[(keys & _ATTRIBUTE_MASK) == self._attribute_codes([attribute])[0]]
+        keys = np.unique(keys)
+        start_values, end_values = self._lookup(keys, start_seq), self._lookup(keys, end_seq)
+        moved = (start_values != MISSING) & (end_values != MISSING) & (start_values != end_values)
+        changes = self._long_frame(
+            keys[moved],
+            {
+                "start_value": start_values[moved],
+                "end_value": end_values[moved],
+                "change": end_values[moved].astype(np.int16) - start_values[moved],
+            },
+        )
+        changes = changes.sort(pl.col("change").abs(), "player_id", descending=[True, False])
+        return changes if n is None else changes.head(n)
+
+    def _save(self) -> None:
+        tmp_path = self._players_path.with_suffix(".tmp")
+        self.players.write_parquet(tmp_path)
+        tmp_path.replace(self._players_path)
+        # The manifest is written last: an iteration exists once it is listed.
+        tmp_path = self._manifest_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self._manifest, indent=1))
+        tmp_path.replace(self._manifest_path)
+
+    def _changes_since(self, seq: Optional[int], current: pl.DataFrame) -> pl.DataFrame:
+        """Cells of ``current`` (long ``player_id``, ``attribute``, ``value``) that differ from ``seq``."""
+        if seq is None:
+            return current
+        keys = self._index_keys
+        values = self._lookup(keys, seq)
+        previous = self._long_frame(keys[values != MISSING], {"value": values[values != MISSING]}).select(
+            "player_id", "attribute", "value"
+        )
+        return (
+            previous.join(current, on=["player_id", "attribute"], how="full", coalesce=True, suffix="_current")
+            .filter(pl.col("value").ne_missing(pl.col("value_current")))
+            .select("player_id", "attribute", pl.col("value_current").alias("value"))
+        )
+
+    def append(self, df: pl.DataFrame, iteration: Optional[str] = None, label: Optional[str] = None) -> int:
+        """
+        Store a ratings iteration as its changes against the latest one.
+
+        Appending the latest iteration again (e.g. after EA corrected it)
+        replaces it. Older iterations cannot be rewritten.
+
+        Args:
+            df (pl.DataFrame): One row per player, as from ``fetch_madden_ratings``.
+            iteration (Optional[str]): Iteration id. Defaults to the frame's ``iteration_id``.
+            label (Optional[str]): Display label. Defaults to the frame's ``iteration_label``.
+
+        Returns:
+            int: Number of changed cells stored.
+        """
+        if iteration is None:
+            iteration = df["iteration_id"].drop_nulls().unique().to_list()
+            if len(iteration) != 1:
+                raise ValueError(f"Expected one iteration_id in the frame, found {iteration}")
+            iteration = iteration[0]
+        if label is None and "iteration_label" in df.columns:
+            label = df["iteration_label"].drop_nulls().first()
+        if iteration in self.iterations:
+            if iteration != self.iterations[-1]:
+                raise ValueError(f"Iteration {iteration} is already stored and is not the latest")
+            self._manifest["iterations"].pop()
+            keep = self._offsets.pop(-2)
+            self._keys, self._seqs, self._values = self._keys[:keep], self._seqs[:keep], self._values[:keep]
+            self._offsets[-1] = keep
+            self._reindex()
+        seq = len(self._manifest["iterations"])
+        if seq >= 1 << _SEQUENCE_BITS:
+            raise ValueError(f"At most {1 << _SEQUENCE_BITS} iterations can be stored")
+
+        attributes = rating_attributes(df)
+        for name in attributes:
+            if name not in self._manifest["attributes"]:
+                self._manifest["attributes"].append(name)
+        if len(self._manifest["attributes"]) > 1 << _ATTRIBUTE_BITS:
+            raise ValueError(f"At most {1 << _ATTRIBUTE_BITS} rating attributes can be stored")
+
+        df = df.filter(pl.col(self.id_column).is_not_null()).unique(self.id_column, keep="last", maintain_order=True)
+        identity = [name for name in IDENTITY_COLUMNS if name in df.columns]
+        seen = df.select(pl.col(self.id_column).alias("player_id"), *identity, pl.lit(seq, pl.Int32).alias("last_seen"))
+        if self.players is None:
+            self.players = seen
+        else:
+            # Players keep their code (row); known players get their latest identity.
+            updated = self.players.update(seen, on="player_id")
+            new = seen.join(self.players, on="player_id", how="anti")
+            self.players = pl.concat([updated, new], how="diagonal_relaxed")
+        for player_id in self.players["player_id"].to_list()[len(self._player_codes) :]:
+            self._player_codes[player_id] = len(self._player_codes)
+
+        current = (
+            df.select(pl.col(self.id_column).alias("player_id"), *attributes)
+            .unpivot(index="player_id", variable_name="attribute", value_name="value")
+            .drop_nulls("value")
+            .with_columns(pl.col("value").round().cast(pl.Int16))
+        )
+        changes = self._changes_since(seq - 1 if seq else None, current)
+
+        file = f"changes/{seq:05d}.parquet"
+        tmp_path = (self.directory / file).with_suffix(".tmp")
+        changes.write_parquet(tmp_path)
+        tmp_path.replace(self.directory / file)
+        self._manifest["iterations"].append(
+            {"id": iteration, "label": label, "file": file, "players": df.height, "changes": changes.height}
+        )
+        self._save()
+
+        self._extend(changes.with_columns(pl.lit(seq, pl.Int32).alias("seq")))
+        self._reindex()
+        logging.info(f"Stored {changes.height} changed ratings for {iteration} ({df.height} players)")
+        return changes.height
+
+    def summary(self) -> pl.DataFrame:
+        """Players and stored changes per iteration, next to the cells a full snapshot would take."""
+        attributes = len(self._manifest["attributes"])
+        return pl.DataFrame(
+            [
+                {
+                    "iteration": entry["id"],
+                    "label": entry["label"],
+                    "players": entry["players"],
+                    "changes": entry["changes"],
+                    "snapshot_cells": entry["players"] * attributes,
+                }
+                for entry in self._manifest["iterations"]
+            ],
+            schema={
+                "iteration": pl.String,
+                "label": pl.String,
+                "players": pl.Int64,
+                "changes": pl.Int64,
+                "snapshot_cells": pl.Int64,
+            },
+        )
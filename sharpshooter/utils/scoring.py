@@ -0,0 +1,376 @@
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import polars as pl
+from pydantic import BaseModel, Field
+
+STAT_COLUMNS: Tuple[str, ...] = (
+    "completions",
+    "pass_attempts",
+    "passing_yards",
+    "passing_tds",
+    "interceptions",
+    "carries",
+    "rushing_yards",
+    "rushing_tds",
+    "targets",
+    "receptions",
+    "receiving_yards",
+    "receiving_tds",
+    "return_tds",
+    "fumbles_lost",
+    "two_point_conversions",
+)
+
+# Play-by-play columns read to build stat lines.
+PBP_COLUMNS: Tuple[str, ...] = (
+    "game_id",
+    "play_id",
+    "season",
+    "week",
+    "posteam",
+    "play_type",
+    "passer_player_id",
+    "passer_player_name",
+    "passing_yards",
+    "complete_pass",
+    "incomplete_pass",
+    "interception",
+    "pass_touchdown",
+    "rusher_player_id",
+    "rusher_player_name",
+    "rushing_yards",
+    "rush_attempt",
+    "rush_touchdown",
+    "receiver_player_id",
+    "receiver_player_name",
+    "receiving_yards",
+    "fumbled_1_player_id",
+    "fumbled_1_player_name",
+    "fumbled_1_team",
+    "fumble_lost",
+    "td_player_id",
+    "td_player_name",
+    "td_team",
+    "return_touchdown",
+    "two_point_attempt",
+    "two_point_conv_result",
+)
+
+STAT_LINE_KEYS: Tuple[str, ...] = ("season", "week", "game_id", "player_id")
+
+
+class ScoringRules(BaseModel):
+    """
+    A fantasy scoring rule set.
+
+    ``points`` gives the points per unit of each stat in ``STAT_COLUMNS``;
+    ``bonuses`` gives ``(stat, threshold, points)`` awarded once a game's
+    stat reaches the threshold.
+    """
+
+    name: str
+    points: Dict[str, float]
+    bonuses: List[Tuple[str, float, float]] = Field(default_factory=list)
+
+    def expression(self) -> pl.Expr:
+        """Points of a stat line under these rules."""
+        unknown = ({*self.points} | {stat for stat, _, _ in self.bonuses}) - set(STAT_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown stats in {self.name} rules: {sorted(unknown)}")
+        terms = [pl.col(stat).fill_null(0) * value for stat, value in self.points.items()]
+        terms += [(pl.col(stat).fill_null(0) >= threshold) * value for stat, threshold, value in self.bonuses]
+        return pl.sum_horizontal(terms).alias(f"{self.name}_points")
+
+
+_BASE_POINTS: Dict[str, float] = {
+    "passing_yards": 0.04,
+    "passing_tds": 4.0,
+    "rushing_yards": 0.1,
+    "rushing_tds": 6.0,
+    "receiving_yards": 0.1,
+    "receiving_tds": 6.0,
+    "return_tds": 6.0,
+    "two_point_conversions": 2.0,
+}
+
+DRAFTKINGS = ScoringRules(
+    name="draftkings",
+    points={**_BASE_POINTS, "receptions": 1.0, "interceptions": -1.0, "fumbles_lost": -1.0},
+    bonuses=[("passing_yards", 300, 3.0), ("rushing_yards", 100, 3.0), ("receiving_yards", 100, 3.0)],
+)
+ESPN_PPR = ScoringRules(
+    name="espn_ppr", points={**_BASE_POINTS, "receptions": 1.0, "interceptions": -2.0, "fumbles_lost": -2.0}
+)
+ESPN_HALF_PPR = ScoringRules(
+    name="espn_half_ppr", points={**_BASE_POINTS, "receptions": 0.5, "interceptions": -2.0, "fumbles_lost": -2.0}
+)
+
+SCORING_RULES: Dict[str, ScoringRules] = {rules.name: rules for rules in (DRAFTKINGS, ESPN_PPR, ESPN_HALF_PPR)}
+
+
+def _flag(column: str) -> pl.Expr:
+    return pl.col(column).fill_null(0).cast(pl.Int64)
+
+
+def player_game_stats(pbp: Union[pl.DataFrame, pl.LazyFrame]) -> pl.LazyFrame:
+    """
+    Per-player, per-game stat lines from play-by-play.
+
+    Each play is split into the roles that earn fantasy stats (passer,
+    rusher, receiver, fumbler, return scorer). Their stats are stacked into
+    one long frame and summed per player and game in a single lazy group-by.
+    Two-point attempts only count as conversions, not towards yards or
+    attempts.
+
+    Args:
+        pbp (Union[pl.DataFrame, pl.LazyFrame]): nflverse play-by-play with
+            at least ``PBP_COLUMNS``.
+
+    Returns:
+        pl.LazyFrame: One row per ``STAT_LINE_KEYS`` with ``player_name``,
+        ``team`` and every stat in ``STAT_COLUMNS``.
+    """
+    plays = pbp.lazy().select(PBP_COLUMNS)
+    regular = _flag("two_point_attempt") == 0
+    converted = (_flag("two_point_attempt") == 1) & (pl.col("two_point_conv_result") == "success")
+    keys = [pl.col("season"), pl.col("week"), pl.col("game_id")]
+
+    def role(player: str, name: str, team: str, condition: pl.Expr, **stats: pl.Expr) -> pl.LazyFrame:
+        return plays.filter(pl.col(player).is_not_null(), condition).select(
+            *keys,
+            pl.col(player).alias("player_id"),
+            pl.col(name).alias("player_name"),
+            pl.col(team).alias("team"),
+            *(expr.cast(pl.Float64).alias(stat) for stat, expr in stats.items()),
+        )
+
+    roles = [
+        role(
+            "passer_player_id",
+            "passer_player_name",
+            "posteam",
+            pl.lit(True),
+            completions=_flag("complete_pass") * regular,
+            pass_attempts=(_flag("complete_pass") + _flag("incomplete_pass") + _flag("interception")) * regular,
+            passing_yards=pl.col("passing_yards").fill_null(0) * regular,
+            passing_tds=_flag("pass_touchdown") * regular,
+            interceptions=_flag("interception") * regular,
+            two_point_conversions=converted,
+        ),
+        role(
+            "rusher_player_id",
+            "rusher_player_name",
+            "posteam",
+            pl.lit(True),
+            carries=_flag("rush_attempt") * regular,
+            rushing_yards=pl.col("rushing_yards").fill_null(0) * regular,
+            rushing_tds=_flag("rush_touchdown") * regular,
+            two_point_conversions=converted,
+        ),
+        role(
+            "receiver_player_id",
+            "receiver_player_name",
+            "posteam",
+            pl.lit(True),
+            targets=pl.lit(1) * regular,
+            receptions=_flag("complete_pass") * regular,
+            receiving_yards=pl.col("receiving_yards").fill_null(0) * regular,
+            receiving_tds=_flag("pass_touchdown") * regular,
+            two_point_conversions=converted,
+        ),
+        role(
+            "fumbled_1_player_id",
+            "fumbled_1_player_name",
+            "fumbled_1_team",
+            _flag("fumble_lost") == 1,
+            fumbles_lost=pl.lit(1),
+        ),
+        role(
+            "td_player_id",
+            "td_player_name",
+            "td_team",
+            (_flag("return_touchdown") == 1) & pl.col("play_type").is_in(["kickoff", "punt"]),
+            return_tds=pl.lit(1),
+        ),
+    ]
+    return (
+        pl.concat(roles, how="diagonal_relaxed")
+        .group_by(STAT_LINE_KEYS)
+        .agg(
+            pl.col("player_name").drop_nulls().first(),
+            pl.col("team").drop_nulls().first(),
+            *(pl.col(stat).fill_null(0).sum() for stat in STAT_COLUMNS),
+        )
+        .with_columns(pl.col(stat).cast(pl.Float64) for stat in STAT_COLUMNS)
+    )
+
+
+def fantasy_points(
+    stats: Union[pl.DataFrame, pl.LazyFrame], rules: Sequence[ScoringRules] = (DRAFTKINGS, ESPN_PPR, ESPN_HALF_PPR)
+) -> Union[pl.DataFrame, pl.LazyFrame]:
+    """
+    Add a ``<rules>_points`` column per rule set to stat lines.
+
+    Args:
+        stats (Union[pl.DataFrame, pl.LazyFrame]): Stat lines from
+            ``player_game_stats``.
+        rules (Sequence[ScoringRules]): Rule sets to score with.
+
+    Returns:
+        Union[pl.DataFrame, pl.LazyFrame]: ``stats`` with the points columns.
+
+    Example:
+        >>> points = fantasy_points(player_game_stats(scan_nflverse_pbp(2023, columns=PBP_COLUMNS)), [DRAFTKINGS])
+        >>> points.sort("draftkings_points", descending=True).head().collect()
+    """
+    return stats.with_columns(rule_set.expression() for rule_set in rules)
+
+
+def _week_fingerprints(pbp: pl.LazyFrame) -> pl.DataFrame:
+    """
+    Play count and a hash of the scored columns of every play per season and
+    week, so stat corrections are picked up as well as new plays. The hash is
+    only stable within a polars version; after an upgrade every week is
+    rebuilt once.
+    """
+    return (
+        pbp.group_by("season", "week")
+        .agg(
+            pl.len().cast(pl.Int64).alias("plays"),
+            pl.struct(PBP_COLUMNS).hash().sort().implode().hash().cast(pl.String).alias("content_hash"),
+        )
+        .sort("season", "week")
+        .collect()
+    )
+
+
+class FantasyPointsStore:
+    """
+    Per-player, per-game stat lines from play-by-play, materialized per week.
+
+    Stat lines are kept as one parquet file per season and week under
+    ``directory``, next to a manifest fingerprinting each week's plays. ``update``
+    only rebuilds the weeks that are new or whose plays changed, so adding a
+    week of play-by-play only computes that week. Points are computed when
+    reading, so any rule set can be applied to the stored lines.
+
+    Example:
+        >>> store = FantasyPointsStore("fantasy_points")
+        >>> store.update(scan_nflverse_pbp(range(2019, 2025), columns=PBP_COLUMNS))
+        >>> store.points([DRAFTKINGS, ESPN_HALF_PPR], seasons=[2024])
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.directory / "manifest.parquet"
+
+    def _week_path(self, season: int, week: int) -> Path:
+        return self.directory / f"season={season}" / f"week={week:02d}.parquet"
+
+    def manifest(self) -> pl.DataFrame:
+        """Fingerprint of every materialized week."""
+        if not self.manifest_path.exists():
+            return pl.DataFrame(
+                schema={"season": pl.Int64, "week": pl.Int64, "plays": pl.Int64, "content_hash": pl.String}
+            )
+        return pl.read_parquet(self.manifest_path)
+
+    def update(self, pbp: Union[pl.DataFrame, pl.LazyFrame]) -> List[Tuple[int, int]]:
+        """
+        Materialize the weeks of ``pbp`` that are missing or changed.
+
+        A stored week of a season in ``pbp`` that no longer has plays there
+        (e.g. a game moved to another week) is deleted. Seasons absent from
+        ``pbp`` are left as they are, so seasons can be updated one at a time.
+
+        Args:
+            pbp (Union[pl.DataFrame, pl.LazyFrame]): Play-by-play, ideally a
+                lazy scan so only the needed weeks and columns are read.
+
+        Returns:
+            List[Tuple[int, int]]: The ``(season, week)`` pairs rebuilt.
+        """
+        pbp = pbp.lazy().with_columns(pl.col("season", "week").cast(pl.Int64))
+        fingerprints = _week_fingerprints(pbp)
+        manifest = self.manifest()
+        stale = fingerprints.join(manifest, on=["season", "week", "plays", "content_hash"], how="anti")
+        vanished = manifest.filter(pl.col("season").is_in(fingerprints["season"].implode())).join(
+            fingerprints, on=["season", "week"], how="anti"
+        )
+        weeks = [(season, week) for season, week in stale.select("season", "week").iter_rows()]
+        dropped = [(season, week) for season, week in vanished.select("season", "week").iter_rows()]
+        if not weeks and not dropped:
+            logging.info(f"All {fingerprints.height} weeks of play-by-play are already materialized")
+            return []
+
+        lines = pl.DataFrame()
+        if weeks:
+            wanted = pl.any_horizontal(
+                (pl.col("season") == season) & pl.col("week").is_in(list(group["week"]))
+                for (season,), group in stale.group_by("season")
+            )
+            lines = player_game_stats(pbp.filter(wanted)).collect()
+        for season, week in weeks:
+            path = self._week_path(season, week)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            lines.filter(pl.col("season") == season, pl.col("week") == week).sort("game_id", "player_id").write_parquet(
+                tmp_path
+            )
+            tmp_path.replace(path)
+
+        kept = manifest.join(stale, on=["season", "week"], how="anti").join(vanished, on=["season", "week"], how="anti")
+        manifest = pl.concat([kept, stale.select(manifest.columns)]).sort("season", "week")
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        manifest.write_parquet(tmp_path)
+        tmp_path.replace(self.manifest_path)
+        # Deleted only once the manifest no longer lists them.
+        for season, week in dropped:
+            self._week_path(season, week).unlink(missing_ok=True)
+        if dropped:
+            logging.info(f"Dropped {len(dropped)} weeks no longer in play-by-play: {dropped}")
+        logging.info(f"Materialized {lines.height} stat lines for {len(weeks)} weeks: {weeks}")
+        return weeks
+
+    def scan(self, seasons: Optional[Sequence[int]] = None, weeks: Optional[Tuple[int, int]] = None) -> pl.LazyFrame:
+        """
+        Lazily scan materialized stat lines.
+
+        Args:
+            seasons (Optional[Sequence[int]]): Seasons to read. All when None.
+            weeks (Optional[Tuple[int, int]]): Inclusive ``(first, last)`` week range.
+
+        Returns:
+            pl.LazyFrame: Stat lines, as from ``player_game_stats``.
+        """
+        manifest = self.manifest()
+        if seasons is not None:
+            manifest = manifest.filter(pl.col("season").is_in(list(seasons)))
+        if weeks is not None:
+            manifest = manifest.filter(pl.col("week").is_between(weeks[0], weeks[1]))
+        paths = [str(self._week_path(season, week)) for season, week in manifest.select("season", "week").iter_rows()]
+        if not paths:
+            return pl.LazyFrame(
+                schema={
+                    "season": pl.Int64,
+                    "week": pl.Int64,
+                    "game_id": pl.String,
+                    "player_id": pl.String,
+                    "player_name": pl.String,
+                    "team": pl.String,
+                    **{stat: pl.Float64 for stat in STAT_COLUMNS},
+                }
+            )
+        return pl.scan_parquet(paths)
+
+    def points(
+        self,
+        rules: Sequence[ScoringRules] = (DRAFTKINGS, ESPN_PPR, ESPN_HALF_PPR),
+        seasons: Optional[Sequence[int]] = None,
+        weeks: Optional[Tuple[int, int]] = None,
+    ) -> pl.DataFrame:
+        """Materialized stat lines with a points column per rule set (see ``fantasy_points``)."""
+        return fantasy_points(self.scan(seasons, weeks), rules).collect()
@@ -0,0 +1,553 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+import polars as pl
+from pydantic import BaseModel, ConfigDict, Field
+
+# Depth-chart roles whose outcomes are correlated, for one side of a game.
+DEFAULT_SLOTS: Tuple[str, ...] = ("QB1", "RB1", "RB2", "WR1", "WR2", "WR3", "TE1", "DST")
+
+# Spread of a position's weekly points relative to its projection when the model has no fit for it.
+DEFAULT_CV = 0.8
+
+
+class OutcomeModel(BaseModel):
+    """
+    Spread and correlation of weekly fantasy points.
+
+    ``correlation`` is over the ``slots`` of one team followed by the same
+    slots of its opponent, so it describes a whole game. ``volatility`` maps a
+    position to ``(intercept, slope)`` of a player's weekly standard deviation
+    against their mean points.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    slots: Tuple[str, ...]
+    correlation: np.ndarray
+    volatility: Dict[str, Tuple[float, float]]
+    games: int = Field(default=0)  # team-games the correlation was estimated from
+
+    def std(self, position: np.ndarray, mean: np.ndarray) -> np.ndarray:
+        """Standard deviation of weekly points for players with these positions and means."""
+        std = mean * DEFAULT_CV
+        for name, (intercept, slope) in self.volatility.items():
+            rows = position == name
+            std[rows] = intercept + slope * mean[rows]
+        return np.maximum(std, 0.05 * np.abs(mean) + 1e-3)
+
+
+class Contest(BaseModel):
+    entry_fee: float
+    payouts: List[float]  # prize for each finishing place, first place first
+
+    @classmethod
+    def from_tiers(cls, entry_fee: float, tiers: Sequence[Tuple[int, int, float]]) -> "Contest":
+        """Build a contest from ``(first_place, last_place, prize)`` tiers, e.g. ``[(1, 1, 1000.0), (2, 5, 100.0)]``."""
+        places = max(last for _, last, _ in tiers)
+        payouts = [0.0] * places
+        for first, last, prize in tiers:
+            payouts[first - 1 : last] = [prize] * (last - first + 1)
+        return cls(entry_fee=entry_fee, payouts=payouts)
+
+
+class SimulationResult(BaseModel):
+    """
+    Outcome of ``ContestSimulator.simulate``.
+
+    ``summary`` has one row per candidate lineup: its mean and standard
+    deviation of points, mean payout, ROI with its standard error, and the
+    share of trials it won or cashed.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    summary: pl.DataFrame
+    trials: int
+    seed: int
+
+
+def team_games(pbp: Union[pl.DataFrame, pl.LazyFrame]) -> pl.DataFrame:
+    """
+    Final score of every game in play-by-play, one row per team and game.
+
+    Only the game id, teams and running scores are read, so a lazy scan (see
+    ``scan_nflverse_pbp``) only materializes those columns.
+
+    Args:
+        pbp (Union[pl.DataFrame, pl.LazyFrame]): nflverse play-by-play.
+
+    Returns:
+        pl.DataFrame: ``season``, ``week``, ``game_id``, ``team``,
+        ``opponent``, ``points_for`` and ``points_against``.
+    """
+    games = (
+        pbp.lazy()
+        .group_by("game_id")
+        .agg(
+            pl.col("season", "week", "home_team", "away_team").first(),
+            pl.col("total_home_score").max().alias("home_score"),
+            pl.col("total_away_score").max().alias("away_score"),
+        )
+    )
+    sides = [
+        games.select(
+            "season",
+            "week",
+            "game_id",
+            pl.col(team).alias("team"),
+            pl.col(opponent).alias("opponent"),
+            pl.col(points_for).cast(pl.Float64).alias("points_for"),
+            pl.col(points_against).cast(pl.Float64).alias("points_against"),
+        )
+        for team, opponent, points_for, points_against in (
+            ("home_team", "away_team", "home_score", "away_score"),
+            ("away_team", "home_team", "away_score", "home_score"),
+        )
+    ]
+    return pl.concat(sides).sort("season", "week", "game_id", "team").collect()
+
+
+def _slot_parts(slots: Sequence[str]) -> Dict[str, int]:
+    """Deepest depth-chart rank per position in ``slots`` ("WR3" -> WR: 3, "DST" -> DST: 1)."""
+    depth: Dict[str, int] = {}
+    for slot in slots:
+        position = slot.rstrip("0123456789")
+        depth[position] = max(depth.get(position, 0), int(slot[len(position) :] or 1))
+    return depth
+
+
+def _pairwise_correlation(values: np.ndarray) -> np.ndarray:
+    """Correlation between columns over the rows where both are present (NaN elsewhere)."""
+    present = (~np.isnan(values)).astype(np.float64)
+    filled = np.nan_to_num(values)
+    count = present.T @ present
+    sums = filled.T @ present  # sums[i, j]: column i over the rows where j is present
+    squares = (filled**2).T @ present
+    products = filled.T @ filled
+    with np.errstate(divide="ignore", invalid="ignore"):
+        covariance = count * products - sums * sums.T
+        scale = np.sqrt((count * squares - sums**2) * (count * squares - sums**2).T)
+        correlation = covariance / scale
+    correlation[~np.isfinite(correlation) | (count < 3)] = 0.0
+    np.fill_diagonal(correlation, 1.0)
+    return correlation
+
+
+def _nearest_correlation(matrix: np.ndarray, floor: float = 1e-6) -> np.ndarray:
+    """A positive definite correlation matrix close to ``matrix``, by clipping its eigenvalues."""
+    matrix = (matrix + matrix.T) / 2
+    values, vectors = np.linalg.eigh(matrix)
+    repaired = (vectors * np.maximum(values, floor)) @ vectors.T
+    scale = np.sqrt(np.diag(repaired))
+    return repaired / np.outer(scale, scale)
+
+
+def estimate_outcome_model(
+    weekly: Union[pl.DataFrame, pl.LazyFrame],
+    games: pl.DataFrame,
+    points_column: str = "fantasy_points_ppr",
+    team_column: str = "recent_team",
+    slots: Sequence[str] = DEFAULT_SLOTS,
+    min_games: int = 4,
+) -> OutcomeModel:
+    """
+    Estimate the spread and correlation of weekly fantasy points.
+
+    Every player-season with at least ``min_games`` games gives a mean and a
+    standard deviation of weekly points. Per position, the standard deviation
+    is fit as a line in the mean. In each game, a team's players are ranked
+    by their season mean within their position (QB1, RB1, RB2, ...), and each
+    player's standardized residual for the week fills their slot. A defense's
+    slot is its points allowed, standardized and negated. Correlations
+    between slots, including the opponent's, are then taken across every
+    team-game where both slots are filled.
+
+    Args:
+        weekly (Union[pl.DataFrame, pl.LazyFrame]): nflverse weekly player
+            stats (see ``scan_nflverse_player_stats``).
+        games (pl.DataFrame): Team-games from ``team_games``.
+        points_column (str): Weekly fantasy points column.
+        team_column (str): Player's team column in ``weekly``.
+        slots (Sequence[str]): Depth-chart slots to correlate.
+        min_games (int): Games a player-season needs to be used.
+
+    Returns:
+        OutcomeModel: The estimated model.
+    """
+    depth = _slot_parts(slots)
+    positions = [position for position in depth if position != "DST"]
+    stats = (
+        weekly.lazy()
+        .filter(pl.col("position").is_in(positions), pl.col(points_column).is_not_null())
+        .select(
+            "season",
+            "week",
+            "player_id",
+            "position",
+            pl.col(team_column).alias("team"),
+            pl.col(points_column).cast(pl.Float64).alias("points"),
+        )
+        .with_columns(
+            pl.col("points").mean().over("season", "player_id").alias("mean"),
+            pl.col("points").std().over("season", "player_id").alias("std"),
+            pl.len().over("season", "player_id").alias("games"),
+        )
+        .filter(pl.col("games") >= min_games)
+        .collect()
+    )
+    player_seasons = stats.unique(["season", "player_id"])
+    fits = player_seasons.group_by("position").agg(
+        (pl.cov("mean", "std") / pl.col("mean").var()).alias("slope"), pl.col("mean", "std").mean()
+    )
+    volatility = {
+        row["position"]: (row["std"] - row["slope"] * row["mean"], row["slope"])
+        for row in fits.iter_rows(named=True)
+        if row["slope"] is not None
+    }
+
+    fitted = pl.col("position").replace_strict(
+        {position: intercept for position, (intercept, _) in volatility.items()}, default=None
+    ) + pl.col("position").replace_strict(
+        {position: slope for position, (_, slope) in volatility.items()}, default=None
+    ) * pl.col("mean")
+    residuals = stats.select(
+        "season",
+        "week",
+        "team",
+        (
+            pl.col("position")
+            + pl.col("mean").rank("ordinal", descending=True).over("season", "week", "team", "position").cast(pl.String)
+        ).alias("slot"),
+        ((pl.col("points") - pl.col("mean")) / pl.max_horizontal(fitted, pl.lit(1.0))).alias("residual"),
+    )
+    if "DST" in depth:
+        defense = games.with_columns(
+            pl.col("points_against").mean().over("season", "team").alias("mean"),
+            pl.col("points_against").std().over("season", "team").alias("std"),
+        ).select(
+            "season",
+            "week",
+            "team",
+            pl.lit("DST").alias("slot"),
+            (-(pl.col("points_against") - pl.col("mean")) / pl.col("std")).alias("residual"),
+        )
+        residuals = pl.concat([residuals, defense.cast(residuals.schema)])
+
+    wide = residuals.filter(pl.col("slot").is_in(list(slots))).pivot(
+        on="slot", index=["season", "week", "team"], values="residual", aggregate_function="first"
+    )
+    wide = wide.with_columns(pl.lit(None, pl.Float64).alias(slot) for slot in slots if slot not in wide.columns)
+    sides = (
+        games.select("season", "week", "team", "opponent")
+        .join(wide, on=["season", "week", "team"], how="inner")
+        .join(
+            wide.rename({slot: f"opponent_{slot}" for slot in slots}).rename({"team": "opponent"}),
+            on=["season", "week", "opponent"],
+            how="left",
+        )
+    )
+    values = sides.select(*slots, *(f"opponent_{slot}" for slot in slots)).cast(pl.Float64).to_numpy()
+    correlation = _nearest_correlation(_pairwise_correlation(values))
+    logging.info(f"Estimated outcome correlations for {len(slots)} slots from {sides.height} team-games")
+    return OutcomeModel(slots=tuple(slots), correlation=correlation, volatility=volatility, games=sides.height)
+
+
+def sample_field(
+    pool: pl.DataFrame,
+    ownership: pl.DataFrame,
+    size: int,
+    seed: int = 0,
+    ownership_column: str = "ownership",
+) -> pl.DataFrame:
+    """
+    Draw a contest field from a pool of plausible lineups.
+
+    Each pool lineup is drawn with probability proportional to the product of
+    its players' ownership, so chalky lineups show up more often.
+
+    Args:
+        pool (pl.DataFrame): Long lineups, ``lineup_id`` and ``playerId`` per
+            rostered player (e.g. ``LineupSet.lineups``).
+        ownership (pl.DataFrame): ``playerId`` and ``ownership_column``.
+        size (int): Entries in the field.
+        seed (int): Seed for the draw.
+        ownership_column (str): Projected ownership column, as a share or percent.
+
+    Returns:
+        pl.DataFrame: The drawn lineups in the same long layout, with an
+        ``entries`` column counting how many times each was drawn.
+    """
+    weights = (
+        pool.join(ownership.select("playerId", ownership_column), on="playerId", how="left")
+        .group_by("lineup_id")
+        .agg(pl.col(ownership_column).fill_null(0.0).clip(lower_bound=1e-6).log().sum().alias("log_weight"))
+        .sort("lineup_id")
+    )
+    log_weight = weights["log_weight"].to_numpy()
+    probability = np.exp(log_weight - log_weight.max())
+    counts = np.random.default_rng(seed).multinomial(size, probability / probability.sum())
+    drawn = (
+        weights.select("lineup_id").with_columns(pl.Series("entries", counts, pl.Int64)).filter(pl.col("entries") > 0)
+    )
+    return pool.join(drawn, on="lineup_id")
+
+
+# Set in each worker process by ``_init_worker``, so the arrays are sent once per process rather than per chunk.
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(state: Dict[str, Any]) -> None:
+    _worker.update(state)
+
+
+def _simulate_chunk(job: Tuple[int, np.random.SeedSequence]) -> Dict[str, np.ndarray]:
+    trials, seed = job
+    return _score_trials(trials, seed, **_worker)
+
+
+def _score_trials(
+    trials: int,
+    seed: np.random.SeedSequence,
+    cholesky: np.ndarray,
+    log_mean: np.ndarray,
+    log_std: np.ndarray,
+    candidates: np.ndarray,
+    field: np.ndarray,
+    entries: np.ndarray,
+    cumulative_payouts: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """Sums over ``trials`` simulated slates of each candidate's points, payout and finishes."""
+    rng = np.random.default_rng(seed)
+    normal = rng.standard_normal((trials, len(log_mean)), dtype=np.float32) @ cholesky.T
+    points = np.exp(log_mean + log_std * normal)
+    scores = points @ candidates
+    field_scores = points @ field
+
+    # Field entries beating, and tying, each candidate in each trial.
+    order = np.argsort(field_scores, axis=1)
+    ranked = np.take_along_axis(field_scores, order, axis=1).astype(np.float64)
+    below = np.zeros((trials, field.shape[1] + 1), dtype=np.int64)
+    np.cumsum(entries[order], axis=1, out=below[:, 1:])
+    offset = np.arange(trials)[:, None] * 1e6
+    flat = (ranked + offset).ravel()
+    row_start = np.arange(trials)[:, None] * field.shape[1]
+    tolerance = 1e-4
+    upper = np.searchsorted(flat, (scores + offset + tolerance).ravel(), "right").reshape(scores.shape) - row_start
+    lower = np.searchsorted(flat, (scores + offset - tolerance).ravel(), "left").reshape(scores.shape) - row_start
+    rows = np.arange(trials)[:, None]
+    beaten_by = below[:, -1:] - below[rows, upper]
+    ties = below[rows, upper] - below[rows, lower]
+
+    # Tied entries split the prizes of the places they share.
+    places = len(cumulative_payouts) - 1
+    payout = (
+        cumulative_payouts[np.minimum(beaten_by + ties + 1, places)] - cumulative_payouts[np.minimum(beaten_by, places)]
+    ) / (ties + 1)
+    return {
+        "points": scores.sum(axis=0, dtype=np.float64),
+        "points_squared": (scores.astype(np.float64) ** 2).sum(axis=0),
+        "payout": payout.sum(axis=0),
+        "payout_squared": (payout**2).sum(axis=0),
+        "wins": (beaten_by == 0).sum(axis=0),
+        "cashes": (payout > 0).sum(axis=0),
+    }
+
+
+class ContestSimulator:
+    """
+    Vectorized Monte Carlo simulator for a DraftKings slate.
+
+    Player outcomes are drawn for many trials at once as NumPy arrays: a
+    lognormal per player, matched to the projection and to the spread the
+    ``OutcomeModel`` gives the position, tied together by a Gaussian copula.
+    Players in the same game take the model's correlation between their
+    depth-chart slots, on their own team or across to the opponent; players
+    in different games are independent.
+
+    Each trial scores every candidate lineup and the whole field, ranks the
+    candidates against the field and pays them out, splitting prizes on ties.
+    Candidates are ranked against the field only, not against each other.
+
+    Trials are run in chunks of ``chunk_size`` with seeds spawned from one
+    ``SeedSequence``, so a given seed gives the same result whatever the
+    number of workers.
+
+    Example:
+        >>> model = estimate_outcome_model(scan_nflverse_player_stats(range(2019, 2024)),
+        ...                                team_games(scan_nflverse_pbp(range(2019, 2024))))
+        >>> simulator = ContestSimulator(draftables, "projection", model)
+        >>> field = sample_field(pool.lineups, ownership, size=10_000)
+        >>> result = simulator.simulate(lineups.lineups, field, Contest.from_tiers(20.0, tiers), trials=100_000, workers=4)
+        >>> result.summary.sort("roi", descending=True)
+    """
+
+    chunk_size = 1000
+
+    def __init__(self, players: pl.DataFrame, projection_column: str, model: OutcomeModel):
+        self.model = model
+        self.players = (
+            players.filter(pl.col(projection_column).is_not_null())
+            .with_columns(
+                pl.col(projection_column).cast(pl.Float64).alias("projection"),
+                pl.col("position").str.split("/").list.first().alias("position"),
+            )
+            .unique("playerId", keep="first", maintain_order=True)
+        )
+        if "competition_id" not in self.players.columns:
+            self.players = self.players.with_columns(pl.lit(None, pl.Int64).alias("competition_id"))
+        self.player_rows = {player_id: row for row, player_id in enumerate(self.players["playerId"].to_list())}
+        self._prepare()
+
+    def _prepare(self) -> None:
+        players = self.players
+        mean = np.maximum(players["projection"].to_numpy(), 0.1)
+        std = self.model.std(players["position"].to_numpy(), mean)
+        # Lognormal with the projection as its mean and the model's spread.
+        self.log_std = np.sqrt(np.log1p((std / mean) ** 2))
+        self.log_mean = np.log(mean) - self.log_std**2 / 2
+        self.correlation = self._correlation()
+        self.cholesky = np.linalg.cholesky(self.correlation)
+
+    def _slot_index(self) -> np.ndarray:
+        """Row of each player's slot in the model's correlation, -1 for players without one."""
+        slots = {slot: index for index, slot in enumerate(self.model.slots)}
+        depth = _slot_parts(self.model.slots)
+        ranked = self.players.select(
+            pl.col("position"),
+            pl.col("projection")
+            .rank("ordinal", descending=True)
+            .over("teamAbbreviation", "position")
+            .cast(pl.Int64)
+            .alias("rank"),
+        )
+        index = np.full(ranked.height, -1, dtype=np.int64)
+        for row, (position, rank) in enumerate(ranked.iter_rows()):
+            if position in depth:
+                # Players deeper than the model's slots share the deepest one.
+                slot = position if position == "DST" else f"{position}{min(rank, depth[position])}"
+                index[row] = slots.get(slot, -1)
+        return index
+
+    def _correlation(self) -> np.ndarray:
+        """Player correlation matrix, block diagonal by game."""
+        players = self.players
+        size = len(self.model.slots)
+        slot = self._slot_index()
+        game = players["competition_id"].fill_null(-1).to_numpy()
+        team = players["teamAbbreviation"].to_numpy()
+        correlation = np.eye(players.height)
+        # Players without a game are only tied to their own team.
+        groups = [np.flatnonzero(game == code) for code in np.unique(game[game >= 0])]
+        groups += [np.flatnonzero((game < 0) & (team == name)) for name in np.unique(team[game < 0])]
+        for rows in groups:
+            sides = (team[rows] != team[rows][0]).astype(np.int64)
+            correlation[np.ix_(rows, rows)] = self._block(slot[rows], sides, size)
+        return correlation
+
+    def _block(self, slot: np.ndarray, side: np.ndarray, size: int) -> np.ndarray:
+        index = slot + side * size
+        block = self.model.correlation[np.ix_(index, index)]
+        # Players without a slot, or sharing one, are not correlated with it.
+        unmatched = (slot[:, None] < 0) | (slot[None, :] < 0) | (index[:, None] == index[None, :])
+        block = np.where(unmatched, 0.0, block)
+        np.fill_diagonal(block, 1.0)
+        return _nearest_correlation(block)
+
+    def sample(self, trials: int, seed: int = 0) -> np.ndarray:
+        """
+        Draw correlated player outcomes.
+
+        Args:
+            trials (int): Number of simulated slates.
+            seed (int): Seed for the draw.
+
+        Returns:
+            np.ndarray: ``(trials, players)`` fantasy points, columns in the
+            order of ``self.players``.
+        """
+        rng = np.random.default_rng(seed)
+        normal = rng.standard_normal((trials, len(self.log_mean)), dtype=np.float32) @ self.cholesky.T.astype(
+            np.float32
+        )
+        return np.exp(self.log_mean + self.log_std * normal).astype(np.float32)
+
+    def _indicator(self, lineups: pl.DataFrame) -> Tuple[np.ndarray, pl.DataFrame]:
+        """``(players, lineups)`` count matrix of long lineups, and their ids in column order."""
+        ids = lineups.select("lineup_id").unique(maintain_order=True)
+        missing = set(lineups["playerId"].to_list()) - set(self.player_rows)
+        if missing:
+            raise ValueError(f"Lineups use players without a projection: {sorted(missing)[:10]}")
+        column = dict(zip(ids["lineup_id"].to_list(), range(ids.height)))
+        matrix = np.zeros((self.players.height, ids.height), dtype=np.float32)
+        rows = np.array([self.player_rows[player_id] for player_id in lineups["playerId"].to_list()], dtype=np.int64)
+        columns = np.array([column[lineup_id] for lineup_id in lineups["lineup_id"].to_list()], dtype=np.int64)
+        np.add.at(matrix, (rows, columns), 1.0)
+        return matrix, ids
+
+    def simulate(
+        self,
+        lineups: pl.DataFrame,
+        field: pl.DataFrame,
+        contest: Contest,
+        trials: int = 100_000,
+        seed: int = 0,
+        workers: int = 1,
+    ) -> SimulationResult:
+        """
+        Simulate a contest for each candidate lineup.
+
+        Args:
+            lineups (pl.DataFrame): Candidate lineups, long, with ``lineup_id``
+                and ``playerId`` (e.g. ``LineupSet.lineups``).
+            field (pl.DataFrame): Opposing entries in the same layout, with an
+                optional ``entries`` count per lineup (see ``sample_field``).
+            contest (Contest): Entry fee and payouts.
+            trials (int): Number of simulated slates.
+            seed (int): Seed for the whole run.
+            workers (int): Processes to spread the trials over.
+
+        Returns:
+            SimulationResult: Per-candidate points, payout and ROI.
+        """
+        candidates, candidate_ids = self._indicator(lineups)
+        if "entries" not in field.columns:
+            field = field.with_columns(pl.lit(1, pl.Int64).alias("entries"))
+        field_matrix, field_ids = self._indicator(field)
+        entries = field_ids.join(field.group_by("lineup_id").agg(pl.col("entries").first()), on="lineup_id", how="left")
+        state = {
+            "cholesky": self.cholesky.astype(np.float32),
+            "log_mean": self.log_mean.astype(np.float32),
+            "log_std": self.log_std.astype(np.float32),
+            "candidates": candidates,
+            "field": field_matrix,
+            "entries": entries["entries"].to_numpy().astype(np.int64),
+            "cumulative_payouts": np.concatenate([[0.0], np.cumsum(contest.payouts)]),
+        }
+        sizes = [min(self.chunk_size, trials - start) for start in range(0, trials, self.chunk_size)]
+        jobs = list(zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes))))
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(state,)) as pool:
+                results = list(pool.map(_simulate_chunk, jobs))
+        else:
+            results = [_score_trials(size, chunk_seed, **state) for size, chunk_seed in jobs]
+        totals = {name: np.sum([result[name] for result in results], axis=0) for name in results[0]}
+
+        mean_points = totals["points"] / trials
+        mean_payout = totals["payout"] / trials
+        payout_std = np.sqrt(np.maximum(totals["payout_squared"] / trials - mean_payout**2, 0.0))
+        summary = candidate_ids.with_columns(
+            pl.Series("mean_points", mean_points),
+            pl.Series("std_points", np.sqrt(np.maximum(totals["points_squared"] / trials - mean_points**2, 0.0))),
+            pl.Series("mean_payout", mean_payout),
+            pl.Series("roi", (mean_payout - contest.entry_fee) / contest.entry_fee),
+            pl.Series("roi_stderr", payout_std / np.sqrt(trials) / contest.entry_fee),
+            pl.Series("win_rate", totals["wins"] / trials),
+            pl.Series("cash_rate", totals["cashes"] / trials),
+        )
+        logging.info(
+            f"Simulated {trials} trials of {candidate_ids.height} lineups against {int(state['entries'].sum())} entries"
+        )
+        return SimulationResult(summary=summary, trials=trials, seed=seed)
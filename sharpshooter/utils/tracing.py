@@ -0,0 +1,292 @@
+import contextvars
+import cProfile
+import itertools
+import logging
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from pydantic import BaseModel, Field
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of the process so far, or None where it is not available."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Span(BaseModel):
+    """
+    One timed stage of a run.
+
+    ``attributes`` include those of the parent span, so a ``decode`` span
+    inside a job span carries the job's ``data_type`` and ``year``.
+    ``peak_rss_bytes`` is the process's peak RSS when the span ended, which
+    concurrent spans share.
+    """
+
+    trace_id: str
+    span_id: int
+    parent_id: Optional[int] = None
+    name: str
+    attributes: Dict[str, Any] = Field(default_factory=dict)
+    started_at: datetime
+    wall_seconds: float = Field(default=0.0)
+    rows: int = Field(default=0)
+    bytes_in: int = Field(default=0)
+    bytes_out: int = Field(default=0)
+    retries: int = Field(default=0)
+    peak_rss_bytes: Optional[int] = None
+    status: str = Field(default="ok")  # "ok" or "error"
+    error: Optional[str] = None
+
+
+class TracerConfig(BaseModel):
+    # Stage (span name) to profile with cProfile, one span at a time.
+    profile_stage: Optional[str] = None
+    # Also trace allocations of the profiled stage with tracemalloc.
+    profile_memory: bool = Field(default=False)
+    profile_dir: Path = Field(default=Path("profiles"))
+    profile_top: int = Field(default=25)
+    # Finished spans kept for export; older ones are dropped so long-running
+    # commands (``poll draftables``) do not grow without bound. None keeps all.
+    max_spans: Optional[int] = Field(default=10_000)
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("sharpshooter_span", default=None)
+
+# Name suffix, type, help and per-span value of every summed Prometheus metric.
+_PROMETHEUS_METRICS = (
+    ("runs_total", "counter", "Finished spans.", lambda span: 1),
+    ("seconds_total", "counter", "Wall time spent in the stage.", lambda span: span.wall_seconds),
+    ("rows_total", "counter", "Rows produced by the stage.", lambda span: span.rows),
+    ("bytes_in_total", "counter", "Bytes read by the stage.", lambda span: span.bytes_in),
+    ("bytes_out_total", "counter", "Bytes produced by the stage.", lambda span: span.bytes_out),
+    ("retries_total", "counter", "Retried requests in the stage.", lambda span: span.retries),
+)
+
+
+def _label_value(value: Any) -> str:
+    text = "" if value is None else str(value)
+    return text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Tracer:
+    """
+    Collects nested, per-stage spans of a run and exports them.
+
+    Spans nest through a context variable, so a span opened inside another
+    one, in the same thread or in an asyncio task started from it, becomes
+    its child. Worker threads start without a parent. Finished spans can be
+    written as JSON lines and as a Prometheus text exposition snapshot; only
+    the last ``max_spans`` of them are kept.
+
+    With ``profile_stage`` set, the first span of that name running at a time
+    is profiled with cProfile (its calling thread only), and with
+    ``profile_memory`` also with tracemalloc. The profile is written to
+    ``profile_dir`` and its path recorded in the span's attributes.
+
+    Example:
+        >>> tracer = get_tracer()
+        >>> with tracer.span("ingest_job", data_type="pbp", year=2024):
+        ...     with tracer.span("decode") as decode:
+        ...         df = pl.read_parquet(path)
+        ...         decode.rows = df.height
+        >>> tracer.write_jsonl("metrics/spans.jsonl")
+        >>> tracer.write_prometheus("metrics/sharpshooter.prom")
+    """
+
+    def __init__(self, config: Optional[TracerConfig] = None):
+        self.config = config or TracerConfig()
+        self.trace_id = uuid.uuid4().hex
+        self.spans: Deque[Span] = deque(maxlen=self.config.max_spans)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._profile_lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """
+        Time a stage. Set ``rows``, ``bytes_in`` and ``bytes_out`` on the yielded span.
+
+        An exception marks the span as failed and is re-raised.
+        """
+        parent = _current_span.get()
+        span = Span(
+            trace_id=self.trace_id,
+            span_id=next(self._ids),
+            parent_id=parent.span_id if parent is not None else None,
+            name=name,
+            attributes={**(parent.attributes if parent is not None else {}), **attributes},
+            started_at=datetime.now(timezone.utc),
+        )
+        token = _current_span.set(span)
+        profiler = self._start_profile(span)
+        started = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.status, span.error = "error", f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.wall_seconds = time.perf_counter() - started
+            if profiler is not None:
+                self._stop_profile(span, profiler)
+            span.peak_rss_bytes = peak_rss_bytes()
+            _current_span.reset(token)
+            with self._lock:
+                self.spans.append(span)
+
+    def _start_profile(self, span: Span) -> Optional[cProfile.Profile]:
+        if span.name != self.config.profile_stage or not self._profile_lock.acquire(blocking=False):
+            return None
+        if self.config.profile_memory:
+            tracemalloc.start()
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    def _stop_profile(self, span: Span, profiler: cProfile.Profile) -> None:
+        try:
+            profiler.disable()
+            self.config.profile_dir.mkdir(parents=True, exist_ok=True)
+            stem = self.config.profile_dir / f"{span.name}-{self.trace_id[:8]}-{span.span_id}"
+            profiler.dump_stats(f"{stem}.prof")
+            span.attributes["profile"] = f"{stem}.prof"
+            if self.config.profile_memory:
+                snapshot = tracemalloc.take_snapshot()
+                span.attributes["traced_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                top = snapshot.statistics("lineno")[: self.config.profile_top]
+                Path(f"{stem}.tracemalloc.txt").write_text("\n".join(str(stat) for stat in top) + "\n")
+                span.attributes["tracemalloc"] = f"{stem}.tracemalloc.txt"
+            logging.info(f"Profiled {span.name} (span {span.span_id}) to {stem}.prof")
+        finally:
+            self._profile_lock.release()
+
+    def finished(self) -> List[Span]:
+        with self._lock:
+            return list(self.spans)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+
+    def write_jsonl(self, path: Union[str, Path]) -> int:
+        """
+        Append every finished span to a JSON lines file.
+
+        Returns:
+            int: Number of spans written.
+        """
+        spans = self.finished()
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a") as file:
+            for span in spans:
+                file.write(span.model_dump_json() + "\n")
+        return len(spans)
+
+    def prometheus_text(self, labels: Sequence[str] = ("data_type", "year")) -> str:
+        """
+        Prometheus text exposition of the finished spans, summed per stage.
+
+        Every metric is labelled with ``stage``, the given span attributes and
+        ``status``. ``sharpshooter_stage_peak_rss_bytes`` is the highest peak
+        RSS seen at the end of a span of the stage.
+
+        Args:
+            labels (Sequence[str]): Span attributes exported as labels.
+
+        Returns:
+            str: The exposition, ending with a newline.
+        """
+        label_names = ("stage", *labels, "status")
+        groups: Dict[Tuple[str, ...], List[Span]] = {}
+        for span in self.finished():
+            key = (span.name, *(_label_value(span.attributes.get(label)) for label in labels), span.status)
+            groups.setdefault(key, []).append(span)
+
+        def label_text(key: Tuple[str, ...]) -> str:
+            return ",".join(f'{name}="{_label_value(value)}"' for name, value in zip(label_names, key))
+
+        lines = []
+        for suffix, metric_type, help_text, value in _PROMETHEUS_METRICS:
+            metric = f"sharpshooter_stage_{suffix}"
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {metric_type}"]
+            lines += [
+                f"{metric}{{{label_text(key)}}} {sum(value(span) for span in spans)}" for key, spans in groups.items()
+            ]
+        metric = "sharpshooter_stage_peak_rss_bytes"
+        lines += [f"# HELP {metric} Process peak RSS at the end of the stage.", f"# TYPE {metric} gauge"]
+        for key, spans in groups.items():
+            peaks = [span.peak_rss_bytes for span in spans if span.peak_rss_bytes is not None]
+            if peaks:
+                lines.append(f"{metric}{{{label_text(key)}}} {max(peaks)}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Union[str, Path], labels: Sequence[str] = ("data_type", "year")) -> None:
+        """Write ``prometheus_text`` atomically, e.g. for node_exporter's textfile collector."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(self.prometheus_text(labels))
+        tmp_path.replace(path)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Wall time, rows and retries summed per stage, slowest first."""
+        totals: Dict[str, Dict[str, Any]] = {}
+        for span in self.finished():
+            total = totals.setdefault(
+                span.name, {"stage": span.name, "runs": 0, "seconds": 0.0, "rows": 0, "retries": 0}
+            )
+            total["runs"] += 1
+            total["seconds"] += span.wall_seconds
+            total["rows"] += span.rows
+            total["retries"] += span.retries
+        return sorted(totals.values(), key=lambda total: total["seconds"], reverse=True)
+
+
+_tracer: Optional[Tracer] = None
+
+
+def get_tracer(config: Optional[TracerConfig] = None) -> Tracer:
+    """
+    Return the process-wide tracer, creating it on first use.
+
+    Args:
+        config (Optional[TracerConfig]): Replaces the current tracer with one
+            using this configuration.
+
+    Returns:
+        Tracer: The shared tracer.
+    """
+    global _tracer
+    if _tracer is None or config is not None:
+        _tracer = Tracer(config)
+    return _tracer
+
+
+def span(name: str, **attributes: Any) -> Any:
+    """Open a span on the process-wide tracer (see ``Tracer.span``)."""
+    return get_tracer().span(name, **attributes)
+
+
+def current_span() -> Optional[Span]:
+    """The innermost open span of the running thread or task, if any."""
+    return _current_span.get()
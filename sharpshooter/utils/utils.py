@@ -1,18 +1,281 @@
+import asyncio
+import contextlib
 import httpx
+import importlib.util
+import json
 import logging
-import pandas as pd
-from typing import Dict, Any
+import ssl
+import threading
+import weakref
+from pydantic import BaseModel, Field
+from typing import Dict, Any, AsyncIterator, Iterable, List, Optional, Sequence, Tuple, Union
 
+from .cache import get_http_cache
+from .ratelimit import CircuitOpenError, RateLimitConfig, RateLimiter, backoff_delay, parse_retry_after
+from .tracing import current_span, span
 
-async def fetch_external_data(url: str) -> Dict[str, Any]:
+
+class HTTPClientConfig(BaseModel):
+    max_connections: int = Field(default=100)
+    max_keepalive_connections: int = Field(default=20)
+    keepalive_expiry: float = Field(default=30.0)
+    max_connections_per_host: int = Field(default=10)
+    http2: bool = Field(default=False)
+    timeout: float = Field(default=30.0)
+    retries: int = Field(default=3)
+    backoff_factor: float = Field(default=0.5)
+    backoff_max: float = Field(default=30.0)
+    retry_statuses: Tuple[int, ...] = Field(default=(429, 500, 502, 503, 504))
+    # Adaptive per-host rate limit, with optional per-host overrides (e.g. "drop-api.ea.com")
+    rate_limit: RateLimitConfig = Field(default_factory=RateLimitConfig)
+    host_rate_limits: Dict[str, RateLimitConfig] = Field(default_factory=dict)
+
+
+class _LoopPool:
+    """The pooled client of one event loop, the task that closes it, and its per-host caps."""
+
+    def __init__(self, client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop):
+        self.client = client
+        self.loop = loop
+        self.closer = loop.create_task(self._close_with_loop())
+        self.host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    async def _close_with_loop(self) -> None:
+        """Wait until cancelled, as ``asyncio.run`` does to pending tasks at shutdown, then close the client."""
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self.client.aclose()
+
+    def close_threadsafe(self) -> None:
+        """Close the client from any thread, if its loop is still open."""
+        with contextlib.suppress(RuntimeError):
+            self.loop.call_soon_threadsafe(self.closer.cancel)
+
+    def host_semaphore(self, host: str, limit: int) -> asyncio.Semaphore:
+        if host not in self.host_semaphores:
+            self.host_semaphores[host] = asyncio.Semaphore(limit)
+        return self.host_semaphores[host]
+
+
+def _close_pools(pools: Dict[asyncio.AbstractEventLoop, _LoopPool]) -> None:
+    for pool in list(pools.values()):
+        pool.close_threadsafe()
+
+
+class HTTPClientManager:
+    """
+    Long-lived, pooled ``httpx.AsyncClient`` shared by every external fetch.
+
+    Connections are kept alive between calls, so repeated requests to the same
+    host skip the TCP/TLS handshake. Requests are capped per host and paced by
+    an adaptive per-host rate limiter with a circuit breaker (see
+    ``HostRateLimiter``). Transient failures (transport errors and
+    ``retry_statuses``) are retried after ``Retry-After`` or a jittered
+    exponential backoff.
+
+    Each event loop gets its own client (and per-host caps), so threads that
+    each run a loop can share the manager; the rate limiter is shared by all
+    of them. When a loop shuts down (e.g. at the end of ``asyncio.run``) its
+    client is closed with it, so no pooled sockets outlive their loop.
+    """
+
+    def __init__(self, config: Optional[HTTPClientConfig] = None):
+        self.config = config or HTTPClientConfig()
+        self.rate_limiter = RateLimiter(self.config.rate_limit, self.config.host_rate_limits)
+        self._pools: Dict[asyncio.AbstractEventLoop, _LoopPool] = {}
+        self._pools_lock = threading.Lock()
+        self._ssl_context: Optional[ssl.SSLContext] = None
+        # A loop that outlives the manager (e.g. a background loop) would otherwise keep its client open.
+        weakref.finalize(self, _close_pools, self._pools)
+
+    def _pool(self) -> "_LoopPool":
+        loop = asyncio.get_running_loop()
+        with self._pools_lock:
+            pool = self._pools.get(loop)
+            if pool is None or pool.client.is_closed:
+                # Forget the pools of loops that have shut down, and with them their closed clients.
+                for closed_loop in [other for other in self._pools if other.is_closed()]:
+                    del self._pools[closed_loop]
+                pool = self._pools[loop] = _LoopPool(self._create_client(), loop)
+        return pool
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The shared client of the running event loop, created on first use."""
+        return self._pool().client
+
+    def _create_client(self) -> httpx.AsyncClient:
+        http2 = self.config.http2
+        if http2 and importlib.util.find_spec("h2") is None:
+            logging.warning("HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1.")
+            http2 = False
+        limits = httpx.Limits(
+            max_connections=self.config.max_connections,
+            max_keepalive_connections=self.config.max_keepalive_connections,
+            keepalive_expiry=self.config.keepalive_expiry,
+        )
+        if self._ssl_context is None:
+            # Loading the CA bundle takes tens of milliseconds, so every loop's client shares one context.
+            self._ssl_context = httpx.create_ssl_context()
+        return httpx.AsyncClient(
+            limits=limits, http2=http2, timeout=self.config.timeout, follow_redirects=True, verify=self._ssl_context
+        )
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        retry_after = parse_retry_after(response.headers.get("Retry-After")) if response is not None else None
+        if retry_after is not None:
+            return retry_after
+        return backoff_delay(attempt, self.config.backoff_factor, self.config.backoff_max)
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """
+        Send a request through the shared pool, retrying transient failures.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The request URL.
+            **kwargs: Passed through to ``httpx.AsyncClient.request``.
+
+        Returns:
+            httpx.Response: The successful response.
+
+        Raises:
+            httpx.RequestError: If a network error persists after all retries.
+            httpx.HTTPStatusError: If the final response is an error status code.
+            CircuitOpenError: If the host's circuit breaker is open.
+        """
+        pool = self._pool()
+        client = pool.client
+        host = httpx.URL(url).host
+        semaphore = pool.host_semaphore(host, self.config.max_connections_per_host)
+        limiter = self.rate_limiter.host(host)
+        for attempt in range(self.config.retries + 1):
+            is_last_attempt = attempt == self.config.retries
+            try:
+                async with semaphore:
+                    await limiter.acquire(httpx.Request(method, url))
+                    try:
+                        response = await client.request(method, url, **kwargs)
+                    except httpx.TransportError:
+                        limiter.record(None)
+                        raise
+                    except BaseException:
+                        # Cancelled, or an error that says nothing about the host (e.g. TooManyRedirects).
+                        limiter.release()
+                        raise
+            except CircuitOpenError:
+                raise
+            except httpx.TransportError:
+                if is_last_attempt:
+                    raise
+                response = None
+            else:
+                limiter.record(response)
+                if is_last_attempt or response.status_code not in self.config.retry_statuses:
+                    if response.status_code != httpx.codes.NOT_MODIFIED:
+                        response.raise_for_status()
+                    return response
+            delay = self._retry_delay(attempt, response)
+            logging.warning(f"Retrying {method} {url} in {delay:.1f}s (attempt {attempt + 1})")
+            active_span = current_span()
+            if active_span is not None:
+                active_span.retries += 1
+            await asyncio.sleep(delay)
+
+    async def get_json(self, url: str, **kwargs: Any) -> Any:
+        response = await self.request("GET", url, **kwargs)
+        return response.json()
+
+    async def fetch_many(
+        self, urls: Iterable[str], return_exceptions: bool = False
+    ) -> AsyncIterator[Tuple[str, Union[Any, Exception]]]:
+        """
+        Fetch many JSON URLs concurrently, yielding each result as it completes.
+
+        Args:
+            urls (Iterable[str]): The URLs to fetch.
+            return_exceptions (bool): Yield ``(url, exception)`` for failed
+                URLs instead of raising. Defaults to False.
+
+        Yields:
+            Tuple[str, Union[Any, Exception]]: The URL and its decoded JSON body.
+        """
+
+        async def fetch_one(url: str) -> Tuple[str, Union[Any, Exception]]:
+            try:
+                return url, await self.get_json(url)
+            except Exception as exc:
+                if not return_exceptions:
+                    raise
+                return url, exc
+
+        tasks = [asyncio.ensure_future(fetch_one(url)) for url in urls]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def aclose(self) -> None:
+        """Close the running event loop's client; clients of other loops close with their loops."""
+        with self._pools_lock:
+            pool = self._pools.pop(asyncio.get_running_loop(), None)
+        if pool is not None:
+            pool.closer.cancel()
+            await pool.client.aclose()
+
+    async def __aenter__(self) -> "HTTPClientManager":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+
+_client_manager: Optional[HTTPClientManager] = None
+
+
+def get_client_manager(config: Optional[HTTPClientConfig] = None) -> HTTPClientManager:
+    """
+    Return the process-wide client manager, creating it on first use.
+
+    Args:
+        config (Optional[HTTPClientConfig]): Replaces the current manager with
+            one using this configuration.
+
+    Returns:
+        HTTPClientManager: The shared client manager.
+    """
+    global _client_manager
+    if _client_manager is None or config is not None:
+        _client_manager = HTTPClientManager(config)
+    return _client_manager
+
+
+async def fetch_many(
+    urls: Iterable[str], return_exceptions: bool = False
+) -> AsyncIterator[Tuple[str, Union[Any, Exception]]]:
+    """
+    Fetch many JSON URLs over the shared pool, yielding results as they complete.
+
+    See ``HTTPClientManager.fetch_many``.
+    """
+    async for result in get_client_manager().fetch_many(urls, return_exceptions=return_exceptions):
+        yield result
+
+
+async def fetch_external_bytes(url: str, use_cache: bool = True) -> bytes:
     """
-    Fetch data from an external API using httpx.
+    Fetch the raw body of an external API response over the shared, pooled client.
 
     Args:
         url (str): The URL of the external API to fetch data from.
+        use_cache (bool): Revalidate against the on-disk download cache so an
+            unchanged payload is not transferred again. Defaults to True.
 
     Returns:
-        Dict[str, Any]: The JSON response from the API.
+        bytes: The response body.
 
     Raises:
         httpx.RequestError: If there's a network-related error.
@@ -20,10 +283,13 @@ async def fetch_external_data(url: str) -> Dict[str, Any]:
     """
     logging.info(f"Fetching data from: {url}")
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url)
-            response.raise_for_status()  # Raise an exception for HTTP error status codes
-            return response.json()
+        with span("fetch_external", url=url) as fetch:
+            manager = get_client_manager()
+            if not use_cache:
+                response = await manager.request("GET", url)
+                fetch.bytes_in = len(response.content)
+                return response.content
+            return await get_http_cache().aget(url, manager)
     except httpx.RequestError as exc:
         logging.error(f"An error occurred while requesting {exc.request.url!r}.")
         raise
@@ -37,30 +303,118 @@ async def fetch_external_data(url: str) -> Dict[str, Any]:
         raise
 
 
-def dict_to_dataframe(data: Dict[str, Any]) -> pd.DataFrame:
+async def fetch_external_data(url: str, use_cache: bool = True) -> Dict[str, Any]:
     """
-    Convert a dictionary to a pandas DataFrame.
+    Fetch data from an external API over the shared, pooled client.
 
     Args:
-        data (Dict[str, Any]): The input dictionary to be converted.
+        url (str): The URL of the external API to fetch data from.
+        use_cache (bool): Revalidate against the on-disk download cache so an
+            unchanged payload is not transferred again. Defaults to True.
 
     Returns:
-        pd.DataFrame: A DataFrame created from the input dictionary.
+        Dict[str, Any]: The JSON response from the API.
+
+    Raises:
+        httpx.RequestError: If there's a network-related error.
+        httpx.HTTPStatusError: If the HTTP response is an error status code.
+    """
+    return json.loads(await fetch_external_bytes(url, use_cache))
+
+
+def _first_key(data: Dict[str, Any], keys: Sequence[str]) -> Optional[str]:
+    return next((key for key in keys if key in data), None)
+
+
+async def fetch_paginated(
+    url: str,
+    page_size: int = 100,
+    max_concurrency: int = 8,
+    items_keys: Sequence[str] = ("items", "docs"),
+    total_keys: Sequence[str] = ("totalItems", "count"),
+    id_keys: Sequence[str] = ("id", "primaryKey"),
+    manager: Optional[HTTPClientManager] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Fetch every item of a ``limit``/``offset`` paginated endpoint concurrently.
+
+    The first page is fetched on its own to learn the total item count and the
+    page size the server actually honours. The remaining offsets are then
+    requested concurrently over the shared client pool, at most
+    ``max_concurrency`` at a time.
+
+    Args:
+        url (str): The endpoint URL, optionally with its own query string.
+        page_size (int): Number of items requested per page.
+        max_concurrency (int): Maximum number of pages in flight at once.
+        items_keys (Sequence[str]): Candidate keys holding the page's items.
+        total_keys (Sequence[str]): Candidate keys holding the total item count.
+        id_keys (Sequence[str]): Candidate keys used to drop duplicate items.
+        manager (Optional[HTTPClientManager]): Client manager to fetch with.
+            Defaults to the shared manager from ``get_client_manager``.
+
+    Returns:
+        List[Dict[str, Any]]: The raw items, in page order, without duplicates.
+
+    Raises:
+        httpx.HTTPStatusError: If any page returns an error status code.
+        ValueError: If the first page has no recognizable items or total key.
 
     Notes:
-        - If the dictionary contains nested structures, they will be flattened.
-        - Lists in the dictionary will be expanded into separate columns.
+        - Pages after the first empty page are discarded and any offsets not
+          yet requested are skipped.
     """
-    # Convert the dictionary to a DataFrame
-    df = pd.DataFrame([data])
-    
-    # Expand lists into separate columns
-    for column in df.columns:
-        if isinstance(df[column].iloc[0], list):
-            expanded = pd.DataFrame(df[column].tolist()).add_prefix(f"{column}_")
-            df = pd.concat([df.drop(column, axis=1), expanded], axis=1)
-    
-    # Flatten nested dictionaries
-    df = pd.json_normalize(df.to_dict(orient='records'))
-    
-    return df
+    manager = manager or get_client_manager()
+
+    async def get_page(offset: int, limit: int) -> Dict[str, Any]:
+        # Merged into the URL's own query: ``params=`` would replace it (e.g. ``iteration``/``locale``).
+        page_url = httpx.URL(url).copy_merge_params({"limit": limit, "offset": offset})
+        return await manager.get_json(str(page_url))
+
+    first_page = await get_page(0, page_size)
+    items_key = _first_key(first_page, items_keys)
+    total_key = _first_key(first_page, total_keys)
+    if items_key is None or total_key is None:
+        raise ValueError(f"Unrecognized page layout from {url}: keys {sorted(first_page)}")
+
+    first_items = first_page[items_key]
+    total_count = first_page[total_key]
+    step = len(first_items)
+    logging.info(f"Fetching {total_count} items from {url} in pages of {step or page_size}")
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    stop_offset = total_count
+
+    async def fetch_page(offset: int) -> Tuple[int, List[Dict[str, Any]]]:
+        nonlocal stop_offset
+        async with semaphore:
+            if offset >= stop_offset:
+                return offset, []
+            page_items = (await get_page(offset, step)).get(items_key) or []
+            if not page_items:
+                stop_offset = min(stop_offset, offset)
+            return offset, page_items
+
+    pages = [(0, first_items)]
+    if step:
+        pages += await asyncio.gather(
+            *(fetch_page(offset) for offset in range(step, total_count, step))
+        )
+
+    all_items: List[Dict[str, Any]] = []
+    seen_ids = set()
+    for offset, page_items in pages:
+        if not page_items:
+            break
+        for item in page_items:
+            id_key = _first_key(item, id_keys)
+            if id_key is not None:
+                if item[id_key] in seen_ids:
+                    continue
+                seen_ids.add(item[id_key])
+            all_items.append(item)
+
+    if len(all_items) != total_count:
+        logging.warning(f"Fetched {len(all_items)} unique items from {url}, expected {total_count}")
+    return all_items
+
@@ -0,0 +1,372 @@
+"""
+Offline benchmark harness for the refresh pipeline.
+
+Every external source is replayed by a local HTTP server (``replay_server``)
+from the deterministic payloads in ``payloads.py``, so a run measures only
+our own code and the loopback network. Each ``bench`` call times a stage for
+``--benchmark-rounds`` rounds after one warm-up call and records the best and
+median round.
+
+Results are appended to a JSON history (``--benchmark-history``). A stage
+fails when its median round is more than ``--benchmark-threshold`` (and
+``--benchmark-min-delta-ms``) slower than the median of its median rounds over
+the last ``--benchmark-window`` passing runs on the same machine and Python
+version. Medians over many rounds ride out the scheduler hiccups a single best
+round is exposed to. Stages with fewer than ``--benchmark-min-runs`` such runs
+are only recorded. Runs on other machines are kept but never compared against.
+
+Run with::
+
+    python -m pytest tests/benchmarks
+
+PostgreSQL stages use the ``DB_*`` environment variables (see
+``DBConfig.from_env``) and are skipped when the database is unreachable.
+"""
+
+import asyncio
+import hashlib
+import inspect
+import json
+import platform
+import statistics
+import subprocess
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+from urllib.parse import parse_qs, urlsplit
+
+import polars as pl
+import pytest
+
+import payloads
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# Response body, or a callable building it from the parsed query string (None for a 404).
+Route = Union[bytes, Callable[[Dict[str, List[str]]], Optional[bytes]]]
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("benchmarks")
+    group.addoption(
+        "--benchmark-history",
+        default=str(ROOT / ".benchmarks" / "history.json"),
+        help="JSON file the results are appended to (default: .benchmarks/history.json).",
+    )
+    group.addoption(
+        "--benchmark-threshold",
+        type=float,
+        default=0.5,
+        help="Fail a stage more than this fraction slower than its baseline (default: 0.5).",
+    )
+    group.addoption(
+        "--benchmark-min-delta-ms",
+        type=float,
+        default=1.0,
+        help="Ignore slowdowns smaller than this many milliseconds, whatever the fraction (default: 1.0).",
+    )
+    group.addoption("--benchmark-rounds", type=int, default=15, help="Timed rounds per stage (default: 15).")
+    group.addoption(
+        "--benchmark-window", type=int, default=5, help="Previous runs the baseline is taken from (default: 5)."
+    )
+    group.addoption(
+        "--benchmark-min-runs",
+        type=int,
+        default=3,
+        help="Previous runs a stage needs before it is compared at all (default: 3).",
+    )
+    group.addoption("--benchmark-no-save", action="store_true", help="Compare against the history without saving.")
+
+
+class BenchmarkHistory:
+    """
+    Timings of past runs and of the current one.
+
+    ``runs`` is the stored history, oldest first. A run is
+    ``{"started_at", "commit", "machine", "python", "polars", "results"}``,
+    where ``results`` maps a stage to
+    ``{"best_ms", "median_ms", "rounds", "baseline_ms", "regressed"}``.
+    """
+
+    def __init__(self, path: Path, threshold: float, min_delta_ms: float, window: int, min_runs: int):
+        self.path = path
+        self.threshold = threshold
+        self.min_delta_ms = min_delta_ms
+        self.window = window
+        self.min_runs = min_runs
+        self.runs: List[Dict[str, Any]] = json.loads(path.read_text())["runs"] if path.exists() else []
+        self.machine = platform.node()
+        self.python = platform.python_version()
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    def baseline(self, name: str) -> Optional[float]:
+        """Median of the median rounds of ``name`` over the last ``window`` comparable passing runs, if enough."""
+        previous = [
+            run["results"][name]["median_ms"]
+            for run in self.runs
+            if run["machine"] == self.machine
+            and run["python"] == self.python
+            and name in run["results"]
+            and not run["results"][name]["regressed"]
+        ]
+        return statistics.median(previous[-self.window :]) if len(previous) >= self.min_runs else None
+
+    def is_regressed(self, name: str, median_ms: float) -> bool:
+        baseline_ms = self.baseline(name)
+        return (
+            baseline_ms is not None
+            and median_ms > baseline_ms * (1 + self.threshold)
+            and median_ms - baseline_ms > self.min_delta_ms
+        )
+
+    def record(self, name: str, timings: List[float]) -> Dict[str, Any]:
+        best_ms, median_ms = min(timings) * 1000, statistics.median(timings) * 1000
+        baseline_ms = self.baseline(name)
+        regressed = self.is_regressed(name, median_ms)
+        self.results[name] = {
+            "best_ms": round(best_ms, 3),
+            "median_ms": round(median_ms, 3),
+            "rounds": len(timings),
+            "baseline_ms": round(baseline_ms, 3) if baseline_ms is not None else None,
+            "regressed": regressed,
+        }
+        return self.results[name]
+
+    def save(self) -> None:
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        self.runs.append(
+            {
+                "started_at": self.started_at,
+                "commit": commit,
+                "machine": self.machine,
+                "python": self.python,
+                "polars": pl.__version__,
+                "results": self.results,
+            }
+        )
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({"runs": self.runs}, indent=1))
+        tmp_path.replace(self.path)
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.benchmark_history = BenchmarkHistory(
+        Path(config.getoption("--benchmark-history")),
+        threshold=config.getoption("--benchmark-threshold"),
+        min_delta_ms=config.getoption("--benchmark-min-delta-ms"),
+        window=config.getoption("--benchmark-window"),
+        min_runs=config.getoption("--benchmark-min-runs"),
+    )
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    history = session.config.benchmark_history
+    if history.results and not session.config.getoption("--benchmark-no-save"):
+        history.save()
+
+
+def pytest_terminal_summary(terminalreporter: Any, config: pytest.Config) -> None:
+    history = config.benchmark_history
+    if not history.results:
+        return
+    terminalreporter.section("benchmarks")
+    width = max(len(name) for name in history.results)
+    terminalreporter.write_line(f"{'stage':<{width}}  {'best ms':>10}  {'median ms':>10}  {'baseline':>10}  change")
+    for name, result in history.results.items():
+        baseline_ms = result["baseline_ms"]
+        change = f"{result['median_ms'] / baseline_ms - 1:+.1%}" if baseline_ms else "new"
+        terminalreporter.write_line(
+            f"{name:<{width}}  {result['best_ms']:>10.2f}  {result['median_ms']:>10.2f}  "
+            f"{baseline_ms if baseline_ms is not None else '-':>10}  {change}{'  REGRESSED' if result['regressed'] else ''}"
+        )
+
+
+@pytest.fixture
+def bench(request: pytest.FixtureRequest) -> Callable[..., Any]:
+    """
+    Time a pipeline stage and check it against its baseline.
+
+    ``bench(func, *args, setup=None, name=None, **kwargs)`` calls ``func``
+    once to warm up, then times ``--benchmark-rounds`` calls. Coroutine
+    functions are run with ``asyncio.run``. ``setup`` runs untimed before
+    every call. A stage that looks regressed is timed for another set of
+    rounds before it fails. The stage is recorded under the test name, or
+    ``"<test>[<name>]"`` when a test times several stages. Returns the warm-up
+    call's result, so the test can check the stage's output.
+    """
+    history: BenchmarkHistory = request.config.benchmark_history
+    rounds = request.config.getoption("--benchmark-rounds")
+
+    def run(
+        func: Callable[..., Any],
+        *args: Any,
+        setup: Optional[Callable[[], Any]] = None,
+        name: Optional[str] = None,
+        **kwargs: Any,
+    ) -> Any:
+        def call() -> Any:
+            if inspect.iscoroutinefunction(func):
+                return asyncio.run(func(*args, **kwargs))
+            return func(*args, **kwargs)
+
+        def time_rounds() -> List[float]:
+            timings = []
+            for _ in range(rounds):
+                if setup is not None:
+                    setup()
+                started = time.perf_counter()
+                call()
+                timings.append(time.perf_counter() - started)
+            return timings
+
+        if setup is not None:
+            setup()
+        result = call()
+        stage = request.node.name if name is None else f"{request.node.name}[{name}]"
+        key = f"{request.node.module.__name__}::{stage}"
+        timings = time_rounds()
+        if history.is_regressed(key, statistics.median(timings) * 1000):
+            # Confirm before failing, so one scheduler hiccup does not fail the run.
+            timings += time_rounds()
+        recorded = history.record(key, timings)
+        if recorded["regressed"]:
+            pytest.fail(
+                f"{stage} regressed: median {recorded['median_ms']:.2f} ms vs baseline {recorded['baseline_ms']:.2f} ms "
+                f"(threshold {history.threshold:.0%})"
+            )
+        return result
+
+    return run
+
+
+class _ReplayHTTPServer(ThreadingHTTPServer):
+    # The socketserver default backlog of 5 overflows when a client opens its
+    # whole pool at once, and the dropped SYNs add whole seconds of retransmits.
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class ReplayServer:
+    """
+    Local HTTP server replaying canned responses by path.
+
+    Bodies get a content ETag and ``If-None-Match`` is answered with ``304``,
+    like the real CDNs, so ``HTTPCache`` revalidation paths are exercised.
+    Connections are kept alive (HTTP/1.1).
+    """
+
+    def __init__(self) -> None:
+        self.routes: Dict[str, Route] = {}
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:
+                server.requests += 1
+                parts = urlsplit(self.path)
+                route = server.routes.get(parts.path)
+                body = route(parse_qs(parts.query)) if callable(route) else route
+                if body is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                content_type = "application/json" if body[:1] in (b"{", b"[") else "application/octet-stream"
+                self.send_header("Content-Type", content_type)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self._httpd = _ReplayHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def add(self, path: str, route: Route) -> str:
+        """Serve ``route`` at ``path`` and return its URL."""
+        self.routes[path] = route
+        return self.url + path
+
+    def __enter__(self) -> "ReplayServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+# Draft groups and seasons the replay server publishes.
+DRAFT_GROUP_IDS = (101, 102, 103, 104)
+SEASONS = (2022, 2023)
+RATINGS_PAGE_LIMIT = 100
+
+
+@pytest.fixture(scope="session")
+def players() -> pl.DataFrame:
+    return payloads.rankings_players()
+
+
+@pytest.fixture(scope="session")
+def madden_items(players: pl.DataFrame) -> List[Dict[str, Any]]:
+    return payloads.madden_ratings_items(players)
+
+
+@pytest.fixture(scope="session")
+def replay_server(players: pl.DataFrame, madden_items: List[Dict[str, Any]]) -> ReplayServer:
+    """
+    The stand-in for EA, DraftKings and the nflverse releases.
+
+    - ``/rating/madden-nfl``: drop-api ratings pages, at most 100 items each,
+      for any ``iteration`` in the ``en`` locale. Each iteration gets its own
+      ratings, ``week-1`` being ``madden_items``; other queries are a 404.
+    - ``/draftgroups/v1/draftgroups/{id}/draftables`` for ``DRAFT_GROUP_IDS``.
+    - ``/nflverse/pbp/play_by_play_{season}.parquet`` for ``SEASONS`` and
+      ``/nflverse/players/players.parquet``.
+    """
+
+    iterations = {"week-1": madden_items}
+
+    def ratings(query: Dict[str, List[str]]) -> Optional[bytes]:
+        if query.get("locale") != ["en"] or len(query.get("iteration", [])) != 1:
+            return None
+        iteration = query["iteration"][0]
+        if iteration not in iterations:
+            iterations[iteration] = payloads.madden_ratings_items(players, iteration=iteration)
+        limit = min(int(query.get("limit", ["20"])[0]), RATINGS_PAGE_LIMIT)
+        return payloads.ratings_page(iterations[iteration], int(query.get("offset", ["0"])[0]), limit)
+
+    with ReplayServer() as server:
+        server.add("/rating/madden-nfl", ratings)
+        for draft_group_id in DRAFT_GROUP_IDS:
+            server.add(
+                f"/draftgroups/v1/draftgroups/{draft_group_id}/draftables",
+                payloads.draftables_payload(players, draft_group_id),
+            )
+        for season in SEASONS:
+            server.add(f"/nflverse/pbp/play_by_play_{season}.parquet", payloads.play_by_play_parquet(players, season))
+        server.add("/nflverse/players/players.parquet", payloads.players_parquet(players))
+        yield server
@@ -0,0 +1,136 @@
+"""
+Previous implementations of optimized stages, kept to benchmark against.
+
+They are copied from the notebooks as they were before the optimization and
+are not used anywhere else.
+"""
+
+from typing import Any, Dict, List, Optional, Union
+
+import polars as pl
+from pydantic import BaseModel
+
+
+class Team(BaseModel):
+    id: int
+    label: str
+    imageUrl: str
+    isPopular: bool
+
+
+class PositionType(BaseModel):
+    id: str
+    name: str
+
+
+class Position(BaseModel):
+    id: str
+    shortLabel: str
+    label: str
+    positionType: PositionType
+
+
+class Archetype(BaseModel):
+    id: str
+    label: str
+
+
+class Iteration(BaseModel):
+    id: str
+    label: str
+
+
+class NumericStat(BaseModel):
+    value: float
+    diff: int
+
+
+class RunningStyleStat(BaseModel):
+    value: str
+    diff: int
+
+
+class AbilityType(BaseModel):
+    id: str
+    label: str
+    imageUrl: str
+    iconUrl: str
+
+
+class Ability(BaseModel):
+    id: str
+    label: str
+    description: str
+    imageUrl: str
+    type: AbilityType
+
+
+class PlayerRating(BaseModel):
+    id: int
+    overallRating: int
+    firstName: str
+    lastName: str
+    birthdate: str
+    height: int
+    weight: int
+    college: str
+    handedness: int
+    age: int
+    jerseyNum: int
+    yearsPro: int
+    playerAbilities: List[Ability]
+    avatarUrl: Optional[str]
+    archetype: Optional[Archetype]
+    team: Team
+    position: Position
+    iteration: Iteration
+    stats: Dict[str, Union[NumericStat, RunningStyleStat]]
+
+
+def create_madden_nfl_dataframe(items: List[Dict[str, Any]]) -> pl.DataFrame:
+    """
+    ``create_madden_nfl_dataframe`` of ``05_madden_etl`` before ``decode_madden_ratings``.
+
+    Every item is validated into a ``PlayerRating``, dumped back to a dict,
+    then flattened and cast one column at a time.
+    """
+    ratings = [PlayerRating.model_validate(item) for item in items]
+    data = [rating.model_dump() for rating in ratings]
+    df = pl.DataFrame(data)
+    df = df.with_columns([(pl.col("firstName") + " " + pl.col("lastName")).alias("fullName")])
+    df = df.with_columns(
+        [
+            pl.col("team").struct.field("id").alias("team_id"),
+            pl.col("team").struct.field("label").alias("team_label"),
+            pl.col("team").struct.field("imageUrl").alias("team_imageUrl"),
+            pl.col("team").struct.field("isPopular").alias("team_isPopular"),
+            pl.col("position").struct.field("id").alias("position_id"),
+            pl.col("position").struct.field("shortLabel").alias("position_shortLabel"),
+            pl.col("position").struct.field("label").alias("position_label"),
+            pl.col("position").struct.field("positionType").struct.field("id").alias("position_type_id"),
+            pl.col("position").struct.field("positionType").struct.field("name").alias("position_type_name"),
+            pl.col("iteration").struct.field("id").alias("iteration_id"),
+            pl.col("iteration").struct.field("label").alias("iteration_label"),
+            pl.col("archetype").struct.field("id").alias("archetype_id"),
+            pl.col("archetype").struct.field("label").alias("archetype_label"),
+        ]
+    )
+
+    stat_columns = df.select(pl.col("stats")).to_series().struct.fields
+    for stat in stat_columns:
+        df = df.with_columns([pl.col("stats").struct.field(stat).struct.field("value").alias(f"{stat}_rating")])
+    df = df.drop(["team", "position", "iteration", "stats", "playerAbilities", "archetype"])
+
+    int_columns = ["id", "overallRating", "height", "weight", "handedness", "age", "jerseyNum", "yearsPro", "team_id"]
+    float_columns = [col for col in df.columns if col.endswith("_rating") and col != "runningStyle_rating"]
+    df = df.with_columns(
+        pl.col("birthdate")
+        .str.strptime(pl.Date, format="%Y-%m-%d", strict=False)
+        .fill_null(pl.col("birthdate").str.strptime(pl.Date, format="%m/%d/%Y", strict=False))
+    )
+    for col in int_columns:
+        df = df.with_columns(pl.col(col).cast(pl.Int64))
+    for col in float_columns:
+        df = df.with_columns(pl.col(col).cast(pl.Float64))
+    df = df.with_columns(pl.col("team_isPopular").cast(pl.Boolean))
+    return df
@@ -0,0 +1,323 @@
+"""
+Deterministic stand-ins for the external payloads the pipeline consumes.
+
+The player pool is the DraftKings rankings sample shipped in
+``sharpshooter/data``, so Madden ratings, draftables and rankings refer to
+the same players and the crosswalk matches them the way it does in
+production. Every generator is seeded: the same arguments always produce the
+same bytes, which keeps timings comparable between runs.
+"""
+
+import io
+import json
+import random
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import polars as pl
+
+from sharpshooter.utils.scoring import PBP_COLUMNS
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "sharpshooter" / "data"
+DRAFTKINGS_RANKINGS_CSV = DATA_DIR / "draftkings_rankings_sample.csv"
+ESPN_RANKINGS_CSV = DATA_DIR / "espn_rankings_sample.csv"
+
+TEAMS = (
+    "ARI ATL BAL BUF CAR CHI CIN CLE DAL DEN DET GB HOU IND JAX KC "
+    "LAC LAR LV MIA MIN NE NO NYG NYJ PHI PIT SEA SF TB TEN WAS"
+).split()
+
+# Madden position -> (label, position type).
+MADDEN_POSITIONS: Dict[str, Tuple[str, str]] = {
+    "QB": ("Quarterback", "offense"),
+    "HB": ("Halfback", "offense"),
+    "WR": ("Wide Receiver", "offense"),
+    "TE": ("Tight End", "offense"),
+    "K": ("Kicker", "specialTeams"),
+    "MLB": ("Middle Linebacker", "defense"),
+    "CB": ("Cornerback", "defense"),
+}
+
+MADDEN_STATS = (
+    "overall acceleration agility awareness ballCarrierVision bCVision blockShedding breakSack breakTackle "
+    "carrying catchInTraffic catching changeOfDirection deepRouteRunning elusiveness finesseMoves hitPower "
+    "impactBlocking injury jukeMove jumping kickAccuracy kickPower kickReturn leadBlock manCoverage "
+    "mediumRouteRunning passBlock passBlockFinesse passBlockPower play_recognition playAction powerMoves "
+    "press pursuit release runBlock runBlockFinesse runBlockPower shortRouteRunning spectacularCatch "
+    "speed spinMove stamina stiffArm strength tackle throwAccuracyDeep throwAccuracyMid throwAccuracyShort "
+    "throwOnTheRun throwPower throwUnderPressure toughness trucking zoneCoverage"
+).split()
+
+
+# Numeric ``*_rating`` and plain numeric fields of an m24 ratings-api document.
+M24_RATINGS = (
+    "acceleration agility awareness bCVision blockShedding breakSack breakTackle carrying catchInTraffic "
+    "catching changeOfDirection deepRouteRunning finesseMoves hitPower impactBlocking injury jumping jukeMove "
+    "kickAccuracy kickPower kickReturn leadBlock manCoverage mediumRouteRunning overall passBlock "
+    "passBlockFinesse passBlockPower playAction playRecognition powerMoves press pursuit release runBlock "
+    "runBlockFinesse runBlockPower shortRouteRunning spectacularCatch speed spinMove stamina stiffArm strength "
+    "tackle throwAccuracyDeep throwAccuracyMid throwAccuracyShort throwOnTheRun throwPower throwUnderPressure "
+    "toughness trucking zoneCoverage"
+).split()
+M24_NUMBERS = ("age height jerseyNum plyrPortrait primaryKey signingBonus teamId totalSalary weight yearsPro").split()
+
+
+def rankings_players() -> pl.DataFrame:
+    """The DraftKings rankings sample: ``ID``, ``Name``, ``Position``, ``ADP`` and ``Team``."""
+    return pl.read_csv(DRAFTKINGS_RANKINGS_CSV)
+
+
+def _madden_position(position: str) -> str:
+    return {"RB": "HB", "DST": "MLB"}.get(position, position)
+
+
+def madden_ratings_items(players: pl.DataFrame, iteration: str = "week-1", seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    drop-api ratings items, one per player, with every rating in ``MADDEN_STATS``.
+
+    The same seed and iteration always produce the same ratings. Iterations
+    with different names move a fraction of the ratings, the way weekly
+    roster updates do.
+    """
+    base = random.Random(seed)
+    moves = random.Random(f"{seed}-{iteration}")
+    items = []
+    for row_id, row in enumerate(players.iter_rows(named=True)):
+        first_name, _, last_name = row["Name"].partition(" ")
+        position = _madden_position(row["Position"])
+        label, position_type = MADDEN_POSITIONS.get(position, (position, "offense"))
+        team = row["Team"] or base.choice(TEAMS)
+        stats = {}
+        for name in MADDEN_STATS:
+            value = base.randint(35, 99)
+            diff = moves.choice((-2, -1, 1, 2)) if moves.random() < 0.1 else 0
+            stats[name] = {"value": value + diff, "diff": diff}
+        stats["runningStyle"] = {"value": base.choice(("Default", "Long Stride", "Short Stride")), "diff": 0}
+        items.append(
+            {
+                "id": 10_000 + row_id,
+                "overallRating": stats["overall"]["value"],
+                "firstName": first_name,
+                "lastName": last_name,
+                "birthdate": (date(1990, 1, 1) + timedelta(days=base.randint(0, 4000))).isoformat(),
+                "height": base.randint(68, 80),
+                "weight": base.randint(170, 330),
+                "college": base.choice(("Alabama", "Georgia", "Ohio State", "LSU", "Michigan", "USC")),
+                "handedness": base.randint(0, 1),
+                "age": base.randint(21, 36),
+                "jerseyNum": base.randint(1, 99),
+                "yearsPro": base.randint(0, 14),
+                "avatarUrl": f"https://ratings-images-prod.pulse.ea.com/madden-nfl-25/portraits/{row_id}.png",
+                "team": {
+                    "id": TEAMS.index(team) if team in TEAMS else 99,
+                    "label": team,
+                    "imageUrl": f"https://ratings-images-prod.pulse.ea.com/madden-nfl-25/teams/{team}.png",
+                    "isPopular": base.random() < 0.2,
+                },
+                "position": {
+                    "id": position.lower(),
+                    "shortLabel": position,
+                    "label": label,
+                    "positionType": {"id": position_type, "name": position_type.title()},
+                },
+                "iteration": {"id": iteration, "label": iteration.replace("-", " ").title()},
+                "archetype": {"id": f"{position.lower()}_{row_id % 3}", "label": f"{label} {row_id % 3}"},
+                "stats": stats,
+                "playerAbilities": [
+                    {
+                        "id": f"ability_{ability}",
+                        "label": f"Ability {ability}",
+                        "description": "Wins more often in the matchup it is named for.",
+                        "imageUrl": f"https://ratings-images-prod.pulse.ea.com/madden-nfl-25/abilities/{ability}.png",
+                        "type": {
+                            "id": "superstar",
+                            "label": "Superstar",
+                            "imageUrl": "https://ratings-images-prod.pulse.ea.com/madden-nfl-25/abilities/ss.png",
+                            "iconUrl": "https://ratings-images-prod.pulse.ea.com/madden-nfl-25/abilities/ss-icon.png",
+                        },
+                    }
+                    for ability in (base.randint(0, 40) for _ in range(base.randint(0, 3)))
+                ],
+            }
+        )
+    return items
+
+
+def m24_ratings_docs(players: pl.DataFrame, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    ratings-api ``m24-ratings`` documents, one per player: flat ``*_rating``
+    and ``*_diff`` fields with the team under ``ost``, as ``PlayerRating``
+    in ``sharpshooter/notebooks/_models/madden.py`` reads them.
+    """
+    rng = random.Random(f"{seed}-m24")
+    docs = []
+    for row_id, row in enumerate(players.iter_rows(named=True)):
+        first_name, _, last_name = row["Name"].partition(" ")
+        doc: Dict[str, Any] = {
+            "firstName": first_name,
+            "lastName": last_name,
+            "fullNameForSearch": row["Name"],
+            "position": _madden_position(row["Position"]),
+            "ost": row["Team"] or rng.choice(TEAMS),
+            "archetype": f"{_madden_position(row['Position'])}_Archetype",
+            "iteration": "super-bowl",
+            "college": rng.choice(("Alabama", "Georgia", "Ohio State", "LSU", "Michigan", "USC")),
+            "plyrAssetname": f"{last_name.upper()}{row_id}",
+            "plyrBirthdate": f"{rng.randint(1, 12)}/{rng.randint(1, 28)}/{rng.randint(1988, 2002)}",
+            "plyrHandedness": rng.choice(("Left", "Right")),
+            "status": "Active",
+            "runningStyle_rating": rng.choice(("Default", "Long Stride", "Short Stride")),
+            "primaryKey": 20_000 + row_id,
+            "teamId": TEAMS.index(row["Team"]) if row["Team"] in TEAMS else 99,
+        }
+        for name in M24_RATINGS:
+            doc[f"{name}_rating"] = rng.randint(35, 99)
+        for name in M24_NUMBERS:
+            doc.setdefault(name, rng.randint(0, 400))
+        for name in (*M24_RATINGS, *M24_NUMBERS):
+            doc[f"{name}_diff"] = rng.choice((-2, -1, 1, 2)) if rng.random() < 0.1 else None
+        docs.append(doc)
+    return docs
+
+
+def ratings_page(items: List[Dict[str, Any]], offset: int, limit: int) -> bytes:
+    """One drop-api page: ``{"items": [...], "totalItems": N}``."""
+    return json.dumps({"items": items[offset : offset + limit], "totalItems": len(items)}).encode()
+
+
+def draftables_payload(players: pl.DataFrame, draft_group_id: int, seed: int = 0) -> bytes:
+    """
+    A draftables response body for a draft group over ``players``.
+
+    Every player is listed twice, for their position slot and for FLEX, with
+    the free-form ``playerGameAttributes`` the real API sends.
+    """
+    rng = random.Random(f"{seed}-{draft_group_id}")
+    start = "2024-09-08T17:00:00.0000000Z"
+    draftables = []
+    for row_id, row in enumerate(players.iter_rows(named=True)):
+        first_name, _, last_name = row["Name"].partition(" ")
+        team = row["Team"] or TEAMS[row_id % len(TEAMS)]
+        opponent = TEAMS[(TEAMS.index(team) + 16) % len(TEAMS)] if team in TEAMS else "BYE"
+        competition = {"competitionId": 5_900_000 + row_id % 16, "name": f"{team} @ {opponent}", "startTime": start}
+        salary = 3000 + 100 * rng.randint(0, 70)
+        for roster_slot_id in (66, 70):
+            draftables.append(
+                {
+                    "draftableId": 30_000_000 + 2 * row_id + (roster_slot_id == 70),
+                    "playerId": 800_000 + row_id,
+                    "playerDkId": row["ID"],
+                    "firstName": first_name,
+                    "lastName": last_name,
+                    "displayName": row["Name"],
+                    "shortName": f"{first_name[:1]}. {last_name}",
+                    "position": row["Position"],
+                    "rosterSlotId": roster_slot_id,
+                    "salary": salary,
+                    "status": rng.choice(("None", "None", "None", "Q", "O")),
+                    "isSwappable": True,
+                    "isDisabled": False,
+                    "newsStatus": rng.choice(("Recent", "Breaking", "None")),
+                    "teamId": TEAMS.index(team) if team in TEAMS else 99,
+                    "teamAbbreviation": team,
+                    "playerGameHash": f"{row['ID']}-{competition['competitionId']}",
+                    "playerImage50": f"https://dkn.gs/sports/images/nfl/players/50/{row['ID']}.png",
+                    "playerImage160": f"https://dkn.gs/sports/images/nfl/players/160/{row['ID']}.png",
+                    "altPlayerImage50": None,
+                    "altPlayerImage160": None,
+                    "competition": competition,
+                    "competitions": [competition],
+                    "draftStatAttributes": [
+                        {"id": 90, "value": f"{rng.uniform(0, 30):.1f}", "sortValue": f"{rng.uniform(0, 30):.1f}"},
+                        {"id": -2, "value": str(rng.randint(1, 32)), "sortValue": str(rng.randint(1, 32))},
+                    ],
+                    "playerGameAttributes": [{"id": 100, "value": "false"}],
+                }
+            )
+    return json.dumps({"draftables": draftables, "competitions": [], "draftStatAttributes": []}).encode()
+
+
+def play_by_play_parquet(players: pl.DataFrame, season: int, plays_per_game: int = 150, seed: int = 0) -> bytes:
+    """
+    A play-by-play release for one regular season with ``PBP_COLUMNS``.
+
+    Passers, rushers and receivers are drawn from ``players`` by position, so
+    the scoring and crosswalk code see realistic player ids.
+    """
+    rng = random.Random(f"{seed}-{season}")
+    by_position: Dict[str, List[Tuple[str, str]]] = {}
+    for row in players.iter_rows(named=True):
+        by_position.setdefault(row["Position"], []).append((f"00-{row['ID']:07d}", row["Name"]))
+    passers, rushers = by_position["QB"], by_position["RB"]
+    receivers = by_position["WR"] + by_position["TE"]
+
+    columns: Dict[str, List[Any]] = {name: [] for name in PBP_COLUMNS}
+    for week in range(1, 19):
+        for game in range(16):
+            home, away = TEAMS[2 * game], TEAMS[2 * game + 1]
+            game_id = f"{season}_{week:02d}_{away}_{home}"
+            for play_id in range(1, plays_per_game + 1):
+                posteam = home if play_id % 2 else away
+                play_type = rng.choice(("pass", "pass", "run", "run", "punt"))
+                passer = rng.choice(passers) if play_type == "pass" else (None, None)
+                rusher = rng.choice(rushers) if play_type == "run" else (None, None)
+                receiver = rng.choice(receivers) if play_type == "pass" else (None, None)
+                complete = play_type == "pass" and rng.random() < 0.65
+                yards = rng.randint(-3, 40) if play_type in ("pass", "run") else 0
+                touchdown = play_type != "punt" and rng.random() < 0.03
+                fumble = play_type == "run" and rng.random() < 0.01
+                scorer = receiver if complete else rusher
+                scored = touchdown and scorer[0] is not None
+                row = {
+                    "game_id": game_id,
+                    "play_id": float(play_id),
+                    "season": season,
+                    "week": week,
+                    "posteam": posteam,
+                    "play_type": play_type,
+                    "passer_player_id": passer[0],
+                    "passer_player_name": passer[1],
+                    "passing_yards": float(yards) if complete else None,
+                    "complete_pass": float(complete),
+                    "incomplete_pass": float(play_type == "pass" and not complete),
+                    "interception": float(play_type == "pass" and not complete and rng.random() < 0.05),
+                    "pass_touchdown": float(complete and scored),
+                    "rusher_player_id": rusher[0],
+                    "rusher_player_name": rusher[1],
+                    "rushing_yards": float(yards) if play_type == "run" else None,
+                    "rush_attempt": float(play_type == "run"),
+                    "rush_touchdown": float(play_type == "run" and scored),
+                    "receiver_player_id": receiver[0],
+                    "receiver_player_name": receiver[1],
+                    "receiving_yards": float(yards) if complete else None,
+                    "fumbled_1_player_id": rusher[0] if fumble else None,
+                    "fumbled_1_player_name": rusher[1] if fumble else None,
+                    "fumbled_1_team": posteam if fumble else None,
+                    "fumble_lost": float(fumble and rng.random() < 0.5),
+                    "td_player_id": scorer[0] if scored else None,
+                    "td_player_name": scorer[1] if scored else None,
+                    "td_team": posteam if scored else None,
+                    "return_touchdown": 0.0,
+                    "two_point_attempt": 0.0,
+                    "two_point_conv_result": None,
+                }
+                for name, value in row.items():
+                    columns[name].append(value)
+
+    buffer = io.BytesIO()
+    pl.DataFrame(columns, strict=False).write_parquet(buffer)
+    return buffer.getvalue()
+
+
+def players_parquet(players: pl.DataFrame) -> bytes:
+    """The nflverse players release over ``players``."""
+    buffer = io.BytesIO()
+    players.select(
+        pl.format("00-{}", pl.col("ID").cast(pl.String).str.zfill(7)).alias("gsis_id"),
+        pl.col("Name").alias("display_name"),
+        pl.col("Position").alias("position"),
+        pl.col("Team").alias("latest_team"),
+        pl.col("ID").alias("draftkings_id"),
+    ).write_parquet(buffer)
+    return buffer.getvalue()
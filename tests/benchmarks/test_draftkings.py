@@ -0,0 +1,46 @@
+"""DraftKings stages: flattening a draftables body and polling draft groups."""
+
+import asyncio
+
+import polars as pl
+import pytest
+
+from conftest import DRAFT_GROUP_IDS
+from payloads import draftables_payload
+from sharpshooter.utils import draftkings
+from sharpshooter.utils.draftkings import DraftablesPoller, flatten_draftables
+from sharpshooter.utils.utils import HTTPClientManager
+
+
+@pytest.fixture
+def draftables_url(replay_server, monkeypatch: pytest.MonkeyPatch) -> str:
+    url = replay_server.url + "/draftgroups/v1/draftgroups/{draft_group_id}/draftables"
+    monkeypatch.setattr(draftkings, "DRAFTABLES_URL", url)
+    return url
+
+
+def test_flatten_draftables(bench, players: pl.DataFrame) -> None:
+    body = draftables_payload(players, DRAFT_GROUP_IDS[0])
+    tables = bench(flatten_draftables, body, DRAFT_GROUP_IDS[0])
+    assert tables.draftables.height == 2 * players.height
+    assert tables.draft_stat_attributes.height == 4 * players.height
+
+
+def test_poll_draftables(bench, draftables_url: str, players: pl.DataFrame) -> None:
+    """A first poll of every draft group, then a poll where nothing changed."""
+
+    async def poll(poller: DraftablesPoller) -> pl.DataFrame:
+        async with HTTPClientManager() as manager:
+            poller.manager = manager
+            return await poller.poll()
+
+    async def first_poll() -> pl.DataFrame:
+        return await poll(DraftablesPoller(DRAFT_GROUP_IDS))
+
+    delta = bench(first_poll, name="first")
+    assert delta.height == len(DRAFT_GROUP_IDS) * 2 * players.height
+
+    poller = DraftablesPoller(DRAFT_GROUP_IDS)
+    asyncio.run(poll(poller))
+    delta = bench(poll, poller, name="unchanged")
+    assert delta.is_empty()
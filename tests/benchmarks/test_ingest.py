@@ -0,0 +1,104 @@
+"""nflverse ingestion stages: downloading a release and storing it in PostgreSQL."""
+
+from contextlib import closing
+from pathlib import Path
+from typing import Optional
+
+import polars as pl
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from sharpshooter.utils.cache import HTTPCache, HTTPCacheConfig
+from sharpshooter.utils.ingest import DataSourceConfig, DBConfig, NFLVerseDataSource, PostgresDataStorage, prefetch
+
+# Scratch schema the storage benchmarks write to, dropped afterwards.
+BENCHMARK_SCHEMA = "sharpshooter_benchmarks"
+
+
+@pytest.fixture
+def data_source(replay_server, tmp_path: Path) -> NFLVerseDataSource:
+    cache = HTTPCache(HTTPCacheConfig(cache_dir=tmp_path / "cache"))
+    yield NFLVerseDataSource(DataSourceConfig(base_url=replay_server.url + "/nflverse"), cache=cache)
+    cache.close()
+
+
+@pytest.fixture(scope="module")
+def storage() -> PostgresDataStorage:
+    try:
+        storage = PostgresDataStorage(DBConfig.from_env())
+    except OperationalError as e:
+        pytest.skip(f"PostgreSQL is not reachable: {e.orig}")
+    with storage.engine.begin() as connection:
+        connection.execute(text(f"CREATE SCHEMA IF NOT EXISTS {BENCHMARK_SCHEMA}"))
+    yield storage
+    with storage.engine.begin() as connection:
+        connection.execute(text(f"DROP SCHEMA {BENCHMARK_SCHEMA} CASCADE"))
+    storage.engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def play_by_play(replay_server, tmp_path_factory: pytest.TempPathFactory) -> pl.DataFrame:
+    cache = HTTPCache(HTTPCacheConfig(cache_dir=tmp_path_factory.mktemp("cache")))
+    source = NFLVerseDataSource(DataSourceConfig(base_url=replay_server.url + "/nflverse"), cache=cache)
+    df = source.fetch_data("pbp", 2023)
+    cache.close()
+    return df
+
+
+def test_fetch_data(bench, data_source: NFLVerseDataSource) -> None:
+    """A release downloaded into an empty cache, then revalidated with a ``304``."""
+    df = bench(data_source.fetch_data, "pbp", 2023, setup=data_source.cache.clear, name="cold")
+    assert df is not None and df.height > 0
+    assert {"date_uploaded", "data_type", "year"} <= set(df.columns)
+
+    bench(data_source.fetch_data, "pbp", 2023, name="revalidated")
+    assert data_source.cache.stats.hits > 0
+
+
+def test_store_data(bench, storage: PostgresDataStorage, play_by_play: pl.DataFrame) -> None:
+    """A season replacing its table, then an upsert where no row changed."""
+    assert bench(storage.store_data, play_by_play, BENCHMARK_SCHEMA, "pbp_2023", if_exists="replace", name="replace")
+    assert bench(
+        storage.store_data,
+        play_by_play,
+        BENCHMARK_SCHEMA,
+        "pbp_2023_incremental",
+        if_exists="upsert",
+        key_columns=["game_id", "play_id"],
+        name="upsert_unchanged",
+    )
+
+
+def test_store_batches(bench, storage: PostgresDataStorage, data_source: NFLVerseDataSource) -> None:
+    """A season streamed from its parquet file in record batches, decoding ahead of the ``COPY``."""
+    path = data_source.download("pbp", 2023)
+
+    def stream(table_name: str, if_exists: str, key_columns=None) -> Optional[int]:
+        with closing(prefetch(data_source.read_batches(path, "pbp", 2023, batch_rows=5_000))) as batches:
+            return storage.store_batches(batches, BENCHMARK_SCHEMA, table_name, if_exists, key_columns)
+
+    rows = bench(stream, "pbp_2023_streamed", "replace", name="replace")
+    assert rows == pl.read_parquet(path).height
+    assert bench(stream, "pbp_2023_streamed", "upsert", ["game_id", "play_id"], name="upsert_unchanged") == rows
+    # An empty stream is a successful write of nothing, not a failure.
+    assert storage.store_batches(iter([]), BENCHMARK_SCHEMA, "pbp_2023_streamed") == 0
+
+
+def test_upsert_into_appended_table_with_duplicate_keys(storage: PostgresDataStorage) -> None:
+    """A table loaded twice with ``append`` repeats its keys; the first upsert keeps the last loaded row of each."""
+    plays = pl.DataFrame({"game_id": ["2023_01_AAA_BBB"] * 3, "play_id": [1.0, 2.0, 3.0], "yards_gained": [4, 0, 12]})
+    corrected = plays.with_columns(pl.col("yards_gained") + 1)
+    assert storage.store_data(plays, BENCHMARK_SCHEMA, "appended_plays", if_exists="replace")
+    assert storage.store_data(corrected, BENCHMARK_SCHEMA, "appended_plays", if_exists="append")
+    snapshot = pl.concat(
+        [corrected.head(2), pl.DataFrame({"game_id": ["2023_01_AAA_BBB"], "play_id": [4.0], "yards_gained": [7]})]
+    )
+
+    assert storage.store_data(
+        snapshot, BENCHMARK_SCHEMA, "appended_plays", if_exists="upsert", key_columns=["game_id", "play_id"]
+    )
+    stored = pl.read_database(
+        f"SELECT play_id, yards_gained FROM {BENCHMARK_SCHEMA}.appended_plays ORDER BY play_id", storage.engine
+    )
+    assert stored.rows() == [(1.0, 5), (2.0, 1), (3.0, 13), (4.0, 7)]
@@ -0,0 +1,213 @@
+"""Madden ratings stages: fetching the drop-api pages, decoding and flattening them, and their history."""
+
+import asyncio
+import json
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List
+
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+import legacy
+from payloads import m24_ratings_docs, madden_ratings_items, ratings_page
+from sharpshooter.notebooks._models.madden import (
+    PlayerRating,
+    RatingsResponse,
+    player_rating_columns,
+    ratings_to_columns,
+    validate_ratings_page,
+)
+from sharpshooter.utils import madden
+from sharpshooter.utils.flatten import flatten_pages
+from sharpshooter.utils.madden import RatingsMatrix, decode_madden_ratings, fetch_madden_ratings
+from sharpshooter.utils.ratings_history import RatingsHistory, rating_attributes
+from sharpshooter.utils.utils import HTTPClientManager, fetch_paginated
+
+
+@pytest.fixture
+def ratings_url(replay_server, monkeypatch: pytest.MonkeyPatch) -> str:
+    url = replay_server.url + "/rating/madden-nfl"
+    monkeypatch.setattr(madden, "MADDEN_RATINGS_URL", url)
+    return url
+
+
+def test_fetch_ratings_pages(bench, ratings_url: str, madden_items: List[Dict[str, Any]]) -> None:
+    """Every page of an iteration over a fresh connection pool (``get_madden_ratings``)."""
+
+    async def fetch() -> List[Dict[str, Any]]:
+        async with HTTPClientManager() as manager:
+            return await fetch_paginated(f"{ratings_url}?locale=en&iteration=week-1", manager=manager)
+
+    items = bench(fetch)
+    assert [item["id"] for item in items] == [item["id"] for item in madden_items]
+
+
+def test_decode_madden_ratings(bench, madden_items: List[Dict[str, Any]]) -> None:
+    """Decoded items into the typed ratings frame (``create_madden_nfl_dataframe``), against the pydantic path."""
+    previous = bench(legacy.create_madden_nfl_dataframe, madden_items, name="pydantic")
+    df = bench(decode_madden_ratings, madden_items, name="decode")
+    assert df.height == len(madden_items)
+    assert {"fullName", "team_label", "speed_rating", "runningStyle_rating"} <= set(df.columns)
+    assert_frame_equal(df.select(previous.columns), previous)
+
+
+def test_validate_m24_ratings(bench, players) -> None:
+    """ratings-api pages into a frame: a model per page and a dict per player, batch validation, trusted columns."""
+    docs = m24_ratings_docs(players)
+    pages = [
+        json.dumps({"count": len(docs), "docs": docs[offset : offset + 100]}).encode()
+        for offset in range(0, len(docs), 100)
+    ]
+
+    def per_model() -> pl.DataFrame:
+        ratings = [rating for body in pages for rating in RatingsResponse(**json.loads(body)).docs]
+        return pl.DataFrame([rating.model_dump() for rating in ratings])
+
+    def validated() -> pl.DataFrame:
+        return pl.DataFrame(
+            ratings_to_columns([rating for body in pages for rating in validate_ratings_page(body).docs])
+        )
+
+    def trusted() -> pl.DataFrame:
+        return pl.DataFrame(
+            player_rating_columns([doc for body in pages for doc in json.loads(body)["docs"]], trusted=True)
+        )
+
+    previous = bench(per_model, name="per_model")
+    assert previous.height == len(docs)
+    assert_frame_equal(bench(validated, name="validated"), previous)
+    assert_frame_equal(bench(trusted, name="trusted"), previous)
+
+
+def test_flatten_ratings_pages(bench, madden_items: List[Dict[str, Any]]) -> None:
+    """Raw page bodies into the root and child tables (``flatten_structs``)."""
+    pages = [ratings_page(madden_items, offset, 100) for offset in range(0, len(madden_items), 100)]
+    tables = bench(flatten_pages, pages, id_column="id", records_key="items")
+    assert tables.root.height == len(madden_items)
+    assert "playerAbilities" in tables.children
+
+
+def test_fetch_madden_ratings(bench, ratings_url: str, madden_items: List[Dict[str, Any]]) -> None:
+    """Fetch and decode end to end, as ``sharpshooter refresh ratings`` does."""
+
+    async def fetch():
+        async with HTTPClientManager() as manager:
+            return await fetch_madden_ratings("week-1", manager=manager)
+
+    df = bench(fetch)
+    assert df.height == len(madden_items)
+
+
+def test_ratings_matrix(bench, madden_items: List[Dict[str, Any]]) -> None:
+    """Per-position rating means from ``RatingsMatrix`` versus one ``PlayerRating`` object per player."""
+    df = decode_madden_ratings(madden_items)
+    attributes = madden._attribute_columns(df)
+    aggregated = ["overall_rating", "speed_rating", "awareness_rating"]
+    rows = df.select("id", pl.col("position_shortLabel").alias("position"), *attributes).rows(named=True)
+
+    def objects() -> Dict[str, List[float]]:
+        ratings = [PlayerRating.model_construct(**row) for row in rows]
+        groups = defaultdict(list)
+        for rating in ratings:
+            groups[rating.position].append([getattr(rating, name) for name in aggregated])
+        return {position: [sum(column) / len(column) for column in zip(*values)] for position, values in groups.items()}
+
+    def matrix() -> pl.DataFrame:
+        ratings = RatingsMatrix.from_frame(df, id_column="id", position_column="position_shortLabel")
+        return ratings.position_aggregate(aggregated)
+
+    expected = bench(objects, name="objects")
+    means = bench(matrix, name="matrix")
+    for row in means.iter_rows(named=True):
+        assert [row[name] for name in aggregated] == pytest.approx(expected[row["position"]])
+
+    # The matrix holds every rating and diff in a small fraction of the objects' memory.
+    tracemalloc.start()
+    ratings = [PlayerRating.model_construct(**row) for row in rows]
+    object_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(ratings) == df.height
+    ratings_matrix = RatingsMatrix.from_frame(df, id_column="id", position_column="position_shortLabel")
+    assert ratings_matrix.nbytes * 10 < object_bytes
+
+
+def test_ratings_history(bench, players, tmp_path: Path) -> None:
+    """Weekly iterations stored as changes, then point-in-time and movers lookups."""
+    iterations = ["1-base", *(f"week-{week}" for week in range(1, 6))]
+    frames = [decode_madden_ratings(madden_ratings_items(players, iteration=name)) for name in iterations]
+    history = RatingsHistory(tmp_path / "history")
+    for name, frame in zip(iterations, frames):
+        history.append(frame, name)
+
+    # Appending the latest iteration again replaces it with the same changes.
+    changes = history.summary()["changes"][-1]
+    assert bench(history.append, frames[-1], iterations[-1], name="append") == changes
+    as_of = bench(history.as_of, "week-2", name="as_of")
+    assert as_of.height == frames[2].height
+    movers = bench(history.movers, "1-base", "week-5", name="movers")
+    assert movers.height and movers["change"].abs().is_sorted(descending=True)
+    assert bench(RatingsHistory, tmp_path / "history", name="load").iterations == iterations
+
+
+def test_ratings_history_of_fetched_iterations(ratings_url: str, tmp_path: Path) -> None:
+    """Two iterations fetched from the server: stored changes, ``as_of``, ``movers`` and replacing the latest."""
+
+    async def fetch(iteration: str) -> pl.DataFrame:
+        async with HTTPClientManager() as manager:
+            return await fetch_madden_ratings(iteration, manager=manager)
+
+    week_1, week_2 = asyncio.run(fetch("week-1")), asyncio.run(fetch("week-2"))
+    attributes = rating_attributes(week_1)
+
+    def cells(df: pl.DataFrame) -> pl.DataFrame:
+        return df.select(pl.col("id").alias("player_id"), *attributes).unpivot(
+            index="player_id", variable_name="attribute"
+        )
+
+    changed = (
+        cells(week_1)
+        .join(cells(week_2), on=["player_id", "attribute"], suffix="_week_2")
+        .filter(pl.col("value") != pl.col("value_week_2"))
+    )
+    assert changed.height, "the server returned the same ratings for both iterations"
+
+    history = RatingsHistory(tmp_path / "history")
+    assert history.append(week_1, "week-1") == cells(week_1).drop_nulls("value").height
+    assert history.append(week_2, "week-2") == changed.height
+
+    def ratings(df: pl.DataFrame) -> List[tuple]:
+        return df.select(pl.col(attributes).cast(pl.Int16)).rows()
+
+    assert ratings(history.as_of("week-1").sort("player_id")) == ratings(week_1.sort("id"))
+    assert ratings(history.as_of(-1).sort("player_id")) == ratings(week_2.sort("id"))
+
+    movers = history.movers("week-1", "week-2", n=None)
+    expected = changed.filter(pl.col("attribute") == "overallRating")
+    assert sorted(movers.select("player_id", "start_value", "end_value").rows()) == sorted(
+        expected.select("player_id", "value", "value_week_2").rows()
+    )
+    assert (movers["end_value"] - movers["start_value"] == movers["change"]).all()
+    assert movers["change"].abs().is_sorted(descending=True)
+
+    # EA corrects week 2: appending it again replaces it, on disk too.
+    player_id = week_2["id"][0]
+    corrected = week_2.with_columns(
+        pl.when(pl.col("id") == player_id)
+        .then(pl.col("overallRating") + 5)
+        .otherwise("overallRating")
+        .alias("overallRating")
+    )
+    history.append(corrected, "week-2")
+    assert history.iterations == ["week-1", "week-2"]
+    assert history.rating(player_id, "overallRating", "week-2") == week_2["overallRating"][0] + 5
+    assert (
+        history.rating(player_id, "overallRating", "week-1")
+        == week_1.filter(pl.col("id") == player_id)["overallRating"].item()
+    )
+    reloaded = RatingsHistory(tmp_path / "history")
+    assert ratings(reloaded.as_of("week-2").sort("player_id")) == ratings(corrected.sort("id"))
+    moved = reloaded.movers("week-1", "week-2", n=None).filter(pl.col("player_id") == player_id)
+    assert moved["end_value"].to_list() == [week_2["overallRating"][0] + 5]
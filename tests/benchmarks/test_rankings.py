@@ -0,0 +1,84 @@
+"""Rankings stages: keying the sources in the crosswalk and joining them."""
+
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import polars as pl
+import pytest
+
+from payloads import DRAFTKINGS_RANKINGS_CSV, ESPN_RANKINGS_CSV
+from sharpshooter.utils.crosswalk import PlayerCrosswalk
+from sharpshooter.utils.derived import DerivedTables
+from sharpshooter.utils.madden import decode_madden_ratings
+from sharpshooter.utils.rankings import (
+    COMBINED_MADDEN_COLUMNS,
+    combine_madden_with_rankings,
+    combine_rankings,
+    derive_combined_rankings,
+    draftkings_with_keys,
+    espn_with_keys,
+    madden_with_keys,
+)
+
+
+@pytest.fixture(scope="module")
+def madden_df(madden_items: List[Dict[str, Any]]) -> pl.DataFrame:
+    return decode_madden_ratings(madden_items)
+
+
+def key_sources(madden_df: pl.DataFrame) -> Tuple[pl.DataFrame, pl.DataFrame, pl.DataFrame]:
+    crosswalk = PlayerCrosswalk()
+    return (
+        draftkings_with_keys(pl.read_csv(DRAFTKINGS_RANKINGS_CSV), crosswalk),
+        espn_with_keys(pl.read_csv(ESPN_RANKINGS_CSV), crosswalk),
+        madden_with_keys(madden_df, crosswalk),
+    )
+
+
+@pytest.fixture(scope="module")
+def keyed(madden_df: pl.DataFrame) -> Tuple[pl.DataFrame, pl.DataFrame, pl.DataFrame]:
+    return key_sources(madden_df)
+
+
+def test_key_sources(bench, madden_df: pl.DataFrame) -> None:
+    """Build the crosswalk from scratch: every source is name-matched."""
+    draftkings, espn, madden = bench(key_sources, madden_df)
+    assert draftkings["player_key"].null_count() == 0
+    assert madden["player_key"].null_count() == 0
+
+
+def test_combine_rankings(bench, keyed: Tuple[pl.DataFrame, pl.DataFrame, pl.DataFrame]) -> None:
+    draftkings, espn, madden = keyed
+    combined = bench(combine_rankings, draftkings, espn, name="combine_rankings")
+    assert combined.height >= draftkings.height
+
+    combined_madden = bench(combine_madden_with_rankings, combined, madden, name="combine_madden_with_rankings")
+    assert combined_madden.columns == COMBINED_MADDEN_COLUMNS
+    assert combined_madden["overallRating"].null_count() < combined_madden.height
+
+
+def test_derive_combined_rankings(bench, madden_df: pl.DataFrame, tmp_path: Path) -> None:
+    """The ``sharpshooter combine`` pipeline from an empty directory, then with nothing changed."""
+    madden_path = tmp_path / "madden_ratings.parquet"
+    madden_df.write_parquet(madden_path)
+    derived_dir = tmp_path / "derived"
+    state: Dict[str, Any] = {}
+
+    def reset() -> None:
+        shutil.rmtree(derived_dir, ignore_errors=True)
+        state["crosswalk"] = PlayerCrosswalk()
+
+    def derive() -> pl.DataFrame:
+        _, combined_madden = derive_combined_rankings(
+            DerivedTables(derived_dir),
+            state["crosswalk"],
+            draftkings=DRAFTKINGS_RANKINGS_CSV,
+            espn=ESPN_RANKINGS_CSV,
+            madden=madden_path,
+        )
+        return combined_madden
+
+    rebuilt = bench(derive, setup=reset, name="rebuild")
+    unchanged = bench(derive, name="unchanged")
+    assert unchanged.fingerprint == rebuilt.fingerprint
@@ -0,0 +1,97 @@
+"""Download cache: revalidation through the shared client manager."""
+
+import asyncio
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List
+
+import httpx
+import pytest
+
+from sharpshooter.utils.cache import HTTPCache, HTTPCacheConfig
+from sharpshooter.utils.tracing import span
+from sharpshooter.utils.utils import HTTPClientConfig, HTTPClientManager
+
+URL = "https://github.com/nflverse/nflverse-data/releases/download/pbp/play_by_play_2023.csv"
+
+
+def mock_manager(handler: Callable[[httpx.Request], httpx.Response]) -> HTTPClientManager:
+    manager = HTTPClientManager(HTTPClientConfig(backoff_factor=0.0))
+    manager._create_client = lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return manager
+
+
+def etag_handler(body: bytes, requests: List[httpx.Request], headers: Dict[str, str]) -> Callable:
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if headers.get("ETag") and request.headers.get("If-None-Match") == headers["ETag"]:
+            return httpx.Response(304, headers=headers)
+        return httpx.Response(200, content=body, headers=headers)
+
+    return handler
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> Iterator[HTTPCache]:
+    cache = HTTPCache(HTTPCacheConfig(cache_dir=tmp_path))
+    yield cache
+    cache.close()
+
+
+def test_get_revalidates_through_manager(cache: HTTPCache) -> None:
+    requests: List[httpx.Request] = []
+    manager = mock_manager(etag_handler(b"a,b\n1,2\n", requests, {"ETag": '"v1"'}))
+
+    assert cache.get(URL, manager) == b"a,b\n1,2\n"
+    assert cache.get(URL, manager) == b"a,b\n1,2\n"
+    assert requests[1].headers["If-None-Match"] == '"v1"'
+    assert (cache.stats.misses, cache.stats.hits) == (1, 1)
+    assert not list(cache.config.cache_dir.glob("*.tmp"))
+
+
+def test_get_retries_through_manager(cache: HTTPCache) -> None:
+    statuses = [503, 200]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(statuses.pop(0), content=b"body", headers={"ETag": '"v1"'})
+
+    with span("download") as download:
+        assert cache.get(URL, mock_manager(handler)) == b"body"
+    assert not statuses
+    assert download.retries == 1
+
+
+def test_get_skips_responses_without_validators(cache: HTTPCache) -> None:
+    requests: List[httpx.Request] = []
+    manager = mock_manager(etag_handler(b"body", requests, {}))
+
+    assert cache.get(URL, manager) == b"body"
+    assert cache._entry(URL) is None
+    assert list(cache.config.cache_dir.iterdir()) == [cache.config.cache_dir / "index.sqlite"]
+
+
+def test_get_path_keeps_file_without_validators(cache: HTTPCache) -> None:
+    manager = mock_manager(etag_handler(b"body", [], {}))
+
+    assert cache.get_path(URL, manager).read_bytes() == b"body"
+
+
+def test_get_serves_stale_copy_on_network_error(cache: HTTPCache) -> None:
+    assert cache.get(URL, mock_manager(etag_handler(b"body", [], {"ETag": '"v1"'}))) == b"body"
+
+    def unreachable(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("unreachable", request=request)
+
+    manager = mock_manager(unreachable)
+    manager.config.retries = 0
+    assert cache.get(URL, manager) == b"body"
+    assert cache.stats.stale_hits == 1
+
+
+def test_get_inside_running_loop(cache: HTTPCache) -> None:
+    """The sync API also works from code that already runs an event loop (e.g. a notebook)."""
+    manager = mock_manager(etag_handler(b"body", [], {"ETag": '"v1"'}))
+
+    async def fetch() -> bytes:
+        return cache.get(URL, manager)
+
+    assert asyncio.run(fetch()) == b"body"
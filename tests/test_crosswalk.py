@@ -0,0 +1,80 @@
+"""Player crosswalk: incremental updates, attaching keys and the parquet round trip."""
+
+from pathlib import Path
+
+import polars as pl
+from polars.testing import assert_frame_equal
+
+from sharpshooter.utils.crosswalk import PlayerCrosswalk
+
+DRAFTKINGS = pl.DataFrame(
+    {
+        "ID": [11, 12, 13],
+        "Name": ["D.J. Moore", "Travis Etienne Jr.", "Josh Allen"],
+        "Position": ["WR", "RB", "QB"],
+        "Team": ["CHI", "JAC", "BUF"],
+    }
+)
+MADDEN = pl.DataFrame(
+    {
+        "id": [901, 902, 903, 904],
+        "fullName": ["DJ Moore", "Travis Etienne", "Josh Allen", "Josh Allen"],
+        "position": ["WR", "HB", "QB", "LB"],
+        "team": ["CHI", "JAX", "BUF", "JAX"],
+    }
+)
+
+
+def test_update_matches_new_source_and_attaches_keys() -> None:
+    crosswalk = PlayerCrosswalk()
+    added = crosswalk.update(DRAFTKINGS, {"dk_player_dk_id": "ID"}, "Name", "Position", "Team")
+    assert added.matches.is_empty() and added.unmatched.height == 3
+    assert crosswalk.frame.select("player_key", "dk_player_dk_id", "team").rows() == [
+        (1, 11, "CHI"),
+        (2, 12, "JAX"),
+        (3, 13, "BUF"),
+    ]
+
+    # The linebacker Josh Allen is blocked out by position and gets a key of his own.
+    result = crosswalk.update(MADDEN, {"madden_id": "id"}, "fullName", "position", "team")
+    assert result.matches.select("left_id", "right_id").rows() == [(901, 1), (902, 2), (903, 3)]
+    assert crosswalk.frame.select("player_key", "dk_player_dk_id", "madden_id").rows() == [
+        (1, 11, 901),
+        (2, 12, 902),
+        (3, 13, 903),
+        (4, None, 904),
+    ]
+
+    attached = crosswalk.attach(MADDEN, "madden_id", "id")
+    assert attached["player_key"].to_list() == [1, 2, 3, 4]
+    on_draftkings = crosswalk.attach(DRAFTKINGS.with_columns(pl.col("ID").cast(pl.Int32)), "dk_player_dk_id", "ID")
+    assert on_draftkings.schema["ID"] == pl.Int32 and on_draftkings["player_key"].to_list() == [1, 2, 3]
+
+
+def test_update_refreshes_known_ids_without_new_keys() -> None:
+    crosswalk = PlayerCrosswalk()
+    crosswalk.update(DRAFTKINGS, {"dk_player_dk_id": "ID"}, "Name", "Position", "Team")
+    traded = DRAFTKINGS.with_columns(pl.when(pl.col("ID") == 11).then(pl.lit("CAR")).otherwise("Team").alias("Team"))
+
+    result = crosswalk.update(traded, {"dk_player_dk_id": "ID"}, "Name", "Position", "Team")
+    assert result.unmatched.is_empty()
+    assert crosswalk.frame.select("player_key", "name", "team").rows() == [
+        (1, "D.J. Moore", "CAR"),
+        (2, "Travis Etienne Jr.", "JAX"),
+        (3, "Josh Allen", "BUF"),
+    ]
+
+
+def test_save_load_round_trip(tmp_path: Path) -> None:
+    path = tmp_path / "player_crosswalk.parquet"
+    assert PlayerCrosswalk.load(path).frame.is_empty()
+
+    crosswalk = PlayerCrosswalk()
+    crosswalk.update(DRAFTKINGS, {"dk_player_dk_id": "ID"}, "Name", "Position", "Team")
+    crosswalk.update(MADDEN, {"madden_id": "id"}, "fullName", "position", "team")
+    crosswalk.save(path)
+
+    loaded = PlayerCrosswalk.load(path)
+    assert_frame_equal(loaded.frame, crosswalk.frame)
+    assert loaded.fingerprint("madden_id") == crosswalk.fingerprint("madden_id")
+    assert not list(tmp_path.glob("*.tmp"))
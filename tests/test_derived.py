@@ -0,0 +1,96 @@
+"""Derived tables: steps are only rebuilt, and exports only written, when their fingerprints change."""
+
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import polars as pl
+
+from sharpshooter.utils.derived import DerivedTables
+
+
+class Pipeline:
+    """Rankings CSV -> starters -> sorted starters -> export, counting file reads and builds."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.reads = 0
+        self.builds: List[str] = []
+
+    def read(self, path: Path) -> pl.DataFrame:
+        self.reads += 1
+        return pl.read_csv(path)
+
+    def step(self, name: str, build: Callable[[pl.DataFrame], pl.DataFrame]) -> Callable[[pl.DataFrame], pl.DataFrame]:
+        def counted(df: pl.DataFrame) -> pl.DataFrame:
+            self.builds.append(name)
+            return build(df)
+
+        return counted
+
+    def run(self, state: Dict[str, str], version: str = "") -> bool:
+        tables = DerivedTables(self.directory / "derived")
+        rankings = tables.source("rankings", self.directory / "rankings.csv", reader=self.read)
+        starters = tables.derive(
+            "starters",
+            self.step("starters", lambda df: df.filter(pl.col("rank") <= 2)),
+            [rankings],
+            state=[lambda: state["crosswalk"]],
+            version=version,
+        )
+        ordered = tables.derive("ordered", self.step("ordered", lambda df: df.sort("name")), [starters])
+        return tables.export(ordered, self.directory / "ordered.csv")
+
+
+def write_rankings(directory: Path, bench_name: str) -> None:
+    pl.DataFrame({"name": ["Moore", "Allen", bench_name], "rank": [2, 1, 3]}).write_csv(directory / "rankings.csv")
+
+
+def test_unchanged_inputs_skip_rebuild(tmp_path: Path) -> None:
+    write_rankings(tmp_path, "Etienne")
+    pipeline = Pipeline(tmp_path)
+    state = {"crosswalk": "a"}
+
+    assert pipeline.run(state)
+    assert pipeline.builds == ["starters", "ordered"] and pipeline.reads == 1
+    assert pl.read_csv(tmp_path / "ordered.csv")["name"].to_list() == ["Allen", "Moore"]
+
+    # A fresh run over the same directory neither rebuilds nor reads the source or the stored outputs.
+    rerun = Pipeline(tmp_path)
+    assert not rerun.run(state)
+    assert rerun.builds == [] and rerun.reads == 0
+
+
+def test_changed_fingerprints_rebuild(tmp_path: Path) -> None:
+    write_rankings(tmp_path, "Etienne")
+    state = {"crosswalk": "a"}
+    Pipeline(tmp_path).run(state)
+
+    # The source changed, but only in a row the first step drops: its output
+    # keeps its fingerprint, so the step below it is reused.
+    write_rankings(tmp_path, "Walker")
+    pipeline = Pipeline(tmp_path)
+    assert not pipeline.run(state)
+    assert pipeline.builds == ["starters"] and pipeline.reads == 1
+
+    state["crosswalk"] = "b"
+    pipeline = Pipeline(tmp_path)
+    pipeline.run(state)
+    assert pipeline.builds == ["starters"]
+
+    pipeline = Pipeline(tmp_path)
+    pipeline.run(state, version="2")
+    assert pipeline.builds == ["starters"]
+    pipeline.run(state, version="2")
+    assert pipeline.builds == ["starters"]
+
+
+def test_missing_export_is_rewritten(tmp_path: Path) -> None:
+    write_rankings(tmp_path, "Etienne")
+    state = {"crosswalk": "a"}
+    Pipeline(tmp_path).run(state)
+
+    (tmp_path / "ordered.csv").unlink()
+    pipeline = Pipeline(tmp_path)
+    assert pipeline.run(state)
+    assert pipeline.builds == []
+    assert pl.read_csv(tmp_path / "ordered.csv")["name"].to_list() == ["Allen", "Moore"]
@@ -0,0 +1,73 @@
+"""DraftKings draftables: flattening a response into the draftables and child tables."""
+
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+from polars.testing import assert_frame_equal
+
+from sharpshooter.utils.draftkings import DRAFTABLE_SCHEMA, flatten_draftables
+
+KICKOFF = {"competitionId": 501, "name": "CHI @ GB", "startTime": "2024-09-08T17:00:00.0000000Z"}
+
+
+def draftable(draftable_id: int, **fields: Any) -> Dict[str, Any]:
+    record = {"draftableId": draftable_id, "playerId": draftable_id * 10, "displayName": f"Player {draftable_id}"}
+    return {**record, "competition": KICKOFF, "competitions": [KICKOFF], "draftStatAttributes": [], **fields}
+
+
+PAYLOAD = {
+    "draftables": [
+        draftable(
+            1,
+            salary=7600,
+            draftStatAttributes=[{"id": 90, "value": "18.4", "sortValue": "18.4"}, {"id": -2, "value": "5th"}],
+            playerAttributes=[{"id": 1, "value": "free-form"}],
+        ),
+        draftable(2, salary=4000, competitions=[]),
+        draftable(3, salary=5100, draftStatAttributes=[{"id": 90, "value": "9.1", "sortValue": "9.1"}]),
+    ]
+}
+
+
+def test_flatten_draftables_keys_child_tables() -> None:
+    tables = flatten_draftables(PAYLOAD, draft_group_id=77)
+
+    draftables = tables.draftables
+    assert draftables["draftableId"].to_list() == [1, 2, 3]
+    assert "playerAttributes" not in draftables.columns
+    assert not any(dtype.is_nested() for dtype in draftables.dtypes)
+    assert draftables["draft_group_id"].to_list() == [77, 77, 77]
+    assert draftables["competition_start_time"][0] == datetime(2024, 9, 8, 17, tzinfo=timezone.utc)
+
+    # Child rows are keyed by the parent draftable and their position in its list.
+    attributes = tables.draft_stat_attributes
+    assert attributes.select("draft_group_id", "draftableId", "ordinal", "statId", "value").rows() == [
+        (77, 1, 0, 90, "18.4"),
+        (77, 1, 1, -2, "5th"),
+        (77, 3, 0, 90, "9.1"),
+    ]
+    assert attributes["sortValue"][1] is None
+    assert tables.competitions.select("draftableId", "ordinal", "competitionId", "startTime").rows() == [
+        (1, 0, 501, datetime(2024, 9, 8, 17, tzinfo=timezone.utc)),
+        (3, 0, 501, datetime(2024, 9, 8, 17, tzinfo=timezone.utc)),
+    ]
+
+
+def test_flatten_draftables_inputs_agree() -> None:
+    """The raw body, the decoded response and its list of records flatten to the same tables."""
+    from_body = flatten_draftables(json.dumps(PAYLOAD).encode(), draft_group_id=77)
+    for payload in (PAYLOAD, PAYLOAD["draftables"]):
+        tables = flatten_draftables(payload, draft_group_id=77)
+        assert_frame_equal(tables.draftables, from_body.draftables)
+        assert_frame_equal(tables.competitions, from_body.competitions)
+        assert_frame_equal(tables.draft_stat_attributes, from_body.draft_stat_attributes)
+
+
+def test_flatten_empty_draft_group() -> None:
+    tables = flatten_draftables(b'{"draftables": []}', draft_group_id=77)
+
+    assert tables.draftables.is_empty() and tables.competitions.is_empty()
+    assert tables.draftables["salary"].dtype == DRAFTABLE_SCHEMA["salary"]
+    columns = ["draft_group_id", "draftableId", "ordinal", "statId", "value", "sortValue"]
+    assert tables.draft_stat_attributes.columns == columns
@@ -0,0 +1,46 @@
+"""DraftKings draftables poller: poll scheduling."""
+
+import asyncio
+from typing import List
+
+import httpx
+import pytest
+
+from sharpshooter.utils import draftkings
+from sharpshooter.utils.draftkings import DraftablesPoller
+from sharpshooter.utils.utils import HTTPClientManager
+
+
+def poll_sleeps(iterations: int, monkeypatch: pytest.MonkeyPatch) -> List[float]:
+    """Run a poller over an empty draft group and return the delays it slept for."""
+    requests: List[httpx.Request] = []
+    sleeps: List[float] = []
+
+    async def sleep(delay: float) -> None:
+        sleeps.append(delay)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={"draftables": []})
+
+    manager = HTTPClientManager()
+    manager._create_client = lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(draftkings.asyncio, "sleep", sleep)
+
+    async def run() -> None:
+        async for _ in DraftablesPoller([1], manager=manager).run(interval=60.0, iterations=iterations):
+            pass
+
+    asyncio.run(run())
+    assert len(requests) == iterations
+    return sleeps
+
+
+def test_run_sleeps_between_polls_only(monkeypatch: pytest.MonkeyPatch) -> None:
+    sleeps = poll_sleeps(3, monkeypatch)
+    assert len(sleeps) == 2
+    assert all(50.0 < delay <= 60.0 for delay in sleeps)
+
+
+def test_run_without_polls(monkeypatch: pytest.MonkeyPatch) -> None:
+    assert poll_sleeps(0, monkeypatch) == []
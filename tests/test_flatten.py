@@ -0,0 +1,69 @@
+"""Record flattening: leaf columns, child tables keyed by parent id and ordinal, and page streams."""
+
+import json
+
+import polars as pl
+
+from sharpshooter.utils.flatten import flatten_pages, flatten_records
+
+ITEMS = [
+    {
+        "id": 7,
+        "team": {"id": 3, "label": "Bears"},
+        "tags": ["rookie"],
+        "playerAbilities": [
+            {"id": 41, "label": "Deep Threat", "type": {"id": 1}, "tiers": [{"level": 1}, {"level": 2}]},
+            {"id": 42, "label": "Route Runner", "type": {"id": 2}, "tiers": []},
+        ],
+    },
+    {"id": 8, "team": {"id": 4, "label": "Packers"}, "tags": [], "playerAbilities": []},
+    {"id": 9, "team": None, "tags": None, "playerAbilities": [{"id": 41, "label": "Deep Threat", "type": None}]},
+]
+
+
+def test_flatten_records_keys_children_by_parent_id_and_ordinal() -> None:
+    tables = flatten_records(json.dumps(ITEMS).encode(), id_column="id")
+
+    assert tables.root.columns == ["id", "team_id", "team_label", "tags"]
+    assert tables.root.rows() == [(7, 3, "Bears", ["rookie"]), (8, 4, "Packers", []), (9, None, None, None)]
+    assert list(tables.children) == ["playerAbilities", "playerAbilities_tiers"]
+
+    # The child has an ``id`` field of its own, so the parent's id is renamed.
+    abilities = tables["playerAbilities"]
+    assert abilities.columns == ["parent_id", "ordinal", "id", "label", "type_id"]
+    assert abilities.select("parent_id", "ordinal", "id", "type_id").rows() == [
+        (7, 0, 41, 1),
+        (7, 1, 42, 2),
+        (9, 0, 41, None),
+    ]
+    # Grandchildren carry every key of their parent row.
+    tiers = tables["playerAbilities_tiers"]
+    assert tiers.rows() == [(7, 0, 0, 1), (7, 0, 1, 2)]
+    assert tiers.columns == ["parent_id", "playerAbilities_ordinal", "ordinal", "level"]
+
+
+def test_flatten_records_without_id_column_uses_row_index() -> None:
+    tables = flatten_records(ITEMS[:2])
+
+    assert tables.root["row_index"].to_list() == [0, 1]
+    assert tables["playerAbilities"].select("row_index", "ordinal", "id").rows() == [(0, 0, 41), (0, 1, 42)]
+
+
+def test_flatten_pages_combines_pages_by_name() -> None:
+    pages = [
+        json.dumps({"items": ITEMS[:1]}).encode(),
+        json.dumps({"items": [{"id": 10, "team": {"id": 5, "label": "Lions"}, "rookie": True}]}).encode(),
+    ]
+    tables = flatten_pages(pages, id_column="id", records_key="items")
+
+    assert tables.root.select("id", "team_label", "rookie").rows() == [(7, "Bears", None), (10, "Lions", True)]
+    assert tables["playerAbilities"]["parent_id"].to_list() == [7, 7]
+
+
+def test_flatten_pages_without_pages() -> None:
+    tables = flatten_pages([], id_column="id", records_key="items")
+    assert tables.root.columns == ["id"] and tables.root.is_empty() and tables.children == {}
+
+    declared = flatten_pages([], schema={"id": pl.Int64, "team": pl.Struct({"label": pl.String})}, id_column="id")
+    assert declared.root.schema == pl.Schema({"id": pl.Int64, "team_label": pl.String})
+    assert flatten_pages([]).root.columns == ["row_index"]
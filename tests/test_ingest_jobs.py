@@ -0,0 +1,104 @@
+"""Ingestion jobs: bounded writes, failure reporting and empty streams."""
+
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import polars as pl
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from sharpshooter.utils.ingest import (
+    Base,
+    DataSourceConfig,
+    IngestionJob,
+    NFLDataManager,
+    PostgresDataStorage,
+    nflverse_jobs,
+)
+
+
+class ReleaseSource:
+    """Serves one small frame per job in place of the nflverse releases; ``None`` for the ``missing`` jobs."""
+
+    def __init__(self, missing: tuple = ()):
+        self.config = DataSourceConfig()
+        self.missing = missing
+
+    def fetch_data(self, data_type: str, year: Optional[int] = None) -> Optional[pl.DataFrame]:
+        if (data_type, year) in self.missing:
+            return None
+        return pl.DataFrame({"data_type": [data_type] * 3, "year": [year] * 3})
+
+    def download(self, data_type: str, year: Optional[int] = None) -> Path:
+        return Path(f"{data_type}_{year}.parquet")
+
+    def read_batches(self, path: Path, data_type: str, year: Optional[int] = None) -> Iterator[pl.DataFrame]:
+        return iter([])
+
+
+class SQLiteStorage(PostgresDataStorage):
+    """The PostgreSQL storage on an in-memory SQLite engine: the upload log works, ``COPY`` does not."""
+
+    def __init__(self) -> None:
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+
+
+class TimedStorage(SQLiteStorage):
+    """Records how many writes overlap instead of writing."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.active = self.peak = 0
+        self.tables: List[str] = []
+        self._lock = threading.Lock()
+
+    def store_data(self, df: pl.DataFrame, schema: str, table_name: str, **kwargs) -> bool:
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05)
+        with self._lock:
+            self.active -= 1
+            self.tables.append(table_name)
+        return True
+
+
+@pytest.fixture
+def jobs() -> List[IngestionJob]:
+    return nflverse_jobs([2019, 2020], data_types=("pbp", "injuries", "rosters"), static_data_types=())
+
+
+def test_writes_are_bounded(jobs: List[IngestionJob]) -> None:
+    storage = TimedStorage()
+    results = NFLDataManager(ReleaseSource(), storage).fetch_and_store_many(
+        jobs, max_workers=6, max_concurrent_writes=2
+    )
+
+    assert [result.status for result in results] == ["stored"] * len(jobs)
+    assert [result.job for result in results] == jobs
+    assert all(result.rows == 3 for result in results)
+    assert storage.peak == 2
+    assert sorted(storage.tables) == sorted(job.table_name for job in jobs)
+
+
+def test_failed_jobs_are_reported(jobs: List[IngestionJob]) -> None:
+    """A release that cannot be fetched, and a write the database rejects, fail only their own job."""
+    source = ReleaseSource(missing=(("injuries", 2020),))
+    results = NFLDataManager(source, SQLiteStorage()).fetch_and_store_many(jobs, max_workers=3)
+    statuses: Dict[str, str] = {result.job.table_name: result.error for result in results}
+
+    assert all(result.status == "failed" for result in results)
+    assert statuses.pop("nflverse__injuries_2020") == "No data fetched"
+    assert set(statuses.values()) == {"Store failed"}
+
+
+def test_empty_stream_is_stored_as_zero_rows(jobs: List[IngestionJob]) -> None:
+    results = NFLDataManager(ReleaseSource(), SQLiteStorage()).fetch_and_store_many(jobs[:2], stream=True)
+
+    assert [(result.status, result.rows, result.error) for result in results] == [("stored", 0, None)] * 2
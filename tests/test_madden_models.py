@@ -0,0 +1,69 @@
+"""ratings-api PlayerRating: batch validation and the trusted column fast path."""
+
+import json
+from typing import Any, Dict, List
+
+import polars as pl
+import pytest
+from pydantic import ValidationError
+
+from sharpshooter.notebooks._models.madden import (
+    PLAYER_RATING_KEYS,
+    PlayerRating,
+    player_rating_columns,
+    validate_player_ratings,
+    validate_ratings_page,
+)
+
+
+def doc(player_id: int) -> Dict[str, Any]:
+    """A ratings-api document with every ``PlayerRating`` field, the team under ``ost``."""
+    document: Dict[str, Any] = {}
+    for name, field in PlayerRating.model_fields.items():
+        if field.annotation is str:
+            document[field.alias or name] = f"{name}-{player_id}"
+        elif name.endswith("_diff"):
+            document[name] = None if player_id % 2 else -1
+        else:
+            document[name] = 60 + player_id
+    return document
+
+
+@pytest.fixture
+def docs() -> List[Dict[str, Any]]:
+    return [doc(player_id) for player_id in range(3)]
+
+
+def test_trusted_columns_match_validated(docs: List[Dict[str, Any]]) -> None:
+    body = json.dumps(docs).encode()
+    validated = player_rating_columns(body)
+
+    assert list(validated) == list(PlayerRating.model_fields)
+    assert player_rating_columns(body, trusted=True) == validated
+    assert player_rating_columns(docs, trusted=True) == validated
+    assert validated["team"] == ["team-0", "team-1", "team-2"]
+    assert pl.DataFrame(validated).height == 3
+
+
+def test_validated_columns_reject_bad_input(docs: List[Dict[str, Any]]) -> None:
+    docs[1]["speed_rating"] = "fast"
+    del docs[2]["lastName"]
+
+    with pytest.raises(ValidationError) as error:
+        player_rating_columns(json.dumps(docs).encode())
+    assert {item["loc"] for item in error.value.errors()} == {(1, "speed_rating"), (2, "lastName")}
+    with pytest.raises(ValidationError):
+        validate_player_ratings(docs)
+    # Trusted mode reads the payload as is.
+    trusted = player_rating_columns(docs, trusted=True)
+    assert trusted["speed_rating"][1] == "fast" and trusted["lastName"][2] is None
+
+
+def test_validate_ratings_page(docs: List[Dict[str, Any]]) -> None:
+    page = validate_ratings_page(json.dumps({"count": 3, "docs": docs}))
+
+    assert page.count == 3
+    assert [rating.team for rating in page.docs] == ["team-0", "team-1", "team-2"]
+    assert PLAYER_RATING_KEYS["team"] == "ost"
+    with pytest.raises(ValidationError):
+        validate_ratings_page(b'{"count": 1}')
@@ -0,0 +1,66 @@
+"""Player name matching: normalization, the match tiers and the unmatched report."""
+
+import polars as pl
+import pytest
+
+from sharpshooter.utils.names import match_players, normalize_name, normalize_team
+
+
+def test_normalize_name() -> None:
+    names = pl.Series(
+        ["D.J. Moore", "DJ Moore", "D J Moore", "Kenneth Walker III", "Amon-Ra St. Brown", "Hollywood Brown"]
+    )
+    assert names.to_frame("name").select(normalize_name(pl.col("name")))["name"].to_list() == [
+        "dj moore",
+        "dj moore",
+        "dj moore",
+        "kenneth walker",
+        "amon ra st brown",
+        "marquise brown",
+    ]
+    assert pl.select(normalize_team(pl.lit(" jac "))).item() == "JAX"
+
+
+def test_match_players_tiers(caplog: pytest.LogCaptureFixture) -> None:
+    draftkings = pl.DataFrame(
+        [
+            (1, "D.J. Moore", "CHI", "WR"),
+            (2, "Hollywood Brown", "KC", "WR"),
+            (3, "Saquon Barkley", "PHI", "RB"),
+            (4, "Kenneth Walker III", "SEA", "RB"),
+            (5, "Christian McCaffrey", "SF", "RB"),
+            (6, "Mike Williams", "PIT", "WR"),
+            (7, "Nobody Special", "BUF", "QB"),
+        ],
+        schema=["dk_id", "name", "team", "position"],
+        orient="row",
+    )
+    madden = pl.DataFrame(
+        [
+            (101, "DJ Moore", "CHI", "WR"),
+            (102, "Marquise Brown", "KC", "WR"),
+            (103, "Saquon Barkley", "NYG", "RB"),
+            (104, "Ken Walker", "SEA", "RB"),
+            (105, "Christian McCaffery", "SF", "RB"),
+            (106, "Mike Williams", "LAC", "WR"),
+            (107, "Mike Williams", "NYJ", "WR"),
+        ],
+        schema=["madden_id", "fullName", "team", "position"],
+        orient="row",
+    )
+
+    result = match_players(draftkings, madden, "name", "fullName", "dk_id", "madden_id", block_on=["team", "position"])
+
+    assert result.matches.select("left_id", "right_id", "match_method").rows() == [
+        (1, 101, "exact"),
+        (2, 102, "exact"),
+        (3, 103, "name"),
+        (4, 104, "last_name"),
+        (5, 105, "fuzzy"),
+    ]
+    assert 0.6 <= result.matches["match_score"][-1] < 1.0
+    # Two Mike Williams on other teams are ambiguous, so neither is taken.
+    assert result.unmatched["dk_id"].to_list() == [6, 7]
+    assert result.unmatched.columns == draftkings.columns
+    assert result.match_rate == pytest.approx(5 / 7)
+    assert "2 of 7 players unmatched by name, e.g. Mike Williams, Nobody Special" in caplog.text
@@ -0,0 +1,147 @@
+"""Lineup optimizer: exact top-N against brute force on a small slate."""
+
+import itertools
+import math
+from collections import Counter
+from typing import Dict, List, Tuple
+
+import numpy as np
+import polars as pl
+import pytest
+
+from sharpshooter.utils.optimizer import LineupOptimizer, OptimizerSettings, RosterSlot, Stack
+
+ROSTER = (
+    RosterSlot(name="QB", positions=("QB",)),
+    RosterSlot(name="RB", positions=("RB",)),
+    RosterSlot(name="WR", positions=("WR",), count=2),
+    RosterSlot(name="TE", positions=("TE",)),
+    RosterSlot(name="FLEX", positions=("RB", "WR", "TE")),
+)
+# Position counts of every way to fill ``ROSTER`` (the FLEX as an RB, WR or TE).
+COMPOSITIONS = (
+    {"QB": 1, "RB": 2, "WR": 2, "TE": 1},
+    {"QB": 1, "RB": 1, "WR": 3, "TE": 1},
+    {"QB": 1, "RB": 1, "WR": 2, "TE": 2},
+)
+SALARY_CAP = 32_000
+
+
+@pytest.fixture(scope="module")
+def slate() -> pl.DataFrame:
+    """Four teams in two games, with distinct projections so lineup scores do not tie."""
+    rng = np.random.default_rng(7)
+    rows = []
+    for team_index, team in enumerate(["AAA", "BBB", "CCC", "DDD"]):
+        for position, count in {"QB": 1, "RB": 2, "WR": 3, "TE": 1}.items():
+            for _ in range(count):
+                player_id = len(rows) + 1
+                rows.append(
+                    {
+                        "playerId": player_id,
+                        "draftableId": 1000 + player_id,
+                        "displayName": f"{team} {position} {player_id}",
+                        "position": position,
+                        "teamAbbreviation": team,
+                        "competition_id": team_index // 2,
+                        "salary": int(rng.integers(30, 90)) * 100,
+                        "projection": float(rng.uniform(2.0, 25.0)),
+                    }
+                )
+    return pl.DataFrame(rows)
+
+
+def brute_force(slate: pl.DataFrame, settings: OptimizerSettings, n: int) -> List[Tuple[float, frozenset]]:
+    """Every valid lineup, best first, accepted greedily under ``min_unique`` and the exposure limits."""
+    players = {row["playerId"]: row for row in slate.iter_rows(named=True)}
+    by_position: Dict[str, List[int]] = {}
+    for player_id, row in players.items():
+        by_position.setdefault(row["position"], []).append(player_id)
+
+    def is_valid(lineup: List[int]) -> bool:
+        rows = [players[player_id] for player_id in lineup]
+        if sum(row["salary"] for row in rows) > settings.salary_cap:
+            return False
+        if not set(settings.locked) <= set(lineup):
+            return False
+        if len({row["competition_id"] for row in rows}) < settings.min_games:
+            return False
+        for stack in settings.stacks:
+            for primary in (row for row in rows if row["position"] in stack.primary):
+                teammates = [
+                    row
+                    for row in rows
+                    if row["position"] in stack.teammates and row["teamAbbreviation"] == primary["teamAbbreviation"]
+                ]
+                if len(teammates) < stack.count:
+                    return False
+        return True
+
+    lineups = []
+    for composition in COMPOSITIONS:
+        groups = [itertools.combinations(by_position[position], count) for position, count in composition.items()]
+        for picks in itertools.product(*groups):
+            lineup = [player_id for group in picks for player_id in group]
+            if is_valid(lineup):
+                lineups.append((sum(players[player_id]["projection"] for player_id in lineup), frozenset(lineup)))
+    lineups.sort(key=lambda lineup: -lineup[0])
+
+    def limit(player_id: int) -> int:
+        if player_id in settings.locked:
+            return n
+        return math.floor(settings.exposures.get(player_id, settings.max_exposure) * n + 1e-9)
+
+    size = sum(slot.count for slot in settings.roster)
+    taken: List[Tuple[float, frozenset]] = []
+    used: Counter = Counter()
+    for score, lineup in lineups:
+        if len(taken) == n:
+            break
+        if any(used[player_id] >= limit(player_id) for player_id in lineup):
+            continue
+        if any(len(lineup & other) > size - settings.min_unique for _, other in taken):
+            continue
+        taken.append((score, lineup))
+        used.update(lineup)
+    return taken
+
+
+def optimized(
+    slate: pl.DataFrame, settings: OptimizerSettings, n: int, workers: int = 1
+) -> List[Tuple[float, frozenset]]:
+    lineups = LineupOptimizer(slate, "projection", settings).optimize(n, workers=workers)
+    players = lineups.lineups.group_by("lineup_id").agg(pl.col("playerId"))
+    ids = {row["lineup_id"]: frozenset(row["playerId"]) for row in players.iter_rows(named=True)}
+    return [(row["projection"], ids[row["lineup_id"]]) for row in lineups.summary.iter_rows(named=True)]
+
+
+def assert_same_lineups(actual: List[Tuple[float, frozenset]], expected: List[Tuple[float, frozenset]]) -> None:
+    assert [lineup for _, lineup in actual] == [lineup for _, lineup in expected]
+    assert [score for score, _ in actual] == pytest.approx([score for score, _ in expected])
+
+
+def test_top_lineups_match_brute_force(slate: pl.DataFrame) -> None:
+    settings = OptimizerSettings(roster=ROSTER, salary_cap=SALARY_CAP)
+    assert_same_lineups(optimized(slate, settings, 50), brute_force(slate, settings, 50))
+
+
+def test_constrained_lineups_match_brute_force(slate: pl.DataFrame) -> None:
+    """Exposure limits, a QB stack, ``min_unique`` and a locked player together."""
+    top_qb = slate.filter(pl.col("position") == "QB").sort("projection", descending=True)["playerId"][0]
+    settings = OptimizerSettings(
+        roster=ROSTER,
+        salary_cap=SALARY_CAP,
+        min_unique=2,
+        max_exposure=0.5,
+        exposures={top_qb: 0.25},
+        stacks=(Stack(),),
+        locked=(slate.filter(pl.col("position") == "RB")["playerId"][0],),
+    )
+    expected = brute_force(slate, settings, 20)
+    assert len(expected) == 20
+    assert_same_lineups(optimized(slate, settings, 20), expected)
+
+
+def test_workers_give_same_lineups(slate: pl.DataFrame) -> None:
+    settings = OptimizerSettings(roster=ROSTER, salary_cap=SALARY_CAP, min_unique=2, stacks=(Stack(),))
+    assert_same_lineups(optimized(slate, settings, 30, workers=2), optimized(slate, settings, 30))
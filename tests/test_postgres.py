@@ -0,0 +1,52 @@
+"""PostgreSQL loading: stable row hashes and the CSV stream fed to ``COPY``."""
+
+import hashlib
+import io
+from typing import Any, List
+
+import polars as pl
+
+from sharpshooter.utils.postgres import copy_frames, create_table_sql, iter_slices, with_row_hash
+
+
+class CopyCursor:
+    """Stands in for a psycopg2 cursor, keeping what each ``COPY ... FROM STDIN`` read."""
+
+    def __init__(self) -> None:
+        self.copies: List[tuple] = []
+
+    def copy_expert(self, sql: str, file: Any) -> None:
+        self.copies.append((sql, file.read()))
+
+
+def test_row_hash_is_blake2b_of_the_row() -> None:
+    """The stored hash does not depend on the polars version, the column order or the excluded columns."""
+    df = pl.DataFrame({"play_id": [1, 2], "desc": ["pass", "run"], "date_uploaded": ["2024-09-01", "2024-09-02"]})
+    hashed = with_row_hash(df, exclude_columns=["date_uploaded"])
+
+    expected = hashlib.blake2b(b'{"desc":"pass","play_id":1}', digest_size=8).digest()
+    assert hashed["_row_hash"][0] == int.from_bytes(expected, "little", signed=True)
+    reordered = df.select("desc", "play_id").with_columns(pl.lit("2025-01-01").alias("date_uploaded"))
+    assert with_row_hash(reordered, ["date_uploaded"])["_row_hash"].equals(hashed["_row_hash"])
+    assert with_row_hash(df)["_row_hash"][0] != hashed["_row_hash"][0]
+
+
+def test_copy_frames_streams_every_chunk_as_csv() -> None:
+    df = pl.DataFrame(
+        {"game_id": ["2023_01_AAA_BBB"] * 5, "play_id": [1, 2, 3, 4, 5], "tags": [["a"], [], ["b", "c"], None, ["d"]]}
+    )
+    cursor = CopyCursor()
+
+    assert copy_frames(cursor, iter_slices(df, 2), "raw", "pbp", df.columns) == 5
+    ((sql, body),) = cursor.copies
+    assert sql == 'COPY "raw"."pbp" ("game_id", "play_id", "tags") FROM STDIN WITH (FORMAT csv)'
+    copied = pl.read_csv(io.BytesIO(body), has_header=False, new_columns=df.columns)
+    assert copied["play_id"].to_list() == [1, 2, 3, 4, 5]
+    assert copied["tags"].to_list() == ['["a"]', "[]", '["b","c"]', None, '["d"]']
+
+
+def test_create_table_sql_maps_types() -> None:
+    schema = pl.Schema({"id": pl.Int64, "tags": pl.List(pl.String), "at": pl.Datetime("us", "UTC")})
+    assert create_table_sql("raw", "t", schema, {"id": "INTEGER"}) == (
+        'CREATE TABLE IF NOT EXISTS "raw"."t" ("id" INTEGER, "tags" JSONB, "at" TIMESTAMPTZ)'
+    )
@@ -0,0 +1,86 @@
+"""Circuit breaker: the half-open probe is never left claimed."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from sharpshooter.utils.ratelimit import CircuitOpenError, HostRateLimiter, RateLimitConfig
+from sharpshooter.utils.utils import HTTPClientConfig, HTTPClientManager
+
+URL = "https://example.com/draftables"
+# One failure opens the circuit; a probe is let through 0.2s later.
+CIRCUIT = RateLimitConfig(failure_threshold=1, open_seconds=0.2)
+
+
+def open_circuit(manager: HTTPClientManager) -> HostRateLimiter:
+    limiter = manager.rate_limiter.host("example.com")
+    limiter.record(None)
+    assert limiter.stats().circuit == "open"
+    time.sleep(CIRCUIT.open_seconds + 0.05)
+    return limiter
+
+
+def test_cancelled_probe_frees_the_circuit() -> None:
+    started = asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if not started.is_set():
+            started.set()
+            await asyncio.Event().wait()
+        return httpx.Response(200, json={})
+
+    manager = HTTPClientManager(HTTPClientConfig(retries=0, rate_limit=CIRCUIT))
+    manager._create_client = lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    limiter = open_circuit(manager)
+
+    async def fetch() -> None:
+        probe = asyncio.create_task(manager.get_json(URL))
+        await started.wait()
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        # Well within ``open_seconds`` of the cancelled probe, the next request probes and closes the circuit.
+        assert await manager.get_json(URL) == {}
+
+    asyncio.run(fetch())
+    assert limiter.stats().circuit == "closed"
+
+
+def test_probe_failing_without_transport_error_frees_the_circuit() -> None:
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) == 1:
+            raise httpx.DecodingError("bad gzip", request=request)
+        return httpx.Response(200, json={})
+
+    manager = HTTPClientManager(HTTPClientConfig(retries=0, rate_limit=CIRCUIT))
+    manager._create_client = lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    limiter = open_circuit(manager)
+
+    async def fetch() -> None:
+        with pytest.raises(httpx.DecodingError):
+            await manager.get_json(URL)
+        assert await manager.get_json(URL) == {}
+
+    asyncio.run(fetch())
+    assert limiter.stats().circuit == "closed"
+
+
+def test_unreported_probe_lapses_after_open_seconds() -> None:
+    limiter = HostRateLimiter("example.com", CIRCUIT)
+    limiter.record(None)
+    time.sleep(CIRCUIT.open_seconds + 0.05)
+
+    async def acquire() -> None:
+        await limiter.acquire(httpx.Request("GET", URL))
+
+    asyncio.run(acquire())  # the probe, never recorded
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(acquire())
+    time.sleep(CIRCUIT.open_seconds + 0.05)
+    asyncio.run(acquire())
+    assert limiter.stats().circuit == "half_open"
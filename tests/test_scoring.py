@@ -0,0 +1,84 @@
+"""Fantasy points store: incremental, per-week materialization."""
+
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import polars as pl
+import pytest
+
+from sharpshooter.utils.scoring import DRAFTKINGS, PBP_COLUMNS, FantasyPointsStore
+
+STRING_COLUMNS = {"game_id", "posteam", "play_type", "two_point_conv_result"} | {
+    name for name in PBP_COLUMNS if name.endswith(("_id", "_name", "_team"))
+}
+
+
+def play(season: int, week: int, play_id: int, yards: float) -> Dict[str, object]:
+    """A completed pass from ``QB`` to ``WR`` in the one game of the week."""
+    row: Dict[str, object] = {name: None if name in STRING_COLUMNS else 0.0 for name in PBP_COLUMNS}
+    row.update(
+        game_id=f"{season}_{week:02d}_AAA_BBB",
+        play_id=float(play_id),
+        season=season,
+        week=week,
+        posteam="AAA",
+        play_type="pass",
+        passer_player_id="00-QB",
+        passer_player_name="QB",
+        receiver_player_id="00-WR",
+        receiver_player_name="WR",
+        passing_yards=yards,
+        receiving_yards=yards,
+        complete_pass=1.0,
+    )
+    return row
+
+
+def pbp(weeks: Sequence[Tuple[int, int]], yards: float = 10.0) -> pl.DataFrame:
+    return pl.DataFrame([play(season, week, play_id, yards) for season, week in weeks for play_id in (1, 2)])
+
+
+def files(store: FantasyPointsStore) -> List[str]:
+    return sorted(str(path.relative_to(store.directory)) for path in store.directory.glob("season=*/*.parquet"))
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> FantasyPointsStore:
+    return FantasyPointsStore(tmp_path / "points")
+
+
+def test_update_rebuilds_only_new_and_changed_weeks(store: FantasyPointsStore) -> None:
+    assert store.update(pbp([(2024, 1), (2024, 2)])) == [(2024, 1), (2024, 2)]
+    week_1 = store._week_path(2024, 1).stat().st_mtime_ns
+
+    assert store.update(pbp([(2024, 1), (2024, 2), (2024, 3)])) == [(2024, 3)]
+    assert store._week_path(2024, 1).stat().st_mtime_ns == week_1
+    assert store.update(pbp([(2024, 1), (2024, 2), (2024, 3)])) == []
+
+    # A stat correction in one week rebuilds just that week.
+    corrected = pl.concat([pbp([(2024, 1), (2024, 3)]), pbp([(2024, 2)], yards=25.0)])
+    assert store.update(corrected) == [(2024, 2)]
+    points = store.points([DRAFTKINGS], weeks=(2, 2))
+    assert points.filter(pl.col("player_id") == "00-WR")["receiving_yards"].to_list() == [50.0]
+
+
+def test_update_rebuilds_week_with_one_corrected_play(store: FantasyPointsStore) -> None:
+    week = pl.DataFrame([play(2024, 1, play_id, 10.0) for play_id in range(1, 6)])
+    store.update(week)
+
+    for play_id in range(1, 6):
+        corrected = week.with_columns(
+            pl.when(pl.col("play_id") == play_id).then(12.0).otherwise("passing_yards").alias("passing_yards")
+        )
+        assert store.update(corrected) == [(2024, 1)]
+        assert store.update(week) == [(2024, 1)]
+
+
+def test_update_drops_vanished_weeks_of_updated_seasons(store: FantasyPointsStore) -> None:
+    store.update(pbp([(2023, 17), (2024, 1), (2024, 2)]))
+
+    # 2024 week 2 is gone from the new play-by-play; 2023 is not part of it at all.
+    assert store.update(pbp([(2024, 1)])) == []
+    assert store.manifest().select("season", "week").rows() == [(2023, 17), (2024, 1)]
+    assert files(store) == ["season=2023/week=17.parquet", "season=2024/week=01.parquet"]
+    assert store.scan().select("season", "week").unique().sort("season").collect().rows() == [(2023, 17), (2024, 1)]
@@ -0,0 +1,71 @@
+"""Contest simulator: reproducible seeds and the configured outcome correlation."""
+
+from typing import List
+
+import numpy as np
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from sharpshooter.utils.simulation import Contest, ContestSimulator, OutcomeModel
+
+# One game's slots: QB1 and WR1 of a team, then of its opponent.
+CORRELATION = np.array(
+    [
+        [1.0, 0.6, 0.2, 0.1],
+        [0.6, 1.0, 0.1, -0.1],
+        [0.2, 0.1, 1.0, 0.6],
+        [0.1, -0.1, 0.6, 1.0],
+    ]
+)
+
+
+@pytest.fixture(scope="module")
+def simulator() -> ContestSimulator:
+    """Two games of two teams, each with a QB and a WR."""
+    rows = []
+    for team_index, team in enumerate(["AAA", "BBB", "CCC", "DDD"]):
+        for position, projection in (("QB", 20.0), ("WR", 14.0)):
+            rows.append(
+                {
+                    "playerId": len(rows) + 1,
+                    "position": position,
+                    "teamAbbreviation": team,
+                    "competition_id": team_index // 2,
+                    "projection": projection + team_index,
+                }
+            )
+    model = OutcomeModel(slots=("QB1", "WR1"), correlation=CORRELATION, volatility={"QB": (2.0, 0.3)})
+    return ContestSimulator(pl.DataFrame(rows), "projection", model)
+
+
+def lineups(players: List[List[int]]) -> pl.DataFrame:
+    return pl.DataFrame(
+        [{"lineup_id": lineup_id, "playerId": player_id} for lineup_id, ids in enumerate(players) for player_id in ids]
+    )
+
+
+def test_same_seed_same_result_across_workers(simulator: ContestSimulator) -> None:
+    candidates = lineups([[1, 2, 5], [3, 4, 7], [1, 4, 6]])
+    field = lineups([[1, 2, 3], [5, 6, 7], [2, 4, 8], [1, 6, 8]]).with_columns(pl.lit(3, pl.Int64).alias("entries"))
+    contest = Contest.from_tiers(10.0, [(1, 1, 60.0), (2, 4, 15.0)])
+
+    single = simulator.simulate(candidates, field, contest, trials=5_500, seed=11)
+    assert_frame_equal(single.summary, simulator.simulate(candidates, field, contest, trials=5_500, seed=11).summary)
+    parallel = simulator.simulate(candidates, field, contest, trials=5_500, seed=11, workers=2)
+    assert_frame_equal(single.summary, parallel.summary)
+    other = simulator.simulate(candidates, field, contest, trials=5_500, seed=12)
+    assert not single.summary["mean_points"].equals(other.summary["mean_points"])
+
+
+def test_sampled_correlation_matches_model(simulator: ContestSimulator) -> None:
+    """Within a game, log points carry the model's slot correlation; across games they are independent."""
+    sample = simulator.sample(200_000, seed=3)
+    np.testing.assert_array_equal(sample, simulator.sample(200_000, seed=3))
+    correlation = np.corrcoef(np.log(sample), rowvar=False)
+    # Players 1-4 are the first game (AAA QB, AAA WR, BBB QB, BBB WR); 5-8 the second.
+    np.testing.assert_allclose(correlation[:4, :4], CORRELATION, atol=0.01)
+    np.testing.assert_allclose(correlation[4:, 4:], CORRELATION, atol=0.01)
+    np.testing.assert_allclose(correlation[:4, 4:], 0.0, atol=0.01)
+    # The lognormal keeps each projection as its mean.
+    np.testing.assert_allclose(sample.mean(axis=0), simulator.players["projection"].to_numpy(), rtol=0.02)
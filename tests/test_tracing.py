@@ -0,0 +1,25 @@
+"""Tracer: nested spans and the bound on finished spans."""
+
+from sharpshooter.utils.tracing import Tracer, TracerConfig
+
+
+def test_spans_nest_and_inherit_attributes() -> None:
+    tracer = Tracer()
+    with tracer.span("ingest_job", data_type="pbp", year=2024) as job:
+        with tracer.span("decode") as decode:
+            decode.rows = 10
+
+    assert [span.name for span in tracer.finished()] == ["decode", "ingest_job"]
+    assert decode.parent_id == job.span_id
+    assert decode.attributes == {"data_type": "pbp", "year": 2024}
+
+
+def test_finished_spans_are_capped() -> None:
+    """A long-running poll keeps only the most recent spans."""
+    tracer = Tracer(TracerConfig(max_spans=3))
+    for index in range(10):
+        with tracer.span("poll", index=index):
+            pass
+
+    assert [span.attributes["index"] for span in tracer.finished()] == [7, 8, 9]
+    assert tracer.summary()[0]["runs"] == 3
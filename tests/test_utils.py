@@ -0,0 +1,140 @@
+"""Shared HTTP client: pagination and query handling."""
+
+import asyncio
+import gc
+import json
+import threading
+from typing import Callable, Dict, List
+
+import httpx
+import pytest
+
+from sharpshooter.utils.utils import HTTPClientManager, fetch_paginated
+
+
+def mock_manager(handler: Callable[[httpx.Request], httpx.Response]) -> HTTPClientManager:
+    """A client manager whose requests are answered by ``handler`` instead of the network."""
+    manager = HTTPClientManager()
+    manager._create_client = lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return manager
+
+
+def paginated_handler(items: List[Dict], queries: List[Dict[str, str]]) -> Callable[[httpx.Request], httpx.Response]:
+    def handler(request: httpx.Request) -> httpx.Response:
+        query = dict(request.url.params)
+        queries.append(query)
+        offset, limit = int(query["offset"]), int(query["limit"])
+        return httpx.Response(200, json={"items": items[offset : offset + limit], "totalItems": len(items)})
+
+    return handler
+
+
+def test_fetch_paginated_keeps_url_query() -> None:
+    items = [{"id": i} for i in range(250)]
+    queries: List[Dict[str, str]] = []
+
+    async def fetch() -> List[Dict]:
+        async with mock_manager(paginated_handler(items, queries)) as manager:
+            url = "https://drop-api.ea.com/rating/madden-nfl?locale=en&iteration=week-3"
+            return await fetch_paginated(url, page_size=100, manager=manager)
+
+    assert asyncio.run(fetch()) == items
+    assert sorted(int(query["offset"]) for query in queries) == [0, 100, 200]
+    for query in queries:
+        assert query["iteration"] == "week-3"
+        assert query["locale"] == "en"
+        assert query["limit"] == "100"
+
+
+def test_fetch_paginated_overrides_url_paging() -> None:
+    """A ``limit``/``offset`` already on the URL is replaced, not sent twice."""
+    queries: List[Dict[str, str]] = []
+
+    async def fetch() -> List[Dict]:
+        async with mock_manager(paginated_handler([{"id": 1}], queries)) as manager:
+            return await fetch_paginated("https://example.com/items?limit=5&offset=7", manager=manager)
+
+    assert asyncio.run(fetch()) == [{"id": 1}]
+    assert queries == [{"limit": "100", "offset": "0"}]
+
+
+def test_fetch_paginated_rejects_unknown_layout() -> None:
+    async def fetch() -> List[Dict]:
+        async with mock_manager(lambda request: httpx.Response(200, content=json.dumps({"data": []}))) as manager:
+            return await fetch_paginated("https://example.com/items", manager=manager)
+
+    with pytest.raises(ValueError, match="Unrecognized page layout"):
+        asyncio.run(fetch())
+
+
+def test_client_closed_with_its_event_loop() -> None:
+    """Each ``asyncio.run`` gets its own client, closed when that loop shuts down."""
+    manager = mock_manager(lambda request: httpx.Response(200, json={"ok": True}))
+    clients: List[httpx.AsyncClient] = []
+
+    async def fetch() -> None:
+        assert await manager.get_json("https://example.com/") == {"ok": True}
+        clients.append(manager.client)
+
+    asyncio.run(fetch())
+    asyncio.run(fetch())
+    assert clients[0] is not clients[1]
+    assert all(client.is_closed for client in clients)
+
+
+def test_client_reused_within_a_loop() -> None:
+    manager = mock_manager(lambda request: httpx.Response(200, json={}))
+
+    async def fetch() -> bool:
+        first = manager.client
+        await manager.get_json("https://example.com/a")
+        await manager.get_json("https://example.com/b")
+        return manager.client is first and not first.is_closed
+
+    assert asyncio.run(fetch())
+
+
+def test_concurrent_loops_keep_their_own_clients() -> None:
+    """Threads that each run a loop share the manager without swapping each other's client."""
+    manager = mock_manager(lambda request: httpx.Response(200, json={}))
+    barrier = threading.Barrier(2)
+    clients: List[httpx.AsyncClient] = []
+
+    async def fetch() -> None:
+        client = manager.client
+        await asyncio.to_thread(barrier.wait)
+        await manager.get_json("https://example.com/")
+        assert manager.client is client and not client.is_closed
+        clients.append(client)
+
+    threads = [threading.Thread(target=asyncio.run, args=(fetch(),)) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(clients) == 2 and clients[0] is not clients[1]
+    assert all(client.is_closed for client in clients)
+
+
+def test_dropped_manager_closes_client_on_running_loop(caplog: pytest.LogCaptureFixture) -> None:
+    """A loop that outlives its manager, like a background loop, does not keep the client open."""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    manager = mock_manager(lambda request: httpx.Response(200, json={}))
+
+    async def fetch(manager: HTTPClientManager) -> httpx.AsyncClient:
+        await manager.get_json("https://example.com/")
+        return manager.client
+
+    try:
+        client = asyncio.run_coroutine_threadsafe(fetch(manager), loop).result()
+        del manager
+        gc.collect()
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0.05), loop).result()
+        assert client.is_closed
+        assert "Task was destroyed" not in caplog.text
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()